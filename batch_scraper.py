@@ -4,230 +4,166 @@ Batch Podcast Transcript Scraper for I Will Teach You To Be Rich
 Scrapes episodes in batches of 20 and saves to files with episode range naming
 """
 
-import requests
-from bs4 import BeautifulSoup
 import re
-import os
 import time
-import random
-from urllib.parse import urljoin, urlparse
-import json
+import argparse
+from sitemap import SitemapDiscovery
+from work_queue import WorkQueue, LeaseHeartbeat, default_worker_id
+from progress_manifest import ProgressManifest, EPISODE_LIST_MAX_AGE
+from wp_api import iter_api_pages
+from transcript_writer import CombinedTranscriptWriter
+from scraper_base import ScraperBase, add_common_arguments, check_common_arguments, scraper_options
 
-class BatchPodcastScraper:
-    def __init__(self):
-        self.base_url = "https://www.iwillteachyoutoberich.com"
-        self.api_url = "https://www.iwillteachyoutoberich.com/wp-json/wp/v2/posts"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        })
-        
-        # Rate limiting settings
-        self.min_delay = 2  # Minimum seconds between requests
-        self.max_delay = 5  # Maximum seconds between requests
-        self.last_request_time = 0
-        
-    def rate_limit(self):
-        """Add random delay between requests to avoid being blocked"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.min_delay:
-            sleep_time = self.min_delay - time_since_last + random.uniform(0, 1)
-            print(f"Rate limiting: sleeping for {sleep_time:.1f} seconds...")
-            time.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
-    
-    def safe_request(self, url, params=None, max_retries=3):
-        """Make a request with retry logic and rate limiting"""
-        for attempt in range(max_retries):
-            try:
-                self.rate_limit()
-                print(f"Making request to: {url}")
-                response = self.session.get(url, params=params, timeout=30)
-                
-                if response.status_code == 200:
-                    return response
-                elif response.status_code == 403:
-                    print(f"Got 403 Forbidden on attempt {attempt + 1}")
-                    if attempt < max_retries - 1:
-                        # Wait longer before retrying
-                        wait_time = (attempt + 1) * 10
-                        print(f"Waiting {wait_time} seconds before retry...")
-                        time.sleep(wait_time)
-                        continue
-                elif response.status_code == 429:
-                    print(f"Rate limited (429) on attempt {attempt + 1}")
-                    if attempt < max_retries - 1:
-                        # Wait much longer for rate limiting
-                        wait_time = (attempt + 1) * 30
-                        print(f"Rate limited, waiting {wait_time} seconds...")
-                        time.sleep(wait_time)
-                        continue
-                else:
-                    print(f"HTTP {response.status_code} on attempt {attempt + 1}")
-                
-                response.raise_for_status()
-                
-            except requests.exceptions.RequestException as e:
-                print(f"Request error on attempt {attempt + 1}: {e}")
-                if attempt < max_retries - 1:
-                    wait_time = (attempt + 1) * 5
-                    print(f"Waiting {wait_time} seconds before retry...")
-                    time.sleep(wait_time)
-                else:
-                    raise
+class BatchPodcastScraper(ScraperBase):
+    def __init__(self, concurrency=1, cache_dir=".http_cache", offline=False,
+                 manifest_path="transcripts/.batch_manifest.json", rate_state=".rate_state.json",
+                 archive_dir="archive", db_path="transcripts/.episodes.db"):
+        super().__init__(concurrency=concurrency, cache_dir=cache_dir, offline=offline, rate_state=rate_state,
+                         archive_dir=archive_dir, db_path=db_path)
+        self.batch_delay = 5  # Seconds to pause between batches
         
-        return None
-    
-    def get_all_episode_urls(self):
-        """Get all episode URLs from the WordPress API"""
-        print("Fetching all episode URLs from WordPress API...")
+        # Per-episode progress so restarted runs skip finished work
+        self.manifest = ProgressManifest(manifest_path)
+        self.episode_list_max_age = EPISODE_LIST_MAX_AGE  # Seconds a finished run's episode list is reused
         
-        all_episodes = []
-        page = 1
-        max_pages = 20  # Limit to avoid infinite loops
-        
-        while page <= max_pages:
-            try:
-                print(f"Fetching page {page}...")
-                response = self.safe_request(self.api_url, params={'per_page': 100, 'page': page})
-                if not response:
-                    print(f"Failed to fetch API data for page {page}")
-                    break
-                
-                data = response.json()
-                
-                if not data:  # No more posts
-                    print(f"No more posts found on page {page}")
-                    break
-                
-                print(f"Found {len(data)} posts on page {page}")
-                
-                # Find episodes on this page
-                page_episodes = 0
-                for post in data:
-                    title = post.get('title', {}).get('rendered', '').lower()
-                    slug = post.get('slug', '').lower()
-                    link = post.get('link', '')
-                    
-                    # Check if this looks like a podcast episode
-                    if ('episode' in title or 'episode' in slug or 
-                        re.search(r'\d+', slug) or 
-                        'podcast' in title or 'podcast' in slug):
-                        
-                        episode_num = re.search(r'/(\d+)-', link)
-                        if episode_num:
-                            episode_num = int(episode_num.group(1))
-                            all_episodes.append((episode_num, link))
-                            page_episodes += 1
-                
-                print(f"  Found {page_episodes} episodes on page {page}")
-                
-                if len(data) < 100:  # Last page
-                    print(f"Last page reached (only {len(data)} posts)")
-                    break
-                
-                page += 1
-                
-            except Exception as e:
-                print(f"Error on page {page}: {e}")
-                break
+    def get_all_episode_urls(self, refresh=False):
+        """Get all episode URLs from the WordPress API or sitemaps
+        
+        Reuses the episode list saved in the progress manifest unless
+        refresh is set, so restarts don't re-enumerate the whole API; once
+        every episode in it is finished it is only reused for a day. Sync
+        runs instead return only episodes added or edited since the last
+        sync (plus ones that failed then), and mark them for re-scraping.
+        """
+        if self.discover_from_db:
+            db_episodes = [(num, url) for num, url, title in self.db.episodes()]
+            print(f"Using episode list from {self.db.path} ({len(db_episodes)} episodes)")
+            return db_episodes
+        
+        cached_episodes = None if refresh or self.catalog else self.manifest.cached_episode_list(self.episode_list_max_age)
+        if cached_episodes:
+            print(f"Using episode list from progress manifest ({len(cached_episodes)} episodes)")
+            return cached_episodes
+        
+        if self.discovery == 'sitemap':
+            all_episodes = self.get_episodes_from_sitemap()
+        else:
+            all_episodes = self.get_episodes_from_api()
+        
+        if self.catalog:
+            listed = {link for episode_num, link in all_episodes}
+            all_episodes += [(num, link) for num, link in self.catalog.retry_links() if link not in listed]
+            # Edited episodes were done before; scrape them again
+            for episode_num, link in all_episodes:
+                if self.manifest.status(episode_num):
+                    self.manifest.mark(episode_num, link, 'pending')
+            self.manifest.save_marks()
         
         # Sort episodes by number (highest first)
         all_episodes.sort(key=lambda x: x[0], reverse=True)
         
+        if not all_episodes:
+            return all_episodes
+        
+        # A sync's episodes are only the changed ones, not the full list restarts
+        # reuse, and a listing with failed pages would hide episodes until it expired
+        if self.discovery_failures:
+            print("Not saving the episode list to the progress manifest, the listing was incomplete")
+        elif not self.catalog:
+            self.manifest.set_episode_list(all_episodes)
+        
         print(f"\nTotal episodes found: {len(all_episodes)}")
         print(f"Episode range: {all_episodes[0][0]} to {all_episodes[-1][0]}")
         
         return all_episodes
     
-    def extract_episode_number(self, url):
-        """Extract episode number from URL"""
-        match = re.search(r'/(\d+)-', url)
-        if match:
-            return int(match.group(1))
-        return None
-    
-    def extract_transcript(self, episode_url):
-        """Extract the full transcript from an episode page"""
-        try:
-            print(f"Fetching transcript from: {episode_url}")
-            response = self.safe_request(episode_url)
-            if not response:
-                print("Failed to fetch episode page")
-                return ""
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # First, try to find transcript content in specific areas
-            transcript_text = ""
-            
-            # Try to find the transcript section
-            # Look for common transcript indicators
-            transcript_selectors = [
-                'div[class*="transcript"]',
-                'div[class*="content"]',
-                'article',
-                'main',
-                '.entry-content',
-                '.post-content'
-            ]
-            
-            transcript_found = False
-            for selector in transcript_selectors:
-                transcript_div = soup.select_one(selector)
-                if transcript_div:
-                    # Look for the actual transcript text
-                    # Remove script and style elements
-                    for script in transcript_div(["script", "style"]):
-                        script.decompose()
-                    
-                    # Get all text content
-                    text_content = transcript_div.get_text(separator='\n', strip=True)
-                    
-                    # Look for transcript markers like timestamps [00:00:01]
-                    if re.search(r'\[\d{2}:\d{2}:\d{2}\]', text_content):
-                        transcript_text = text_content
-                        transcript_found = True
-                        break
+    def get_episodes_from_api(self):
+        """Page through the WordPress API listing; returns [(episode_num, url)]"""
+        print("Fetching all episode URLs from WordPress API...")
+        
+        all_episodes = []
+        per_page = 100
+        
+        def request_page(page):
+            print(f"Fetching page {page}...")
+            return self.safe_request(self.api_url, params=self.listing_params(per_page, page))
+        
+        self.discovery_failures = []
+        for page, data in iter_api_pages(request_page, per_page, concurrency=self.concurrency,
+                                         failed_pages=self.discovery_failures):
+            print(f"Found {len(data)} posts on page {page}")
             
-            # If no transcript found with selectors, search the entire page
-            if not transcript_found:
-                print("  Searching entire page for transcript content...")
-                all_text = soup.get_text(separator='\n', strip=True)
+            # Find episodes on this page
+            page_episodes = 0
+            discovered = []
+            for post in data:
+                title = post.get('title', {}).get('rendered', '').lower()
+                slug = post.get('slug', '').lower()
+                link = post.get('link', '')
+                content = post.get('content', {}).get('rendered', '')
                 
-                # Look for timestamp patterns in the entire page
-                timestamp_matches = re.findall(r'\[\d{2}:\d{2}:\d{2}\].*?(?=\[\d{2}:\d{2}:\d{2}\]|$)', all_text, re.DOTALL)
-                if timestamp_matches:
-                    print(f"  Found {len(timestamp_matches)} timestamp sections")
-                    # Combine all timestamp sections
-                    transcript_text = '\n\n'.join(timestamp_matches)
-                    transcript_found = True
-                else:
-                    # Fallback: get the main content area
-                    main_content = soup.find('main') or soup.find('article') or soup.find('div', class_='content')
-                    if main_content:
-                        for script in main_content(["script", "style"]):
-                            script.decompose()
-                        transcript_text = main_content.get_text(separator='\n', strip=True)
-            
-            if transcript_found:
-                print(f"  Successfully extracted transcript ({len(transcript_text)} characters)")
-            else:
-                print(f"  No transcript found")
-            
-            return transcript_text.strip()
+                # Check if this looks like a podcast episode
+                if ('episode' in title or 'episode' in slug or 
+                    re.search(r'\d+', slug) or 
+                    'podcast' in title or 'podcast' in slug):
+                    
+                    episode_num = re.search(r'/(\d+)-', link)
+                    if episode_num:
+                        episode_num = int(episode_num.group(1))
+                        discovered.append((episode_num, link, post.get('id'),
+                                           post.get('title', {}).get('rendered', ''), post.get('modified')))
+                        # Sync runs skip posts unchanged since they were last saved
+                        if self.catalog and not self.catalog.note(post, episode_num):
+                            continue
+                        all_episodes.append((episode_num, link))
+                        page_episodes += 1
+                        
+                        # Keep the body so extract_transcript can skip the page fetch
+                        if self.use_api_content and content:
+                            self.api_content[link] = content
             
-        except Exception as e:
-            print(f"Error extracting transcript from {episode_url}: {e}")
-            return ""
+            if self.db and discovered:
+                self.db.add_episodes(discovered)
+            print(f"  Found {page_episodes} episodes on page {page}")
+        
+        if self.discovery_failures:
+            print(f"Warning: listing is incomplete, failed to fetch pages {self.discovery_failures}")
+        return all_episodes
+    
+    def get_episodes_from_sitemap(self):
+        """Read the WordPress sitemaps; returns [(episode_num, url)]
+        
+        The sitemap index and its post sitemaps list every post with its
+        <lastmod> in a few small requests. Sync runs skip sitemaps and
+        posts whose lastmod hasn't changed since they were last saved.
+        """
+        sitemap_url = self.sitemap_url or f"{self.base_url}/wp-sitemap.xml"
+        print(f"Fetching all episode URLs from sitemap {sitemap_url}...")
+        
+        sitemaps = SitemapDiscovery(self.safe_request, sitemap_url,
+                                    synced=self.catalog.synced_sitemaps() if self.catalog else None)
+        discovered = []
+        all_episodes = []
+        for link, lastmod in sitemaps.post_urls():
+            episode_num = self.extract_episode_number(link)
+            if not episode_num:
+                continue
+            discovered.append((episode_num, link, None, None, lastmod))
+            # Sync runs skip posts unchanged since they were last saved
+            if self.catalog and not self.catalog.note({'link': link, 'modified': lastmod}, episode_num,
+                                                      from_sitemap=True):
+                continue
+            all_episodes.append((episode_num, link))
+        
+        self.discovery_failures = sitemaps.failed
+        if self.discovery_failures:
+            print(f"Warning: listing is incomplete, failed to fetch sitemaps {self.discovery_failures}")
+        if self.db and discovered:
+            self.db.add_episodes(discovered)
+        if self.catalog:
+            self.catalog.note_sitemaps(sitemaps.read)
+        print(f"  Found {len(discovered)} episodes in {sitemaps.requests} sitemap requests")
+        return all_episodes
     
     def save_batch_transcripts(self, transcripts_data, output_dir="transcripts"):
         """Save batch of transcripts to a single file with episode range in filename"""
@@ -235,35 +171,11 @@ class BatchPodcastScraper:
             print("No transcripts to save")
             return
         
-        # Create output directory if it doesn't exist
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Extract episode numbers and create filename
-        episode_numbers = []
-        for url, transcript in transcripts_data:
-            episode_num = self.extract_episode_number(url)
-            if episode_num:
-                episode_numbers.append(episode_num)
-        
-        if len(episode_numbers) >= 2:
-            # Sort episode numbers and create range filename
-            episode_numbers.sort(reverse=True)  # Highest to lowest
-            filename = f"{episode_numbers[0]}-{episode_numbers[-1]}.txt"
-        else:
-            # Fallback filename
-            filename = f"episodes_{len(transcripts_data)}.txt"
-        
-        filepath = os.path.join(output_dir, filename)
-        
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                for i, (url, transcript) in enumerate(transcripts_data, 1):
-                    episode_num = self.extract_episode_number(url)
-                    f.write(f"EPISODE {episode_num if episode_num else 'UNKNOWN'}\n")
-                    f.write(f"URL: {url}\n")
-                    f.write("=" * 80 + "\n\n")
-                    f.write(transcript)
-                    f.write("\n\n" + "=" * 80 + "\n\n")
+            with CombinedTranscriptWriter(output_dir, segments=self.export_segments) as writer:
+                for url, transcript in transcripts_data:
+                    writer.add(url, transcript)
+                filepath = writer.close()
             
             print(f"Saved batch transcripts to: {filepath}")
             return filepath
@@ -272,15 +184,70 @@ class BatchPodcastScraper:
             print(f"Error saving batch transcripts: {e}")
             return None
     
-    def scrape_batches(self, batch_size=20, start_batch=1, max_batches=None):
-        """Scrape episodes in batches"""
+    def filter_range(self, episodes, start_episode=None, end_episode=None):
+        """Keep (episode_num, url) pairs with start_episode <= episode_num <= end_episode"""
+        if start_episode or end_episode:
+            print(f"Episode range: {start_episode or 'any'} - {end_episode or 'any'}")
+        return [(num, url) for num, url in episodes
+                if not (start_episode and num < start_episode) and not (end_episode and num > end_episode)]
+    
+    def scrape_episode_batch(self, episodes):
+        """Scrape (episode_num, url) pairs into one combined file
+        
+        Returns (filepath or None, the writer's (episode_num, url, sha256,
+        characters) entries for saved episodes, failed (episode_num, url) pairs).
+        """
+        failed = []
+        with CombinedTranscriptWriter(self.output_dir, segments=self.export_segments) as writer:
+            batch_urls = [episode_url for episode_num, episode_url in episodes]
+            for i, (episode_url, transcript) in enumerate(self.fetch_transcripts(batch_urls), 1):
+                episode_num = episodes[i - 1][0]
+                print(f"\n[{i}/{len(episodes)}] Processed Episode {episode_num}")
+                
+                if transcript:
+                    with self.metrics.stage('save'):
+                        writer.add(episode_url, transcript)
+                    print(f"  ✓ Successfully extracted transcript ({len(transcript)} characters)")
+                else:
+                    failed.append((episode_num, episode_url))
+                    if self.db:
+                        self.db.mark_failed(episode_url)
+                    print(f"  ✗ Failed to extract transcript")
+            
+            with self.metrics.stage('save'):
+                filepath = writer.close()
+        
+        if filepath and self.db:
+            self.db.mark_saved(writer.episodes, filepath)
+        return filepath, writer.episodes, failed
+    
+    def scrape_batches(self, batch_size=20, start_batch=1, max_batches=None, refresh=False,
+                       start_episode=None, end_episode=None):
+        """Scrape episodes in batches
+        
+        Episodes already marked done in the progress manifest are skipped,
+        so rerunning after a crash only retries failed or missing episodes.
+        start_episode/end_episode narrow the episode list before batching.
+        """
         print(f"Starting batch scraping (batch size: {batch_size})...")
+        if self.db:
+            self.db.start_run('batch')
         
         # Get all episode URLs
-        all_episodes = self.get_all_episode_urls()
+        with self.metrics.stage('discovery'):
+            all_episodes = self.get_all_episode_urls(refresh=refresh)
+        
+        all_episodes = self.filter_range(all_episodes, start_episode, end_episode)
         
         if not all_episodes:
-            print("No episodes found")
+            if self.catalog:
+                if not self.discovery_failures:
+                    print("No new or edited episodes since the last sync")
+                self.catalog.commit(attempted=(), saved=(), complete=not self.discovery_failures)
+            else:
+                print("No episodes found")
+            if self.db:
+                self.db.finish_run(saved=0, failed=0)
             return
         
         # Calculate total batches
@@ -295,6 +262,8 @@ class BatchPodcastScraper:
         print(f"Starting from batch: {start_batch}")
         
         successful_batches = 0
+        attempted_links = set()
+        saved_links = set()
         
         for batch_num in range(start_batch, start_batch + total_batches):
             start_idx = (batch_num - 1) * batch_size
@@ -312,60 +281,176 @@ class BatchPodcastScraper:
             
             # Display episodes in this batch
             for i, (episode_num, url) in enumerate(batch_episodes, 1):
-                print(f"{i:2d}. Episode {episode_num}: {url}")
+                status = self.manifest.status(episode_num)
+                print(f"{i:2d}. Episode {episode_num}: {url}" + (f" [{status}]" if status else ""))
             
-            # Scrape transcripts for this batch
-            transcripts_data = []
-            successful_scrapes = 0
+            # Skip episodes finished by an earlier run
+            pending_episodes = [(num, url) for num, url in batch_episodes if not self.manifest.is_done(num)]
+            if not pending_episodes:
+                print(f"Batch {batch_num} already complete, skipping")
+                successful_batches += 1
+                continue
+            if len(pending_episodes) < len(batch_episodes):
+                print(f"Resuming batch {batch_num}: {len(pending_episodes)} episodes left to scrape")
             
-            for i, (episode_num, episode_url) in enumerate(batch_episodes, 1):
-                print(f"\n[{i}/{len(batch_episodes)}] Processing Episode {episode_num}...")
-                
-                transcript = self.extract_transcript(episode_url)
-                if transcript:
-                    transcripts_data.append((episode_url, transcript))
-                    successful_scrapes += 1
-                    print(f"  ✓ Successfully extracted transcript ({len(transcript)} characters)")
-                else:
-                    print(f"  ✗ Failed to extract transcript")
+            # Scrape transcripts for this batch, streaming each one to the batch file
+            attempted_links.update(episode_url for episode_num, episode_url in pending_episodes)
+            filepath, saved, failed = self.scrape_episode_batch(pending_episodes)
+            for episode_num, episode_url in failed:
+                self.manifest.mark(episode_num, episode_url, 'failed')
             
-            # Save batch transcripts
-            if transcripts_data:
-                print(f"\nSaving batch {batch_num} transcripts...")
-                filepath = self.save_batch_transcripts(transcripts_data)
-                if filepath:
-                    print(f"✓ Successfully saved batch {batch_num} transcripts")
-                    successful_batches += 1
-                else:
-                    print(f"✗ Failed to save batch {batch_num} transcripts")
+            if filepath:
+                print(f"\n✓ Successfully saved batch {batch_num} transcripts to: {filepath}")
+                successful_batches += 1
+                # Only mark episodes done once the batch file is in place
+                for episode_num, episode_url, content_hash, size in saved:
+                    saved_links.add(episode_url)
+                    self.manifest.mark(episode_num, episode_url, 'done', output_file=filepath,
+                                       content_hash=content_hash, size=size)
             else:
                 print(f"No transcripts to save for batch {batch_num}")
+            self.manifest.save_marks()
             
-            print(f"\nBatch {batch_num} complete: {successful_scrapes}/{len(batch_episodes)} transcripts scraped")
+            print(f"\nBatch {batch_num} complete: {len(saved)}/{len(pending_episodes)} transcripts scraped")
             
             # Add delay between batches
-            if batch_num < start_batch + total_batches - 1:
-                print("Waiting 5 seconds before next batch...")
-                time.sleep(5)
+            if batch_num < start_batch + total_batches - 1 and self.batch_delay:
+                print(f"Waiting {self.batch_delay} seconds before next batch...")
+                time.sleep(self.batch_delay)
+        
+        if self.catalog:
+            self.catalog.commit(attempted=attempted_links, saved=saved_links, complete=not self.discovery_failures)
+        if self.db:
+            self.db.finish_run(saved=len(saved_links), failed=len(attempted_links - saved_links))
         
         print(f"\n" + "="*80)
         print(f"BATCH SCRAPING COMPLETE!")
         print(f"Successfully processed {successful_batches}/{total_batches} batches")
+        print(f"Episodes done: {self.manifest.count('done')}, failed: {self.manifest.count('failed')}")
         print("="*80)
-
-def main():
-    scraper = BatchPodcastScraper()
     
-    # You can customize these parameters:
-    # batch_size: number of episodes per batch (default: 20)
-    # start_batch: which batch to start from (default: 1)
-    # max_batches: maximum number of batches to process (default: None = all)
+    def enqueue_episodes(self, queue, refresh=False, start_episode=None, end_episode=None):
+        """Add the discovered episodes in range to a shared work queue"""
+        with self.metrics.stage('discovery'):
+            episodes = self.filter_range(self.get_all_episode_urls(refresh=refresh), start_episode, end_episode)
+        added = queue.enqueue(episodes)
+        print(f"Queued {added} new episodes in {queue.path} ({len(episodes) - added} were already queued)")
+        return added
     
-    scraper.scrape_batches(
-        batch_size=20,
-        start_batch=4,
-        max_batches=9  # Process batches 4-12 (remaining 180 episodes)
+    def scrape_queue(self, queue, worker=None, batch_size=20):
+        """Claim and scrape batches from a shared work queue until it is drained
+        
+        Every claimed batch is written to its own combined file. Leases are
+        renewed in the background while a batch is scraped; if this process
+        dies they expire and another worker picks the episodes up. When
+        nothing is left to claim, waits for other workers' leases to finish
+        or expire so a crashed worker's episodes still get done.
+        """
+        worker = worker or default_worker_id()
+        print(f"Worker {worker} taking batches of {batch_size} from {queue.path}")
+        saved_total = failed_total = batches = 0
+        try:
+            if self.db:
+                self.db.start_run('batch-queue')
+            while True:
+                claimed = queue.claim(worker, batch_size)
+                if not claimed:
+                    expiry = queue.next_expiry()
+                    if expiry is None:
+                        break
+                    wait = min(max(expiry - time.time(), 1), 30)
+                    print(f"Nothing to claim while other workers hold leases, checking again in {wait:.0f}s")
+                    time.sleep(wait)
+                    continue
+                
+                batches += 1
+                print(f"\n" + "="*80)
+                print(f"QUEUE BATCH {batches}: episodes {claimed[0][0]} to {claimed[-1][0]} ({len(claimed)} episodes)")
+                print("="*80)
+                with LeaseHeartbeat(queue, worker, [url for episode_num, url in claimed]):
+                    filepath, saved, failed = self.scrape_episode_batch(claimed)
+                
+                if filepath:
+                    queue.complete(worker, [url for episode_num, url, content_hash, size in saved], filepath)
+                    print(f"\n✓ Successfully saved {len(saved)} transcripts to: {filepath}")
+                queue.fail(worker, [url for episode_num, url in failed])
+                saved_total += len(saved)
+                failed_total += len(failed)
+                
+                if self.batch_delay:
+                    time.sleep(self.batch_delay)
+        finally:
+            # Leases still held (e.g. on Ctrl-C) go straight back instead of waiting to expire
+            queue.release(worker)
+            if self.db:
+                self.db.finish_run(saved=saved_total, failed=failed_total)
+        
+        counts = queue.counts()
+        print(f"\n" + "="*80)
+        print(f"QUEUE DRAINED! Worker {worker} saved {saved_total} transcripts in {batches} batches")
+        print(f"Queue: done {counts.get('done', 0)}, failed {counts.get('failed', 0)}")
+        print("="*80)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Scrape podcast transcripts in batches"
     )
+    add_common_arguments(parser)
+    parser.add_argument("--start", type=int, help="Only scrape episodes >= this number")
+    parser.add_argument("--end", type=int, help="Only scrape episodes <= this number")
+    parser.add_argument("--batch-size", type=int, default=20,
+                        help="Number of episodes per batch (default: 20)")
+    parser.add_argument("--start-batch", type=int, default=1,
+                        help="Which batch to start from (default: 1)")
+    parser.add_argument("--max-batches", type=int,
+                        help="Maximum number of batches to process (default: all)")
+    parser.add_argument("--manifest", default="transcripts/.batch_manifest.json",
+                        help="Progress manifest used to resume runs (default: transcripts/.batch_manifest.json)")
+    parser.add_argument("--refresh-episodes", action="store_true",
+                        help="Re-enumerate episodes from the API instead of using the manifest's list")
+    parser.add_argument("--episode-list-max-age", type=float, default=EPISODE_LIST_MAX_AGE / 3600,
+                        help="Hours a finished run's episode list is reused before enumerating again (default: 24)")
+    parser.add_argument("--queue",
+                        help="Work queue shared by several workers, e.g. transcripts/.work_queue.db; "
+                             "claims batches from it instead of using --start-batch/--max-batches")
+    parser.add_argument("--enqueue", action="store_true",
+                        help="With --queue, add the discovered episodes to the queue and exit")
+    parser.add_argument("--lease-seconds", type=int, default=300,
+                        help="How long a claimed batch stays with a worker without a heartbeat (default: 300)")
+    parser.add_argument("--worker-id", help="This worker's name in the queue (default: hostname-pid)")
+
+    args = parser.parse_args()
+
+    check_common_arguments(parser, args)
+    if args.queue and args.sync:
+        parser.error("--queue can't be combined with --sync")
+    if args.enqueue and not args.queue:
+        parser.error("--enqueue needs --queue")
+
+    scraper = BatchPodcastScraper(manifest_path=args.manifest, **scraper_options(args))
+    scraper.episode_list_max_age = args.episode_list_max_age * 3600
+    scraper.configure(args)
+    
+    if args.queue:
+        queue = WorkQueue(args.queue, lease_seconds=args.lease_seconds)
+        if args.enqueue:
+            scraper.enqueue_episodes(queue, refresh=args.refresh_episodes,
+                                     start_episode=args.start, end_episode=args.end)
+        else:
+            scraper.scrape_queue(queue, worker=args.worker_id, batch_size=args.batch_size)
+        queue.close()
+    else:
+        # Finished episodes are recorded in the manifest, so rerunning the same
+        # command after a crash picks up where it left off
+        scraper.scrape_batches(
+            batch_size=args.batch_size,
+            start_batch=args.start_batch,
+            max_batches=args.max_batches,
+            refresh=args.refresh_episodes,
+            start_episode=args.start,
+            end_episode=args.end
+        )
+    scraper.finish(args)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
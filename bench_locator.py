@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark the single-pass transcript locator against the selector cascade
+Checks both give the same transcript on every page and reports CPU time
+per page for the locating step (parsing is excluded)
+"""
+
+import argparse
+import re
+import statistics
+import time
+from bench_parsers import synthetic_episode_page
+from transcript_extractor import make_soup, select_transcript, TRANSCRIPT_SELECTORS
+
+def cascade_select_transcript(soup):
+    """The original selector cascade, kept as the reference implementation"""
+    for selector in TRANSCRIPT_SELECTORS:
+        transcript_div = soup.select_one(selector)
+        if transcript_div:
+            for script in transcript_div(["script", "style"]):
+                script.decompose()
+            text_content = transcript_div.get_text(separator='\n', strip=True)
+            if re.search(r'\[\d{2}:\d{2}:\d{2}\]', text_content):
+                return text_content
+    return None
+
+def page_variants(minutes):
+    """Synthetic pages covering each branch of the locator"""
+    page = synthetic_episode_page(minutes=minutes).decode('utf-8')
+    return {
+        'content-div': page,
+        'transcript-div': page.replace('<div class="entry-content">', '<div class="podcast-transcript">'),
+        'article-only': page.replace('class="site-content"', 'class="site"').replace('class="entry-content"', 'class="body"'),
+        'no-candidate': re.sub(r'</?(main|article)[^>]*>', '', page.replace('<div class="entry-content">', '<section>'))
+                        .replace('class="site-content"', 'class="site"'),
+        'no-timestamps': re.sub(r'\[\d{2}:\d{2}:\d{2}\]', '', page),
+    }
+
+def time_selection(html, parser, select, repeat):
+    """Return (result, median CPU ms) for select() on fresh parses of html"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        soup = make_soup(html, parser)
+        start = time.process_time()
+        result = select(soup)
+        timings.append((time.process_time() - start) * 1000)
+    return result, statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the single-pass transcript locator")
+    parser.add_argument("pages", nargs="*", help="Saved episode HTML files (default: synthetic page variants)")
+    parser.add_argument("--parser", default="lxml", help="Parser backend to build the soup with (default: lxml)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions per page (default: 5)")
+    parser.add_argument("--minutes", type=int, default=60, help="Length of the synthetic transcripts (default: 60)")
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = {}
+        for path in args.pages:
+            with open(path, 'rb') as f:
+                pages[path] = f.read()
+    else:
+        pages = page_variants(args.minutes)
+
+    print("=" * 70)
+    print(f"{'page':<30}{'cascade ms':>12}{'locator ms':>12}{'speedup':>9}  same")
+    mismatches = 0
+    for name, html in pages.items():
+        expected, cascade_ms = time_selection(html, args.parser, cascade_select_transcript, args.repeat)
+        actual, locator_ms = time_selection(html, args.parser, select_transcript, args.repeat)
+        same = expected == actual
+        mismatches += not same
+        print(f"{name[-30:]:<30}{cascade_ms:>12.2f}{locator_ms:>12.2f}{cascade_ms / max(locator_ms, 1e-6):>8.1f}x  {'✓' if same else '✗'}")
+    print("=" * 70)
+    if mismatches:
+        print(f"✗ {mismatches} pages produced different transcripts")
+    else:
+        print("✓ All pages produced the same transcript")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark the HTML parser backends used for transcript extraction
+Reports per-page parse time and peak memory for each backend and checks
+that every backend extracts the same transcript as html.parser
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import statistics
+import time
+import tracemalloc
+from transcript_extractor import extract_transcript_from_html, PARSER_BACKENDS
+
+def synthetic_episode_page(episode_num=217, minutes=60, seed=0):
+    """Build an episode page shaped like the live WordPress theme"""
+    rng = random.Random(seed)
+    words = ["money", "rich", "life", "spend", "save", "invest", "partner", "debt",
+             "house", "salary", "guilt", "travel", "budget", "family", "career"]
+    head = "".join(f"<link rel='stylesheet' href='/wp-content/style-{i}.css'>" for i in range(40))
+    head += "<style>" + ".c{color:red}" * 2000 + "</style>"
+    head += "<script type='application/ld+json'>" + '{"@type":"WebPage"}' * 500 + "</script>"
+    nav = "".join(f"<li><a href='/category/{i}/'>Category {i}</a></li>" for i in range(80))
+    sidebar = "".join(f"<div class='widget'><a href='/{i}-older-episode/'>Episode {i}</a></div>" for i in range(60))
+    lines = []
+    for second in range(0, minutes * 60, 15):
+        speaker = rng.choice(["Ramit Sethi", "Guest"])
+        sentence = " ".join(rng.choice(words) for _ in range(rng.randint(12, 40)))
+        stamp = f"[{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}]"
+        lines.append(f"<p>{stamp} {speaker}: {sentence}.</p>")
+    return f"""<!DOCTYPE html><html><head><title>{episode_num}. Episode</title>{head}</head>
+<body><header class="site-header"><nav><ul>{nav}</ul></nav></header>
+<div class="site-content"><main id="main"><article class="post">
+<h1>{episode_num}. Episode</h1><div class="entry-content"><h2>Transcript</h2>{''.join(lines)}</div>
+</article></main><aside>{sidebar}</aside></div>
+<footer><script>window.dataLayer=[];</script><p>&copy; IWT</p></footer></body></html>""".encode('utf-8')
+
+def run_extraction(html, parser):
+    """Extract quietly, returning (transcript, found)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return extract_transcript_from_html(html, parser=parser)
+
+def benchmark(pages, parsers, repeat):
+    """Return {parser: (median_ms_per_page, peak_kib)}"""
+    results = {}
+    for parser in parsers:
+        timings = []
+        for _ in range(repeat):
+            for html in pages:
+                start = time.perf_counter()
+                run_extraction(html, parser)
+                timings.append((time.perf_counter() - start) * 1000)
+
+        peak = 0
+        for html in pages:
+            tracemalloc.start()
+            run_extraction(html, parser)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        results[parser] = (statistics.median(timings), peak / 1024)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transcript extraction parser backends")
+    parser.add_argument("pages", nargs="*", help="Saved episode HTML files (default: a synthetic page)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions per page (default: 5)")
+    parser.add_argument("--minutes", type=int, default=60, help="Length of the synthetic transcript (default: 60)")
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = []
+        for path in args.pages:
+            with open(path, 'rb') as f:
+                pages.append(f.read())
+    else:
+        pages = [synthetic_episode_page(minutes=args.minutes)]
+    print(f"Benchmarking {len(pages)} pages ({sum(len(p) for p in pages) / len(pages) / 1024:.0f} KiB average)")
+
+    # Every backend has to agree with the original html.parser output
+    for i, html in enumerate(pages, 1):
+        expected = run_extraction(html, 'html.parser')
+        for backend in PARSER_BACKENDS:
+            if run_extraction(html, backend) != expected:
+                print(f"  ✗ {backend} output differs from html.parser on page {i}")
+
+    results = benchmark(pages, PARSER_BACKENDS, args.repeat)
+    baseline_ms = results['html.parser'][0]
+    print("=" * 60)
+    print(f"{'parser':<16}{'ms/page':>10}{'speedup':>10}{'peak KiB':>12}")
+    for backend, (ms, peak_kib) in results.items():
+        print(f"{backend:<16}{ms:>10.1f}{baseline_ms / ms:>9.1f}x{peak_kib:>12.0f}")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark timestamp segmentation on long synthetic transcripts
+Compares the one-pass segmenter in transcript_segments.py with the lazy
+DOTALL regex the extractor used to run on whole-page text
+"""
+
+import argparse
+import random
+import re
+import statistics
+import time
+from transcript_segments import iter_section_spans, iter_sections
+
+LAZY_SECTION_PATTERN = r'\[\d{2}:\d{2}:\d{2}\].*?(?=\[\d{2}:\d{2}:\d{2}\]|$)'
+
+def synthetic_transcript(hours=3, seconds_per_segment=8, seed=0):
+    """Build get_text()-style transcript text covering `hours` of audio"""
+    rng = random.Random(seed)
+    words = ["money", "rich", "life", "spend", "save", "invest", "partner", "debt",
+             "house", "salary", "guilt", "travel", "budget", "family", "career", "really"]
+    lines = []
+    for second in range(0, hours * 3600, seconds_per_segment):
+        lines.append(f"[{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}]")
+        lines.append(rng.choice(["Ramit Sethi:", "Guest:"]))
+        lines.append(" ".join(rng.choice(words) for _ in range(rng.randint(10, 45))) + ".")
+    return "\n".join(lines)
+
+def time_call(func, repeat):
+    """Return (last result, median ms) over `repeat` calls"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark timestamp segmentation")
+    parser.add_argument("--hours", type=int, nargs="+", default=[1, 3, 6],
+                        help="Transcript lengths to test in hours (default: 1 3 6)")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per measurement (default: 5)")
+    args = parser.parse_args()
+
+    print("=" * 78)
+    print(f"{'hours':>5}{'KiB':>9}{'sections':>10}{'regex ms':>11}{'spans ms':>11}{'slices ms':>11}{'speedup':>9}  same")
+    for hours in args.hours:
+        text = synthetic_transcript(hours)
+        expected, regex_ms = time_call(lambda: re.findall(LAZY_SECTION_PATTERN, text, re.DOTALL), args.repeat)
+        spans, spans_ms = time_call(lambda: list(iter_section_spans(text)), args.repeat)
+        sections, slices_ms = time_call(lambda: list(iter_sections(text)), args.repeat)
+        same = sections == expected and len(spans) == len(expected)
+        print(f"{hours:>5}{len(text) / 1024:>9.0f}{len(expected):>10}{regex_ms:>11.2f}{spans_ms:>11.2f}"
+              f"{slices_ms:>11.2f}{regex_ms / slices_ms:>8.1f}x  {'✓' if same else '✗'}")
+    print("=" * 78)
+
+if __name__ == "__main__":
+    main()
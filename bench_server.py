@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Local WordPress stand-in for offline benchmarks
+Serves /wp-json/wp/v2/posts with WordPress-style pagination headers, the
+wp-sitemap.xml sitemaps and episode pages built from the HTML fixtures, for
+any number of synthetic episodes
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# WordPress rejects larger per_page values with a 400
+MAX_PER_PAGE = 100
+
+# WordPress core puts up to 2000 URLs in each sitemap
+SITEMAP_SIZE = 2000
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+WORDS = ["money", "rich", "life", "spend", "save", "invest", "partner", "debt",
+         "house", "salary", "guilt", "travel", "budget", "family", "career"]
+
+def synthetic_transcript_html(minutes, seed):
+    """Build transcript paragraphs with a [hh:mm:ss] marker every 15 seconds"""
+    rng = random.Random(seed)
+    lines = []
+    for second in range(0, minutes * 60, 15):
+        speaker = rng.choice(["Ramit Sethi", "Guest"])
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(12, 40)))
+        stamp = f"[{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}]"
+        lines.append(f"<p>{stamp} {speaker}: {sentence}.</p>")
+    return "\n".join(lines)
+
+def load_fixtures(fixtures_dir=FIXTURES_DIR):
+    """Read every .html fixture, sorted by name
+
+    Fixtures may use {{EPISODE}}, {{TITLE}}, {{URL}} and {{TRANSCRIPT}}
+    placeholders; recorded pages without them are served verbatim.
+    """
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, "*.html"))):
+        with open(path, 'r', encoding='utf-8') as f:
+            fixtures.append(f.read())
+    if not fixtures:
+        raise FileNotFoundError(f"No .html fixtures in {fixtures_dir}")
+    return fixtures
+
+class WordPressStandIn:
+    """Threaded HTTP server that looks like the site to the scrapers
+
+    Episodes are numbered from `episodes` down to 1, newest first, the
+    way the live API lists them. Set api_content to include transcripts
+    in the listing's content.rendered. latency adds a fixed delay to every
+    response. The sitemap index gives each post sitemap a <lastmod>, the way
+    SEO plugins do (core WordPress leaves it out).
+    """
+
+    def __init__(self, episodes=500, minutes=30, fixtures_dir=FIXTURES_DIR,
+                 api_content=False, latency=0.0, host="127.0.0.1", port=0, sitemap_size=SITEMAP_SIZE):
+        self.episodes = episodes
+        self.sitemap_size = sitemap_size
+        self.minutes = minutes
+        self.fixtures = load_fixtures(fixtures_dir)
+        self.api_content = api_content
+        self.latency = latency
+        self.edited = {}  # episode_num -> modified time set by touch()
+        self.failing_pages = set()  # Listing pages answered with a 500, to exercise failure handling
+        self.stats_lock = threading.Lock()
+        self.reset_stats()
+
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; don't let Nagle hold the body
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                standin.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self):
+        return f"{self.base_url}/wp-json/wp/v2/posts"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.stats = {'requests': 0, 'api_requests': 0, 'page_requests': 0, 'sitemap_requests': 0,
+                          'not_modified': 0, 'errors': 0, 'bytes_sent': 0}
+
+    def snapshot(self):
+        with self.stats_lock:
+            return dict(self.stats)
+
+    def count(self, kind, size):
+        with self.stats_lock:
+            self.stats['requests'] += 1
+            self.stats[kind] += 1
+            self.stats['bytes_sent'] += size
+
+    def slug(self, episode_num):
+        return f"{episode_num}-guest-{episode_num}"
+
+    def link(self, episode_num):
+        return f"{self.base_url}/{self.slug(episode_num)}/"
+
+    def title(self, episode_num):
+        return f"{episode_num}. Episode with Guest {episode_num}"
+
+    def episode_page(self, episode_num):
+        """Fill a fixture for one episode, cycling through the fixtures"""
+        page = self.fixtures[episode_num % len(self.fixtures)]
+        return (page.replace("{{EPISODE}}", str(episode_num))
+                    .replace("{{TITLE}}", self.title(episode_num))
+                    .replace("{{URL}}", self.link(episode_num))
+                    .replace("{{TRANSCRIPT}}", synthetic_transcript_html(self.minutes, episode_num))
+                    .encode('utf-8'))
+
+    def modified(self, episode_num):
+        return time.strftime('%Y-%m-%dT%H:%M:%S',
+                             time.gmtime(self.edited.get(episode_num, 1700000000 + episode_num * 86400)))
+
+    def touch(self, episode_num, when=None):
+        """Mark an episode as edited, bumping its modified time"""
+        self.edited[episode_num] = int(when or time.time())
+
+    def post(self, episode_num):
+        """One post object, shaped like the WordPress REST API"""
+        if self.api_content:
+            content = "<h2>Transcript</h2>\n" + synthetic_transcript_html(self.minutes, episode_num)
+        else:
+            content = f"<p>Show notes for episode {episode_num}.</p>"
+        return {
+            'id': 10000 + episode_num,
+            'date': '2024-01-01T00:00:00',
+            'modified': self.modified(episode_num),
+            'slug': self.slug(episode_num),
+            'status': 'publish',
+            'type': 'post',
+            'link': self.link(episode_num),
+            'title': {'rendered': self.title(episode_num)},
+            'content': {'rendered': content, 'protected': False},
+            'excerpt': {'rendered': f"<p>Show notes for episode {episode_num}.</p>", 'protected': False},
+            'categories': [7],
+            'tags': [],
+        }
+
+    def posts_page(self, query):
+        """Return (status, body, headers) for a posts listing request"""
+        try:
+            per_page = int(query.get('per_page', ['10'])[0])
+            page = int(query.get('page', ['1'])[0])
+        except ValueError:
+            return 400, json.dumps({'code': 'rest_invalid_param'}).encode(), {}
+        if not 1 <= per_page <= MAX_PER_PAGE or page < 1:
+            return 400, json.dumps({'code': 'rest_invalid_param'}).encode(), {}
+        if page in self.failing_pages:
+            return 500, json.dumps({'code': 'internal_server_error'}).encode(), {'Retry-After': '0'}
+
+        numbers = list(range(self.episodes, 0, -1))
+        modified_after = query.get('modified_after', [''])[0]
+        if modified_after:
+            numbers = [num for num in numbers if self.modified(num) > modified_after]
+        if query.get('orderby', [''])[0] == 'modified':
+            numbers.sort(key=self.modified, reverse=query.get('order', ['desc'])[0] != 'asc')
+
+        total_pages = -(-len(numbers) // per_page)
+        if page > max(1, total_pages):
+            return 400, json.dumps({'code': 'rest_post_invalid_page_number'}).encode(), {}
+
+        posts = [self.post(num) for num in numbers[(page - 1) * per_page:page * per_page]]
+        fields = query.get('_fields', [''])[0]
+        if fields:
+            keep = fields.split(',')
+            posts = [{key: post[key] for key in keep if key in post} for post in posts]
+        headers = {'X-WP-Total': str(len(numbers)), 'X-WP-TotalPages': str(total_pages)}
+        return 200, json.dumps(posts).encode('utf-8'), headers
+
+    def sitemap(self, name):
+        """Return the body of wp-sitemap.xml or one of its sitemaps, or None"""
+        def lastmod(numbers):
+            return max(self.modified(num) for num in numbers) + "+00:00"
+
+        # Oldest posts first, like WordPress core
+        numbers = list(range(1, self.episodes + 1))
+        chunks = [numbers[i:i + self.sitemap_size] for i in range(0, len(numbers), self.sitemap_size)]
+        if name == "wp-sitemap.xml":
+            entries = [f"<sitemap><loc>{self.base_url}/wp-sitemap-posts-post-{i}.xml</loc>"
+                       f"<lastmod>{lastmod(chunk)}</lastmod></sitemap>" for i, chunk in enumerate(chunks, 1)]
+            entries.append(f"<sitemap><loc>{self.base_url}/wp-sitemap-posts-page-1.xml</loc></sitemap>")
+            entries.append(f"<sitemap><loc>{self.base_url}/wp-sitemap-users-1.xml</loc></sitemap>")
+            return (f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">'
+                    + "".join(entries) + "</sitemapindex>").encode('utf-8')
+        if name == "wp-sitemap-posts-page-1.xml":
+            urls = [f"<url><loc>{self.base_url}/podcast/</loc></url>"]
+        elif name == "wp-sitemap-users-1.xml":
+            urls = [f"<url><loc>{self.base_url}/author/ramit/</loc></url>"]
+        else:
+            index = name[len("wp-sitemap-posts-post-"):-len(".xml")] if name.startswith("wp-sitemap-posts-post-") else ""
+            if not index.isdigit() or not 1 <= int(index) <= len(chunks):
+                return None
+            urls = [f"<url><loc>{self.link(num)}</loc><lastmod>{self.modified(num)}+00:00</lastmod></url>"
+                    for num in chunks[int(index) - 1]]
+        return (f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">'
+                + "".join(urls) + "</urlset>").encode('utf-8')
+
+    def handle(self, request):
+        if self.latency:
+            time.sleep(self.latency)
+
+        url = urlparse(request.path)
+        headers = {}
+        kind = 'page_requests'
+        if url.path.rstrip('/') == "/wp-json/wp/v2/posts":
+            kind = 'api_requests'
+            status, body, headers = self.posts_page(parse_qs(url.query))
+            content_type = "application/json; charset=UTF-8"
+        elif url.path.endswith(".xml"):
+            kind = 'sitemap_requests'
+            status, body = 200, self.sitemap(url.path.strip('/'))
+            if body is None:
+                status, body = 404, b"<?xml version=\"1.0\"?><error>Not found</error>"
+            content_type = "application/xml; charset=UTF-8"
+        else:
+            episode_num = url.path.strip('/').split('-', 1)[0]
+            if episode_num.isdigit() and 1 <= int(episode_num) <= self.episodes:
+                status, body = 200, self.episode_page(int(episode_num))
+            else:
+                status, body = 404, b"<html><body><h1>Page not found</h1></body></html>"
+            content_type = "text/html; charset=UTF-8"
+
+        if status == 200:
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            headers['ETag'] = etag
+            if request.headers.get('If-None-Match') == etag:
+                status, body = 304, b""
+                kind = 'not_modified'
+        elif status >= 400:
+            kind = 'errors'
+
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(body)
+        self.count(kind, len(body))
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local WordPress stand-in for offline benchmarks")
+    parser.add_argument("--episodes", type=int, default=500, help="Number of synthetic episodes (default: 500)")
+    parser.add_argument("--minutes", type=int, default=30, help="Length of each synthetic transcript (default: 30)")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Directory of .html fixtures (default: fixtures/)")
+    parser.add_argument("--api-content", action="store_true", help="Include transcripts in the API listing content")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to delay every response (default: 0)")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080)")
+    args = parser.parse_args()
+
+    standin = WordPressStandIn(episodes=args.episodes, minutes=args.minutes, fixtures_dir=args.fixtures,
+                               api_content=args.api_content, latency=args.latency, port=args.port)
+    print(f"Serving {args.episodes} episodes at {standin.base_url}")
+    print(f"API: {standin.api_url}")
+    try:
+        standin.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.server.server_close()
+        print(f"Served: {standin.snapshot()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Offline throughput benchmark for the scrapers
+Runs scrape_all_transcripts and scrape_batches against the local WordPress
+stand-in and reports episodes/sec, bytes/sec, parse ms/page and peak RSS.
+Each scenario runs in its own process so peak RSS is per scenario.
+Optionally times archive re-extraction across process counts.
+"""
+
+import argparse
+import contextlib
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from bench_server import WordPressStandIn, FIXTURES_DIR
+from rate_controller import RateController
+import scraper_base
+from transcript_reader import read_combined_transcripts
+from transcript_extractor import PARSER_BACKENDS, DEFAULT_PARSER
+
+SCENARIOS = ['podcast', 'batch']
+
+def timed(func, timings):
+    """Wrap a module-level extraction function to record its wall time"""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings.append(time.perf_counter() - start)
+    return wrapper
+
+def configure(scraper, args, output_dir, timings):
+    """Point a scraper at the stand-in and turn off politeness delays"""
+    scraper.base_url = args.base_url
+    scraper.podcast_url = f"{args.base_url}/podcast/"
+    scraper.api_url = f"{args.base_url}/wp-json/wp/v2/posts"
+    scraper.rate_controller = RateController(start_delay=0, min_delay=0)
+    scraper.output_dir = output_dir
+    scraper.parser = args.parser
+    scraper.use_api_content = args.api_content
+    scraper.export_segments = args.segments
+    # Both scrapers extract through scraper_base
+    scraper_base.extract_transcript_from_html = timed(scraper_base.extract_transcript_from_html, timings)
+    scraper_base.extract_transcript_from_api_content = timed(scraper_base.extract_transcript_from_api_content, timings)
+
+def run_scenario(args):
+    """Run one scenario in this process and return its measurements"""
+    timings = []
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmp_dir:
+        output_dir = os.path.join(tmp_dir, "transcripts")
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            if args.scenario == 'podcast':
+                import podcast_scraper
+                scraper = podcast_scraper.PodcastScraper(concurrency=args.concurrency, cache_dir=None, rate_state=None,
+                                                         archive_dir=None, db_path=None)
+                configure(scraper, args, output_dir, timings)
+                scraper.scrape_all_transcripts(max_episodes=args.episodes)
+            else:
+                import batch_scraper
+                scraper = batch_scraper.BatchPodcastScraper(
+                    concurrency=args.concurrency, cache_dir=None, rate_state=None, archive_dir=None, db_path=None,
+                    manifest_path=os.path.join(tmp_dir, "manifest.json")
+                )
+                configure(scraper, args, output_dir, timings)
+                scraper.batch_delay = 0
+                scraper.scrape_batches(batch_size=args.batch_size)
+            elapsed = time.perf_counter() - start
+
+        episodes = 0
+        for path in glob.glob(os.path.join(output_dir, "*.txt")):
+            episodes += sum(1 for _ in read_combined_transcripts(path))
+
+    return {
+        'elapsed': elapsed,
+        'episodes': episodes,
+        'parsed_pages': len(timings),
+        'parse_ms': sum(timings) * 1000,
+        'peak_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+def run_reextract_scaling(args):
+    """Archive one scrape, then time reextract() at each worker count"""
+    import podcast_scraper
+    from reextract import reextract
+    timings = {}
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmp_dir:
+        archive_dir = os.path.join(tmp_dir, "archive")
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            scraper = podcast_scraper.PodcastScraper(concurrency=args.concurrency, cache_dir=None,
+                                                     rate_state=None, archive_dir=archive_dir, db_path=None)
+            configure(scraper, podcast_scraper, args, os.path.join(tmp_dir, "scraped"), [])
+            scraper.scrape_all_transcripts(max_episodes=args.episodes)
+            outputs = {}
+            for workers in args.reextract_workers:
+                start = time.perf_counter()
+                path = reextract(archive_dir=archive_dir, output_dir=os.path.join(tmp_dir, f"re-{workers}"),
+                                 parser=args.parser, use_api_content=args.api_content,
+                                 export_segments=args.segments, workers=workers)
+                timings[workers] = time.perf_counter() - start
+                with open(path, 'rb') as f:
+                    outputs[workers] = f.read()
+    same = len(set(outputs.values())) == 1
+    return {'seconds': timings, 'same_output': same}
+
+def spawn_scenario(args, scenario, base_url):
+    """Run a scenario in a fresh interpreter and return its result dict"""
+    command = [sys.executable, os.path.abspath(__file__), "--worker", scenario, "--base-url", base_url,
+               "--episodes", str(args.episodes), "--concurrency", str(args.concurrency),
+               "--batch-size", str(args.batch_size), "--parser", args.parser]
+    if args.reextract_workers:
+        command += ["--reextract-workers", ",".join(str(w) for w in args.reextract_workers)]
+    if args.api_content:
+        command.append("--api-content")
+    if args.segments:
+        command.append("--segments")
+    completed = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against a local WordPress stand-in")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated scenarios to run (default: {','.join(SCENARIOS)})")
+    parser.add_argument("--episodes", type=int, default=200, help="Number of synthetic episodes (default: 200)")
+    parser.add_argument("--minutes", type=int, default=30, help="Length of each synthetic transcript (default: 30)")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Directory of .html fixtures (default: fixtures/)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the server delays each response (default: 0)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Scraper concurrency (default: 1)")
+    parser.add_argument("--batch-size", type=int, default=20, help="Batch size for the batch scenario (default: 20)")
+    parser.add_argument("--parser", choices=PARSER_BACKENDS, default=DEFAULT_PARSER,
+                        help=f"HTML parser backend (default: {DEFAULT_PARSER})")
+    parser.add_argument("--api-content", action="store_true",
+                        help="Serve transcripts in the API listing and let the scrapers use them")
+    parser.add_argument("--segments", action="store_true", help="Also write segment files")
+    parser.add_argument("--reextract-workers",
+                        type=lambda value: [int(w) for w in value.split(',') if w.strip()],
+                        help="Also time archive re-extraction with these process counts, e.g. 1,2,4")
+    # Internal: run one scenario against an already running server
+    parser.add_argument("--worker", choices=SCENARIOS + ['reextract'], help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        args.scenario = args.worker
+        result = run_reextract_scaling(args) if args.worker == 'reextract' else run_scenario(args)
+        print(json.dumps(result))
+        return
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    for name in scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario: {name}")
+
+    with WordPressStandIn(episodes=args.episodes, minutes=args.minutes, fixtures_dir=args.fixtures,
+                          api_content=args.api_content, latency=args.latency) as standin:
+        print(f"Stand-in serving {args.episodes} episodes ({args.minutes} min transcripts) at {standin.base_url}")
+        print("=" * 86)
+        print(f"{'scenario':<10}{'episodes':>10}{'seconds':>10}{'eps/sec':>10}{'MiB/sec':>10}"
+              f"{'requests':>10}{'parse ms/pg':>13}{'peak RSS MiB':>13}")
+        for name in scenarios:
+            standin.reset_stats()
+            result = spawn_scenario(args, name, standin.base_url)
+            served = standin.snapshot()
+            elapsed = max(result['elapsed'], 1e-9)
+            parse_ms = result['parse_ms'] / max(result['parsed_pages'], 1)
+            print(f"{name:<10}{result['episodes']:>10}{elapsed:>10.2f}{result['episodes'] / elapsed:>10.1f}"
+                  f"{served['bytes_sent'] / elapsed / 1048576:>10.2f}{served['requests']:>10}"
+                  f"{parse_ms:>13.2f}{result['peak_rss_kib'] / 1024:>13.1f}")
+            if result['episodes'] != args.episodes:
+                print(f"  ✗ expected {args.episodes} episodes, got {result['episodes']}")
+        print("=" * 86)
+
+        if args.reextract_workers:
+            result = spawn_scenario(args, 'reextract', standin.base_url)
+            seconds = {int(workers): elapsed for workers, elapsed in result['seconds'].items()}
+            baseline = seconds[min(seconds)]
+            print(f"Re-extraction from the archive ({os.cpu_count()} cores available):")
+            print(f"{'workers':>10}{'seconds':>10}{'eps/sec':>10}{'speedup':>10}")
+            for workers, elapsed in sorted(seconds.items()):
+                print(f"{workers:>10}{elapsed:>10.2f}{args.episodes / elapsed:>10.1f}{baseline / elapsed:>9.1f}x")
+            print("✓ Same output at every worker count" if result['same_output']
+                  else "✗ Output differs between worker counts")
+
+if __name__ == "__main__":
+    main()
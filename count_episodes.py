@@ -5,72 +5,99 @@ Script to count the total number of episodes available
 
 import requests
 import re
+import os
 import time
+import argparse
+import threading
+from episode_db import EpisodeDB
+from wp_api import iter_api_pages, listing_params
 
-def count_all_episodes():
-    api_url = "https://www.iwillteachyoutoberich.com/wp-json/wp/v2/posts"
-    
+def count_all_episodes(concurrency=4, api_url="https://www.iwillteachyoutoberich.com/wp-json/wp/v2/posts",
+                       categories=None, tags=None, db=None):
     session = requests.Session()
     session.headers.update({
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
     })
     
     all_episodes = []
-    page = 1
-    max_pages = 20  # Limit to avoid infinite loops
+    per_page = 100
+    
+    # Requests from every worker share one 1 second spacing
+    rate_lock = threading.Lock()
+    last_request = [0]
+    
+    def request_page(page):
+        with rate_lock:
+            wait = 1 - (time.time() - last_request[0])
+            if wait > 0:
+                time.sleep(wait)  # Be respectful
+            last_request[0] = time.time()
+        print(f"Fetching page {page}...")
+        params = listing_params(per_page, page, categories=categories, tags=tags)
+        response = session.get(api_url, params=params, timeout=30)
+        if response.status_code != 200:
+            print(f"Error on page {page}: {response.status_code}")
+            return None
+        return response
     
     print("Counting all episodes...")
     
-    while page <= max_pages:
-        try:
-            print(f"Fetching page {page}...")
-            response = session.get(api_url, params={'per_page': 100, 'page': page})
-            
-            if response.status_code != 200:
-                print(f"Error on page {page}: {response.status_code}")
-                break
-            
-            data = response.json()
+    failed_pages = []
+    for page, data in iter_api_pages(request_page, per_page, concurrency=concurrency, failed_pages=failed_pages):
+        print(f"Found {len(data)} posts on page {page}")
+        
+        # Count episodes on this page
+        page_episodes = 0
+        discovered = []
+        for post in data:
+            title = post.get('title', {}).get('rendered', '').lower()
+            slug = post.get('slug', '').lower()
+            link = post.get('link', '')
             
-            if not data:  # No more posts
-                print(f"No more posts found on page {page}")
-                break
-            
-            print(f"Found {len(data)} posts on page {page}")
-            
-            # Count episodes on this page
-            page_episodes = 0
-            for post in data:
-                title = post.get('title', {}).get('rendered', '').lower()
-                slug = post.get('slug', '').lower()
-                link = post.get('link', '')
+            # Check if this looks like a podcast episode
+            if ('episode' in title or 'episode' in slug or 
+                re.search(r'\d+', slug) or 
+                'podcast' in title or 'podcast' in slug):
                 
-                # Check if this looks like a podcast episode
-                if ('episode' in title or 'episode' in slug or 
-                    re.search(r'\d+', slug) or 
-                    'podcast' in title or 'podcast' in slug):
-                    
-                    episode_num = re.search(r'/(\d+)-', link)
-                    if episode_num:
-                        episode_num = int(episode_num.group(1))
-                        all_episodes.append((episode_num, link, title))
-                        page_episodes += 1
-            
-            print(f"  Found {page_episodes} episodes on page {page}")
-            
-            if len(data) < 100:  # Last page
-                print(f"Last page reached (only {len(data)} posts)")
-                break
-            
-            page += 1
-            time.sleep(1)  # Be respectful
-            
-        except Exception as e:
-            print(f"Error on page {page}: {e}")
-            break
+                episode_num = re.search(r'/(\d+)-', link)
+                if episode_num:
+                    episode_num = int(episode_num.group(1))
+                    all_episodes.append((episode_num, link, title))
+                    discovered.append((episode_num, link, post.get('id'),
+                                       post.get('title', {}).get('rendered', ''), post.get('modified')))
+                    page_episodes += 1
+        
+        if db and discovered:
+            db.add_episodes(discovered)
+        print(f"  Found {page_episodes} episodes on page {page}")
     
     # Sort episodes by number
     all_episodes.sort(key=lambda x: x[0], reverse=True)
+    print_episode_summary(all_episodes)
+    if failed_pages:
+        print(f"Warning: count is incomplete, failed to fetch pages {failed_pages}")
+    return all_episodes
+
+def count_local_episodes(db_path, start_episode=None, end_episode=None):
+    """Count episodes from the scrapers' database instead of the API"""
+    if not os.path.exists(db_path):
+        print(f"No episode database at {db_path} - run a scraper or count_episodes.py without --local first")
+        return []
+    started = time.perf_counter()
+    db = EpisodeDB(db_path)
+    all_episodes = db.episodes(start_episode, end_episode)
+    counts = db.status_counts()
+    db.close()
+    print(f"Read {db_path} in {(time.perf_counter() - started) * 1000:.1f} ms")
+    print(f"Scrape status: " + ", ".join(f"{status} {count}" for status, count in sorted(counts.items())))
+    print_episode_summary(all_episodes)
+    return all_episodes
+
+def print_episode_summary(all_episodes):
+    """Print the total, range, first and last ten of (episode_num, link, title) sorted highest first"""
+    if not all_episodes:
+        print("No episodes found")
+        return
     
     print(f"\n" + "="*60)
     print(f"TOTAL EPISODES FOUND: {len(all_episodes)}")
@@ -84,8 +111,30 @@ def count_all_episodes():
     print(f"\nLast 10 episodes:")
     for i, (episode_num, link, title) in enumerate(all_episodes[-10:]):
         print(f"{len(all_episodes)-9+i:2d}. Episode {episode_num}: {title[:60]}...")
-    
-    return all_episodes
+
+def main():
+    parser = argparse.ArgumentParser(description="Count the podcast episodes available")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Number of API pages to fetch in parallel (default: 4)")
+    parser.add_argument("--categories", help="Comma-separated category IDs to restrict the count to")
+    parser.add_argument("--tags", help="Comma-separated tag IDs to restrict the count to")
+    parser.add_argument("--local", action="store_true",
+                        help="Count from the episode database instead of paging the API")
+    parser.add_argument("--start", type=int, help="With --local, only count episodes >= this number")
+    parser.add_argument("--end", type=int, help="With --local, only count episodes <= this number")
+    parser.add_argument("--db", default="transcripts/.episodes.db",
+                        help="Episode database to read with --local and update otherwise (default: transcripts/.episodes.db)")
+    parser.add_argument("--no-db", action="store_true", help="Don't record counted episodes in the database")
+    args = parser.parse_args()
+    if args.local:
+        count_local_episodes(args.db, start_episode=args.start, end_episode=args.end)
+        return
+    if args.start or args.end:
+        parser.error("--start/--end need --local")
+    db = None if args.no_db else EpisodeDB(args.db)
+    count_all_episodes(concurrency=args.concurrency, categories=args.categories, tags=args.tags, db=db)
+    if db:
+        db.close()
 
 if __name__ == "__main__":
-    count_all_episodes() 
\ No newline at end of file
+    main() 
\ No newline at end of file
@@ -6,6 +6,7 @@ Debug script to test transcript extraction from a single episode page
 import requests
 from bs4 import BeautifulSoup
 import re
+from transcript_segments import iter_section_spans
 
 def debug_transcript_extraction():
     url = "https://www.iwillteachyoutoberich.com/217-dominique-chris-1/"
@@ -73,10 +74,11 @@ def debug_transcript_extraction():
             # Also check for any text that contains timestamps
             print(f"\nSearching entire page for timestamps...")
             all_text = soup.get_text()
-            timestamp_matches = re.findall(r'\[\d{2}:\d{2}:\d{2}\].*?(?=\[\d{2}:\d{2}:\d{2}\]|$)', all_text, re.DOTALL)
-            if timestamp_matches:
-                print(f"Found {len(timestamp_matches)} timestamp sections")
-                print(f"First match: {timestamp_matches[0][:200]}...")
+            section_spans = list(iter_section_spans(all_text))
+            if section_spans:
+                start, end = section_spans[0]
+                print(f"Found {len(section_spans)} timestamp sections")
+                print(f"First match: {all_text[start:end][:200]}...")
                 return all_text
             
             print("No transcript content found")
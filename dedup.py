@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate and boilerplate detection across scraped episodes
+MinHash signatures with LSH banding find episodes whose text mostly
+overlaps without comparing every pair, and lines repeated across many
+episodes are flagged as boilerplate (show notes, sponsor reads, theme text)
+"""
+
+import argparse
+import contextlib
+import json
+import time
+import zlib
+from collections import defaultdict
+from search_index import catalog_episodes, newest_episodes, tokenize
+from transcript_reader import TranscriptFile
+from transcript_segments import TIMESTAMP_PATTERN, parse_segments
+from transcript_writer import CombinedTranscriptWriter
+
+SHINGLE_WORDS = 5
+NUM_PERM = 128
+EMPTY_BIN = 1 << 32
+
+def episode_text(episode_num, transcript):
+    """Spoken text only, without [hh:mm:ss] markers or speaker labels"""
+    texts = [segment.text for segment in parse_segments(episode_num, transcript)]
+    return "\n".join(texts) if texts else TIMESTAMP_PATTERN.sub(" ", transcript)
+
+def shingle_hashes(text, size=SHINGLE_WORDS):
+    """crc32 hashes of every run of `size` consecutive words"""
+    words = tokenize(text)
+    if len(words) < size:
+        return {zlib.crc32(" ".join(words).encode('utf-8'))} if words else set()
+    return {zlib.crc32(" ".join(words[i:i + size]).encode('utf-8')) for i in range(len(words) - size + 1)}
+
+def minhash_signature(shingles, num_perm=NUM_PERM):
+    """One-permutation MinHash with rotation densification
+
+    Each shingle hash lands in one of num_perm bins by its low bits and
+    only the minimum of the rest is kept, so a signature costs one pass over
+    the shingles instead of num_perm. Empty bins borrow from the next
+    non-empty bin (plus a per-step offset), which keeps two signatures'
+    agreement rate an estimate of their Jaccard similarity. Returns None
+    for text without shingles.
+    """
+    if not shingles:
+        return None
+    bins = [EMPTY_BIN] * num_perm
+    for shingle in shingles:
+        slot = shingle % num_perm
+        value = shingle // num_perm
+        if value < bins[slot]:
+            bins[slot] = value
+    if EMPTY_BIN in bins:
+        filled = list(bins)
+        for i in range(num_perm):
+            if bins[i] == EMPTY_BIN:
+                step = 1
+                while bins[(i + step) % num_perm] == EMPTY_BIN:
+                    step += 1
+                filled[i] = bins[(i + step) % num_perm] + step * EMPTY_BIN
+        bins = filled
+    return tuple(bins)
+
+def estimated_similarity(a, b):
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+def lsh_params(num_perm, threshold):
+    """Pick (bands, rows) with bands * rows = num_perm whose S-curve midpoint
+    (1/bands) ** (1/rows) is the highest one not above threshold
+
+    Staying below the threshold trades extra candidate checks (which are
+    verified anyway) for not missing pairs just above it.
+    """
+    options = [(bands, num_perm // bands) for bands in range(1, num_perm + 1) if num_perm % bands == 0]
+    midpoint = lambda option: (1 / option[0]) ** (1 / option[1])
+    below = [option for option in options if midpoint(option) <= threshold]
+    return max(below, key=midpoint) if below else min(options, key=midpoint)
+
+def find_near_duplicates(signatures, threshold=0.8, num_perm=NUM_PERM):
+    """Group keys whose signatures estimate Jaccard similarity >= threshold
+
+    Only keys sharing at least one LSH band bucket are compared, so the
+    work grows with the number of likely duplicates rather than with every
+    pair. Returns (clusters, pairs): clusters of two or more keys, and the
+    (key, key, similarity) pairs that joined them.
+    """
+    bands, rows = lsh_params(num_perm, threshold)
+    buckets = defaultdict(list)
+    for key, signature in signatures.items():
+        if signature is None:
+            continue
+        for band in range(bands):
+            buckets[(band, signature[band * rows:(band + 1) * rows])].append(key)
+
+    parent = {key: key for key in signatures}
+
+    def find(key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    compared = set()
+    pairs = []
+    for members in buckets.values():
+        for i in range(len(members)):
+            for j in range(i + 1, len(members)):
+                pair = (members[i], members[j])
+                if pair in compared:
+                    continue
+                compared.add(pair)
+                similarity = estimated_similarity(signatures[pair[0]], signatures[pair[1]])
+                if similarity >= threshold:
+                    pairs.append((pair[0], pair[1], similarity))
+                    parent[find(pair[0])] = find(pair[1])
+
+    clusters = defaultdict(list)
+    for key in signatures:
+        clusters[find(key)].append(key)
+    return [members for members in clusters.values() if len(members) > 1], pairs
+
+def normalize_line(line):
+    return " ".join(tokenize(TIMESTAMP_PATTERN.sub(" ", line)))
+
+def find_boilerplate(transcripts, min_episodes=3, min_fraction=0.05, min_words=8):
+    """Return {hash of normalized line: episode count} for lines repeated across episodes
+
+    A line counts as boilerplate when it has at least min_words words and
+    appears in at least max(min_episodes, min_fraction of all episodes).
+    transcripts is any iterable and is read once; lines are counted by
+    hash(), so memory grows with the number of distinct lines rather than
+    their text.
+    """
+    counts = defaultdict(int)
+    episodes = 0
+    for transcript in transcripts:
+        episodes += 1
+        lines = {normalize_line(line) for line in transcript.splitlines()}
+        for line in lines:
+            if line.count(" ") + 1 >= min_words:
+                counts[hash(line)] += 1
+    cutoff = max(min_episodes, int(min_fraction * episodes))
+    return {line_hash: count for line_hash, count in counts.items() if count >= cutoff}
+
+def strip_boilerplate(transcript, boilerplate):
+    """Drop every line of transcript that normalizes to a boilerplate line"""
+    return "\n".join(line for line in transcript.splitlines() if normalize_line(line) not in boilerplate)
+
+def iter_transcripts(transcripts_dir):
+    """Yield (key, episode_num, url, transcript) for the newest copy of every episode, one at a time"""
+    for key, episode_num, url, path, content_hash, transcript in catalog_episodes(transcripts_dir):
+        yield key, episode_num, url, transcript
+
+def keep_order(key, episodes):
+    """Sort key for picking a cluster's representative: the earliest episode"""
+    episode_num = episodes[key][0]
+    return (episode_num is None, episode_num or 0, key)
+
+def analyze(transcripts_dir, threshold=0.8, min_episodes=3, min_fraction=0.05):
+    """Find boilerplate lines, then near-duplicate episodes once it's removed
+
+    Boilerplate is stripped before hashing so shared show notes don't make
+    otherwise different episodes look alike. The transcripts are streamed
+    twice, once to count lines and once to sign them, and only signatures
+    and episode numbers are kept. Returns (episodes, boilerplate, clusters,
+    pairs) with episodes as {key: (episode_num, url)}.
+    """
+    boilerplate_hashes = find_boilerplate((transcript for *_, transcript in iter_transcripts(transcripts_dir)),
+                                          min_episodes=min_episodes, min_fraction=min_fraction)
+    boilerplate = {}
+    episodes = {}
+    signatures = {}
+    for key, episode_num, url, transcript in iter_transcripts(transcripts_dir):
+        episodes[key] = (episode_num, url)
+        if boilerplate_hashes:
+            kept = []
+            for line in transcript.splitlines():
+                normalized = normalize_line(line)
+                count = boilerplate_hashes.get(hash(normalized))
+                if count:
+                    boilerplate[normalized] = count
+                else:
+                    kept.append(line)
+            transcript = "\n".join(kept)
+        signatures[key] = minhash_signature(shingle_hashes(episode_text(episode_num, transcript)))
+    clusters, pairs = find_near_duplicates(signatures, threshold=threshold)
+    clusters = [sorted(members, key=lambda key: keep_order(key, episodes)) for members in clusters]
+    return episodes, boilerplate, clusters, pairs
+
+def write_clean(transcripts_dir, output_dir, dropped, boilerplate):
+    """Write every episode not in dropped, boilerplate removed, newest first like the scrapers
+
+    Episodes are read one at a time from their combined files. Returns the
+    path written and the number of episodes in it.
+    """
+    newest = [episode for episode in newest_episodes(transcripts_dir) if episode[0] not in dropped]
+    newest.sort(key=lambda episode: 0 if episode[1] is None else -episode[1])
+    written = 0
+    with contextlib.ExitStack() as stack, CombinedTranscriptWriter(output_dir) as writer:
+        files = {path: stack.enter_context(TranscriptFile(path)) for path in {episode[3] for episode in newest}}
+        for key, episode_num, url, path, i, length in newest:
+            transcript = files[path].transcript_at(i)
+            cleaned = strip_boilerplate(transcript, boilerplate).strip() if boilerplate else transcript
+            if cleaned:
+                writer.add(url, cleaned)
+                written += 1
+        filepath = writer.close()
+    return filepath, written
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag near-duplicate episodes and boilerplate lines in scraped transcripts")
+    parser.add_argument("--transcripts-dir", default="transcripts", help="Combined files to check (default: transcripts)")
+    parser.add_argument("--threshold", type=float, default=0.8,
+                        help="Estimated Jaccard similarity at which episodes count as duplicates (default: 0.8)")
+    parser.add_argument("--boilerplate-min", type=int, default=3,
+                        help="Episodes a line must appear in to count as boilerplate (default: 3, or 5%% of episodes if more)")
+    parser.add_argument("--report", help="Write the duplicate clusters and boilerplate lines to this JSON file")
+    parser.add_argument("--write-clean", metavar="DIR",
+                        help="Write one combined file with boilerplate removed and one episode per duplicate cluster")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    episodes, boilerplate, clusters, pairs = analyze(args.transcripts_dir, threshold=args.threshold,
+                                                     min_episodes=args.boilerplate_min)
+    if not episodes:
+        print(f"No episodes found in {args.transcripts_dir}")
+        return
+    print(f"Checked {len(episodes)} episodes in {time.perf_counter() - start:.1f}s")
+
+    print(f"\n{len(boilerplate)} boilerplate lines:")
+    for line, count in sorted(boilerplate.items(), key=lambda item: -item[1])[:20]:
+        print(f"  {count:4d} episodes: {line[:100]}")
+
+    similarity = {frozenset((a, b)): value for a, b, value in pairs}
+    print(f"\n{len(clusters)} near-duplicate clusters:")
+    for members in clusters:
+        keep = members[0]
+        print(f"  keep episode {keep}, duplicates: " + ", ".join(
+            f"{key} ({similarity.get(frozenset((keep, key)), 0):.2f})" for key in members[1:]))
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'boilerplate': boilerplate, 'clusters': clusters,
+                       'pairs': [list(pair) for pair in pairs]}, f, indent=1)
+        print(f"\nWrote report to: {args.report}")
+
+    if args.write_clean:
+        dropped = {key for members in clusters for key in members[1:]}
+        filepath, written = write_clean(args.transcripts_dir, args.write_clean, dropped, boilerplate)
+        print(f"Wrote {written} deduplicated episodes to: {filepath}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Local catalog of the WordPress post listing for incremental syncs
+Remembers each episode post's id, link, episode number and modified time,
+so a sync run only asks the API for posts modified since the last one, or
+only reads the sitemaps whose <lastmod> moved
+"""
+
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+# Re-list posts modified this long before the high-water mark, so edits
+# landing in the same second as the last sync aren't missed
+OVERLAP_SECONDS = 1
+
+WP_DATE_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+class EpisodeCatalog:
+    """Post id -> {link, episode, modified, status} plus a high-water mark
+
+    The high-water mark is the newest `modified` time fully synced. Listings
+    are sorted by modified time, oldest first, so a run that stops early
+    still leaves everything after the mark for the next one.
+
+    Sitemap syncs key posts by link with their UTC <lastmod>, which isn't
+    comparable to the API's site-local `modified`, so they leave the mark
+    alone and record each sub-sitemap's lastmod instead.
+    """
+
+    def __init__(self, path="transcripts/.episode_catalog.json"):
+        self.path = path
+        self.data = {'high_water': None, 'synced_at': None, 'posts': {}, 'sitemaps': {}}
+        self.listed = {}  # post id -> listing entry seen this run that needs syncing
+        self.newest_listed = None
+        self.from_sitemap = set()  # listed post ids that came from a sitemap, not the API
+        self.read_sitemaps = {}  # sub-sitemap url -> lastmod read this run
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.data.update(json.load(f))
+                print(f"Loaded episode catalog: {self.path} ({len(self.data['posts'])} posts, "
+                      f"synced up to {self.data['high_water'] or 'never'})")
+            except (OSError, ValueError) as e:
+                print(f"Could not read episode catalog {self.path}: {e}")
+
+    def save(self):
+        """Write the catalog atomically"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def sync_params(self):
+        """Listing params for an incremental sync: oldest modification first,
+        starting just before the high-water mark"""
+        params = {'orderby': 'modified', 'order': 'asc'}
+        high_water = self.data['high_water']
+        if high_water:
+            since = datetime.strptime(high_water, WP_DATE_FORMAT) - timedelta(seconds=OVERLAP_SECONDS)
+            params['modified_after'] = since.strftime(WP_DATE_FORMAT)
+        return params
+
+    def note(self, post, episode_num, from_sitemap=False):
+        """Record a listed episode post; True if it is new or edited since its last sync"""
+        post_id = str(post.get('id') or post.get('link'))
+        modified = post.get('modified')
+        if from_sitemap:
+            self.from_sitemap.add(post_id)
+        elif modified and (self.newest_listed is None or modified > self.newest_listed):
+            self.newest_listed = modified
+        known = self.data['posts'].get(post_id)
+        if known and known['status'] == 'done' and known['modified'] == modified:
+            return False
+        self.listed[post_id] = {'link': post.get('link', ''), 'episode': episode_num, 'modified': modified}
+        return True
+
+    def synced_sitemaps(self):
+        """Sub-sitemap url -> lastmod as of the last complete sitemap sync"""
+        return self.data['sitemaps']
+
+    def note_sitemaps(self, read):
+        """Record the sub-sitemaps read this run, saved by commit() once all their posts are synced"""
+        self.read_sitemaps.update(read)
+
+    def retry_links(self):
+        """(episode_num, link) for posts whose last sync failed and that weren't listed again"""
+        return [(post['episode'], post['link']) for post_id, post in self.data['posts'].items()
+                if post['status'] == 'failed' and post_id not in self.listed]
+
+    def commit(self, attempted, saved, complete=True):
+        """Record the outcome of a sync run and move the high-water mark
+
+        attempted and saved are collections of links. Saved posts are done;
+        attempted but unsaved ones are kept as failed and retried by link on
+        the next sync. Listed posts that weren't attempted at all (filtered
+        out or cut off by a limit) hold the mark back so they're listed again.
+        complete=False means listing pages failed, so posts on them were never
+        seen; the mark stays put and the next sync lists them again.
+        """
+        now = time.time()
+        pending = []
+        unattempted = 0
+        for post_id, post in self.listed.items():
+            if post['link'] in saved:
+                self.data['posts'][post_id] = dict(post, status='done', synced_at=now)
+            elif post['link'] in attempted:
+                self.data['posts'][post_id] = dict(post, status='failed', synced_at=now)
+            else:
+                unattempted += 1
+                if post['modified'] and post_id not in self.from_sitemap:
+                    pending.append(post['modified'])
+        for post in self.data['posts'].values():
+            if post['status'] == 'failed' and post['link'] in saved:
+                post.update(status='done', synced_at=now)
+
+        candidates = [mark for mark in (self.data['high_water'], self.newest_listed) if mark]
+        high_water = max(candidates) if candidates else None
+        if pending:
+            high_water = min(pending)
+        if not complete:
+            high_water = self.data['high_water']
+        self.data['high_water'] = high_water
+        # A sitemap with posts left over has to be read again next time
+        if not unattempted and complete:
+            self.data['sitemaps'].update(self.read_sitemaps)
+        self.data['synced_at'] = now
+        self.save()
+        self.listed = {}
+        self.newest_listed = None
+        self.from_sitemap = set()
+        self.read_sitemaps = {}
+        print(f"Episode catalog synced up to {high_water or 'the start'}"
+              + (f" ({unattempted} listed posts left for the next sync)" if unattempted else "")
+              + ("" if complete else " (listing was incomplete, it will be listed again)"))
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+SQLite store of episodes, runs and fetch attempts
+Records every discovered episode with its post metadata, HTTP validators,
+transcript hash, size and where it was saved, plus one row per request
+with its timings, so counts and range queries don't need the API
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS episodes (
+    url TEXT PRIMARY KEY,
+    episode_num INTEGER,
+    post_id INTEGER,
+    title TEXT,
+    modified TEXT,
+    status TEXT NOT NULL DEFAULT 'discovered',
+    output_file TEXT,
+    content_hash TEXT,
+    chars INTEGER,
+    etag TEXT,
+    last_modified TEXT,
+    discovered_at REAL,
+    scraped_at REAL
+);
+CREATE INDEX IF NOT EXISTS episodes_by_number ON episodes (episode_num);
+CREATE INDEX IF NOT EXISTS episodes_by_status ON episodes (status, episode_num);
+
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    scraper TEXT,
+    started_at REAL,
+    finished_at REAL,
+    saved INTEGER,
+    failed INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS fetches (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER REFERENCES runs (id),
+    url TEXT,
+    status INTEGER,
+    source TEXT,
+    bytes INTEGER,
+    retries INTEGER,
+    total REAL,
+    ttfb REAL,
+    network REAL,
+    rate_limit_wait REAL,
+    backoff_sleep REAL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL
+);
+CREATE INDEX IF NOT EXISTS fetches_by_url ON fetches (url);
+"""
+
+# Seconds a write waits for another process's transaction before giving up
+BUSY_TIMEOUT = 30
+
+class EpisodeDB:
+    """One connection shared by all workers of a scraper, guarded by a lock
+
+    Uses WAL so count_episodes.py and other readers can query it while a
+    scrape is writing. Every write commits straight away, so no transaction
+    stays open between requests to block other scrapers, queue workers or
+    count_episodes.py sharing the file; with synchronous=NORMAL a commit
+    costs no fsync.
+    """
+
+    def __init__(self, path="transcripts/.episodes.db"):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self.run_id = None
+
+    def start_run(self, scraper):
+        with self.lock:
+            self.run_id = self.conn.execute("INSERT INTO runs (scraper, started_at) VALUES (?, ?)",
+                                            (scraper, time.time())).lastrowid
+            self.conn.commit()
+        return self.run_id
+
+    def finish_run(self, saved, failed):
+        with self.lock:
+            self.conn.execute("UPDATE runs SET finished_at = ?, saved = ?, failed = ? WHERE id = ?",
+                              (time.time(), saved, failed, self.run_id))
+            self.conn.commit()
+
+    def add_episodes(self, posts):
+        """Insert or refresh discovered (episode_num, url, post_id, title, modified) rows
+
+        Scrape status, hashes and validators of known episodes are kept, and
+        so are post ids and titles when the new row has none (sitemap entries).
+        """
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                "INSERT INTO episodes (episode_num, url, post_id, title, modified, discovered_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET episode_num = excluded.episode_num, "
+                "post_id = COALESCE(excluded.post_id, post_id), title = COALESCE(excluded.title, title), "
+                "modified = excluded.modified",
+                [tuple(post) + (now,) for post in posts])
+            self.conn.commit()
+
+    def record_fetch(self, record, headers=None):
+        """Store one RequestRecord, and an episode page's ETag/Last-Modified"""
+        etag = headers.get('ETag') if headers else None
+        last_modified = headers.get('Last-Modified') if headers else None
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO fetches (run_id, url, status, source, bytes, retries, total, ttfb, network, "
+                "rate_limit_wait, backoff_sleep, etag, last_modified, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.run_id, record.url, record.status, record.source, record.bytes, record.retries,
+                 record.total, record.ttfb, record.network, record.rate_limit_wait, record.backoff_sleep,
+                 etag, last_modified, time.time()))
+            if etag or last_modified:
+                self.conn.execute("UPDATE episodes SET etag = ?, last_modified = ? WHERE url = ?",
+                                  (etag, last_modified, record.url))
+            self.conn.commit()
+
+    def mark_saved(self, episodes, output_file):
+        """Mark CombinedTranscriptWriter.episodes entries as done in output_file"""
+        now = time.time()
+        with self.lock:
+            for episode_num, url, content_hash, chars in episodes:
+                self.conn.execute(
+                    "INSERT INTO episodes (episode_num, url, discovered_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (url) DO NOTHING", (episode_num, url, now))
+                self.conn.execute(
+                    "UPDATE episodes SET status = 'done', output_file = ?, content_hash = ?, chars = ?, "
+                    "scraped_at = ? WHERE url = ?", (output_file, content_hash, chars, now, url))
+            self.conn.commit()
+
+    def mark_failed(self, url):
+        with self.lock:
+            self.conn.execute("UPDATE episodes SET status = 'failed', scraped_at = ? WHERE url = ?",
+                              (time.time(), url))
+            self.conn.commit()
+
+    def episodes(self, start_episode=None, end_episode=None, status=None, limit=None):
+        """Return [(episode_num, url, title)] in range, highest episode first"""
+        query = "SELECT episode_num, url, title FROM episodes WHERE episode_num IS NOT NULL"
+        args = []
+        if start_episode:
+            query += " AND episode_num >= ?"
+            args.append(start_episode)
+        if end_episode:
+            query += " AND episode_num <= ?"
+            args.append(end_episode)
+        if status:
+            query += " AND status = ?"
+            args.append(status)
+        query += " ORDER BY episode_num DESC"
+        if limit:
+            query += " LIMIT ?"
+            args.append(limit)
+        with self.lock:
+            return self.conn.execute(query, args).fetchall()
+
+    def status_counts(self):
+        """Return {status: episode count}"""
+        with self.lock:
+            return dict(self.conn.execute("SELECT status, COUNT(*) FROM episodes GROUP BY status"))
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
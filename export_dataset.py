@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Export scraped transcripts as a sharded training dataset
+Shuffles the newest copy of every episode, packs them into shards of about
+the same size and writes each shard as gzip-compressed JSONL (one record
+per episode, transcript text plus metadata), several shards at a time
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dedup import strip_boilerplate
+from search_index import newest_episodes
+from transcript_reader import TranscriptFile
+from transcript_segments import TIMESTAMP_PATTERN
+
+MANIFEST_FILE = "manifest.json"
+
+def plan_shards(episodes, shard_bytes):
+    """Split episodes into consecutive shards of roughly shard_bytes of text each"""
+    shards = [[]]
+    size = 0
+    for episode in episodes:
+        length = episode[-1]
+        if shards[-1] and size + length > shard_bytes:
+            shards.append([])
+            size = 0
+        shards[-1].append(episode)
+        size += length
+    return shards if shards[0] else []
+
+def shard_name(number, total):
+    return f"shard-{number:05d}-of-{total:05d}.jsonl.gz"
+
+def clean_text(transcript, boilerplate=None, strip_timestamps=False):
+    if boilerplate:
+        transcript = strip_boilerplate(transcript, boilerplate)
+    if strip_timestamps:
+        lines = (TIMESTAMP_PATTERN.sub("", line).strip() for line in transcript.splitlines())
+        transcript = "\n".join(line for line in lines if line)
+    return transcript.strip()
+
+def write_shard(task):
+    """Process-pool entry point: write one shard and return its manifest entry
+
+    task is (shard_path, episodes, boilerplate, strip_timestamps). Episodes
+    are read one at a time from the memory-mapped combined files, so a
+    worker holds a single transcript at once. The shard appears under its
+    final name only when complete.
+    """
+    shard_path, episodes, boilerplate, strip_timestamps = task
+    files = {}
+    records = chars = 0
+    tmp_path = f"{shard_path}.tmp"
+    try:
+        # mtime=0 keeps the gzip header fixed, so the same export is byte-identical
+        with io.TextIOWrapper(gzip.GzipFile(tmp_path, 'wb', mtime=0), encoding='utf-8') as out:
+            for key, episode_num, url, path, i, length in episodes:
+                if path not in files:
+                    files[path] = TranscriptFile(path)
+                text = clean_text(files[path].transcript_at(i), boilerplate, strip_timestamps)
+                if not text:
+                    continue
+                out.write(json.dumps({
+                    'id': key,
+                    'episode': episode_num,
+                    'url': url,
+                    'source': os.path.basename(path),
+                    'sha256': hashlib.sha256(text.encode('utf-8')).hexdigest(),
+                    'chars': len(text),
+                    'text': text,
+                }, ensure_ascii=False) + "\n")
+                records += 1
+                chars += len(text)
+    finally:
+        for transcripts in files.values():
+            transcripts.close()
+    os.replace(tmp_path, shard_path)
+    digest = hashlib.sha256()
+    with open(shard_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return {'file': os.path.basename(shard_path), 'records': records, 'chars': chars,
+            'bytes': os.path.getsize(shard_path), 'sha256': digest.hexdigest()}
+
+def load_dedup_report(report_path):
+    """Return (keys to drop, boilerplate lines) from a dedup.py --report file"""
+    with open(report_path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    dropped = {key for members in report.get('clusters', []) for key in members[1:]}
+    return dropped, set(report.get('boilerplate', {}))
+
+def export_dataset(transcripts_dir="transcripts", output_dir="dataset", shard_mb=64, seed=0,
+                   workers=1, dedup_report=None, strip_timestamps=False):
+    """Write shuffled gzip JSONL shards plus a manifest.json describing them
+
+    Returns the manifest, or None when there is nothing to export.
+    """
+    start = time.perf_counter()
+    episodes = newest_episodes(transcripts_dir)
+    dropped, boilerplate = load_dedup_report(dedup_report) if dedup_report else (set(), set())
+    episodes = [episode for episode in episodes if episode[0] not in dropped]
+    if not episodes:
+        print(f"No episodes found in {transcripts_dir}")
+        return None
+    # Sort first so the shuffle only depends on the seed, not on file order
+    episodes.sort(key=lambda episode: episode[0])
+    random.Random(seed).shuffle(episodes)
+    shards = plan_shards(episodes, shard_mb * 1024 * 1024)
+
+    os.makedirs(output_dir, exist_ok=True)
+    for name in os.listdir(output_dir):
+        if name.startswith("shard-") and name.endswith(".jsonl.gz"):
+            os.remove(os.path.join(output_dir, name))
+    workers = max(1, min(workers, len(shards)))
+    print(f"Exporting {len(episodes)} episodes into {len(shards)} shards"
+          + (f" with {workers} processes..." if workers > 1 else "..."))
+
+    tasks = [(os.path.join(output_dir, shard_name(n, len(shards))), shard, boilerplate, strip_timestamps)
+             for n, shard in enumerate(shards)]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            written = list(executor.map(write_shard, tasks))
+    else:
+        written = list(map(write_shard, tasks))
+    for entry in written:
+        print(f"  ✓ {entry['file']}: {entry['records']} records, {entry['bytes'] / 1024 / 1024:.1f} MB")
+
+    manifest = {
+        'format': 'jsonl.gz',
+        'fields': ['id', 'episode', 'url', 'source', 'sha256', 'chars', 'text'],
+        'seed': seed,
+        'shard_mb': shard_mb,
+        'strip_timestamps': strip_timestamps,
+        'dropped_duplicates': len(dropped),
+        'boilerplate_lines': len(boilerplate),
+        'records': sum(entry['records'] for entry in written),
+        'chars': sum(entry['chars'] for entry in written),
+        'shards': written,
+    }
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(f"{manifest_path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    print(f"Exported {manifest['records']} records in {time.perf_counter() - start:.1f}s")
+    print(f"✓ Saved to: {output_dir}")
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description="Export transcripts as shuffled, compressed JSONL shards for training")
+    parser.add_argument("--transcripts-dir", default="transcripts", help="Combined files to export (default: transcripts)")
+    parser.add_argument("--output-dir", default="dataset", help="Where to write the shards (default: dataset)")
+    parser.add_argument("--shard-mb", type=float, default=64,
+                        help="Uncompressed transcript text per shard in MB (default: 64)")
+    parser.add_argument("--seed", type=int, default=0, help="Shuffle seed (default: 0)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help=f"Shards to write in parallel (default: 1, this machine has {os.cpu_count()} cores)")
+    parser.add_argument("--dedup-report",
+                        help="dedup.py --report file: drop near-duplicate episodes and strip boilerplate lines")
+    parser.add_argument("--strip-timestamps", action="store_true",
+                        help="Remove the [hh:mm:ss] markers from the text")
+    args = parser.parse_args()
+
+    export_dataset(
+        transcripts_dir=args.transcripts_dir,
+        output_dir=args.output_dir,
+        shard_mb=args.shard_mb,
+        seed=args.seed,
+        workers=args.workers,
+        dedup_report=args.dedup_report,
+        strip_timestamps=args.strip_timestamps
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+On-disk HTTP response cache for the podcast scrapers
+Stores response bodies with their ETag/Last-Modified validators so reruns
+can revalidate with a conditional request instead of re-downloading
+"""
+
+import requests
+from requests.structures import CaseInsensitiveDict
+import hashlib
+import json
+import os
+import time
+
+# Headers that describe the transfer rather than the cached body
+SKIPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+class HTTPCache:
+    def __init__(self, cache_dir=".http_cache", max_age_days=30, max_size_mb=500):
+        self.cache_dir = cache_dir
+        self.max_age = max_age_days * 24 * 3600  # Drop entries not validated for this long
+        self.max_size = max_size_mb * 1024 * 1024  # Total body bytes kept on disk
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def cache_key(self, url, params=None):
+        """Build a stable key from the URL and sorted query parameters"""
+        items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+        return hashlib.sha256(json.dumps([url, items]).encode('utf-8')).hexdigest()
+
+    def entry_paths(self, key):
+        """Return the (metadata, body) paths for a cache key"""
+        subdir = os.path.join(self.cache_dir, key[:2])
+        return os.path.join(subdir, f"{key}.json"), os.path.join(subdir, f"{key}.body")
+
+    def load(self, url, params=None):
+        """Return the cached entry metadata for a request, or None"""
+        meta_path, body_path = self.entry_paths(self.cache_key(url, params))
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(body_path):
+            return None
+        entry['body_path'] = body_path
+        return entry
+
+    def conditional_headers(self, entry):
+        """Build If-None-Match/If-Modified-Since headers from a cached entry"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def write_entry(self, key, entry, body=None):
+        """Write metadata (and optionally body) atomically"""
+        meta_path, body_path = self.entry_paths(key)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        if body is not None:
+            tmp_path = f"{body_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, body_path)
+        entry = {k: v for k, v in entry.items() if k != 'body_path'}
+        tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, meta_path)
+
+    def store(self, url, params, response):
+        """Save a 200 response and its validators"""
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in SKIPPED_HEADERS}
+        entry = {
+            'url': url,
+            'params': params,
+            'headers': headers,
+            'encoding': response.encoding,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'size': len(response.content),
+            'stored_at': time.time(),
+            'validated_at': time.time(),
+        }
+        try:
+            self.write_entry(self.cache_key(url, params), entry, response.content)
+        except OSError as e:
+            print(f"Could not write cache entry for {url}: {e}")
+
+    def revalidated(self, url, params, entry, response):
+        """Refresh a cached entry after a 304 and return it as a response"""
+        entry['validated_at'] = time.time()
+        for header, field in (('ETag', 'etag'), ('Last-Modified', 'last_modified')):
+            if response.headers.get(header):
+                entry[field] = response.headers[header]
+                entry['headers'][header] = response.headers[header]
+        try:
+            self.write_entry(self.cache_key(url, params), entry)
+        except OSError as e:
+            print(f"Could not update cache entry for {url}: {e}")
+        return self.to_response(entry)
+
+    def to_response(self, entry):
+        """Rebuild a requests.Response from a cached entry"""
+        with open(entry['body_path'], 'rb') as f:
+            body = f.read()
+        response = requests.Response()
+        response.status_code = 200
+        response._content = body
+        response.headers = CaseInsensitiveDict(entry.get('headers', {}))
+        response.encoding = entry.get('encoding')
+        response.url = entry.get('url')
+        response.from_cache = True
+        return response
+
+    def evict(self):
+        """Remove entries past max_age, then least recently validated ones until under max_size"""
+        now = time.time()
+        entries = []
+        for root, dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.json'):
+                    continue
+                meta_path = os.path.join(root, name)
+                body_path = meta_path[:-len('.json')] + '.body'
+                try:
+                    with open(meta_path, 'r', encoding='utf-8') as f:
+                        entry = json.load(f)
+                except (OSError, ValueError):
+                    entry = {}
+                entries.append((entry.get('validated_at', 0), entry.get('size', 0), meta_path, body_path))
+
+        entries.sort()
+        total_size = sum(size for _, size, _, _ in entries)
+        removed = 0
+        for validated_at, size, meta_path, body_path in entries:
+            if now - validated_at <= self.max_age and total_size <= self.max_size:
+                break
+            for path in (meta_path, body_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total_size -= size
+            removed += 1
+
+        if removed:
+            print(f"Evicted {removed} cache entries from {self.cache_dir}")
+        return removed
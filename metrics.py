@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Run metrics for the scrapers
+Records per-request timings, bytes, retries and sleeps plus per-stage
+timers, and exports them as a JSON summary or Prometheus text format
+"""
+
+from collections import defaultdict
+from contextlib import contextmanager
+import json
+import os
+import threading
+import time
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Per-request timings exported with percentiles
+REQUEST_TIMINGS = ('total', 'ttfb', 'network', 'rate_limit_wait', 'backoff_sleep')
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-int(q * 1000) * len(sorted_values) // 1000))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def distribution(values):
+    """count/sum/mean/max and p50/p95/p99 for a list of numbers"""
+    ordered = sorted(values)
+    result = {
+        'count': len(ordered),
+        'sum': sum(ordered),
+        'mean': sum(ordered) / len(ordered) if ordered else 0.0,
+        'max': ordered[-1] if ordered else 0.0,
+    }
+    for q in QUANTILES:
+        result[f"p{int(q * 100)}"] = percentile(ordered, q)
+    return result
+
+class RequestRecord:
+    __slots__ = ('url', 'status', 'source', 'bytes', 'retries') + REQUEST_TIMINGS
+
+    def __init__(self, url):
+        self.url = url
+        self.status = None
+        self.source = 'network'  # network, not_modified, cache or failed
+        self.bytes = 0
+        self.retries = 0
+        self.total = 0.0
+        self.ttfb = 0.0  # Send to response headers, including any new connection
+        self.network = 0.0  # Time inside session.get across attempts
+        self.rate_limit_wait = 0.0
+        self.backoff_sleep = 0.0
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class RunMetrics:
+    """Thread-safe collector shared by all workers of a run
+
+    The requests library doesn't report DNS and connect times on their own,
+    so ttfb is response.elapsed: from sending the request until the headers
+    are parsed, which includes connection setup when the pool opens a new
+    connection.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = []
+        self.stages = defaultdict(list)
+        self.queue_samples = defaultdict(list)  # queue name -> sampled depths
+        self.queue_capacity = {}
+
+    def record(self, record):
+        with self.lock:
+            self.requests.append(record)
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block under a stage name (discovery, fetch, extract, save)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.stages[name].append(elapsed)
+
+    def sample_queue(self, name, depth, capacity):
+        """Record one observation of a pipeline queue's depth"""
+        with self.lock:
+            self.queue_samples[name].append(depth)
+            self.queue_capacity[name] = capacity
+
+    def summary(self):
+        with self.lock:
+            requests = list(self.requests)
+            stages = {name: list(timings) for name, timings in self.stages.items()}
+            queues = {name: {'capacity': self.queue_capacity[name],
+                             'mean': sum(depths) / len(depths),
+                             'max': max(depths),
+                             'full_fraction': sum(1 for depth in depths if depth >= self.queue_capacity[name]) / len(depths),
+                             'samples': len(depths)}
+                      for name, depths in self.queue_samples.items() if depths}
+
+        by_status = defaultdict(int)
+        by_source = defaultdict(int)
+        for record in requests:
+            by_status[str(record.status)] += 1
+            by_source[record.source] += 1
+        return {
+            'run_seconds': time.time() - self.started,
+            'requests': {
+                'count': len(requests),
+                'bytes': sum(record.bytes for record in requests),
+                'retries': sum(record.retries for record in requests),
+                'by_status': dict(by_status),
+                'by_source': dict(by_source),
+                'timings': {name: distribution([getattr(record, name) for record in requests])
+                            for name in REQUEST_TIMINGS},
+            },
+            'stages': {name: distribution(timings) for name, timings in stages.items()},
+            'queues': queues,
+        }
+
+    def write_json(self, path, include_requests=False):
+        """Write the summary (and optionally every request record) as JSON"""
+        summary = self.summary()
+        if include_requests:
+            with self.lock:
+                summary['request_log'] = [record.to_dict() for record in self.requests]
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=1)
+        print(f"Wrote metrics summary to: {path}")
+
+    def prometheus_text(self, prefix="transcript_scraper"):
+        """Render the summary in the Prometheus text exposition format"""
+        summary = self.summary()
+        requests = summary['requests']
+        lines = [
+            f"# HELP {prefix}_run_seconds Wall time of the run",
+            f"# TYPE {prefix}_run_seconds gauge",
+            f"{prefix}_run_seconds {summary['run_seconds']:.6f}",
+            f"# HELP {prefix}_requests_total Requests by final status and source",
+            f"# TYPE {prefix}_requests_total counter",
+        ]
+        with self.lock:
+            counts = defaultdict(int)
+            for record in self.requests:
+                counts[(str(record.status), record.source)] += 1
+        for (status, source), count in sorted(counts.items()):
+            lines.append(f'{prefix}_requests_total{{status="{status}",source="{source}"}} {count}')
+        lines += [
+            f"# HELP {prefix}_response_bytes_total Response body bytes received",
+            f"# TYPE {prefix}_response_bytes_total counter",
+            f"{prefix}_response_bytes_total {requests['bytes']}",
+            f"# HELP {prefix}_retries_total Request attempts beyond the first",
+            f"# TYPE {prefix}_retries_total counter",
+            f"{prefix}_retries_total {requests['retries']}",
+        ]
+
+        def summary_metric(name, help_text, label, distributions):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} summary")
+            for key, dist in sorted(distributions.items()):
+                for q in QUANTILES:
+                    lines.append(f'{prefix}_{name}{{{label}="{key}",quantile="{q}"}} {dist[f"p{int(q * 100)}"]:.6f}')
+                lines.append(f'{prefix}_{name}_sum{{{label}="{key}"}} {dist["sum"]:.6f}')
+                lines.append(f'{prefix}_{name}_count{{{label}="{key}"}} {dist["count"]}')
+
+        summary_metric("request_seconds", "Per-request time by phase", "phase", requests['timings'])
+        summary_metric("stage_seconds", "Time spent per pipeline stage", "stage", summary['stages'])
+        if summary['queues']:
+            lines += [
+                f"# HELP {prefix}_queue_depth_mean Average sampled depth of each pipeline queue",
+                f"# TYPE {prefix}_queue_depth_mean gauge",
+            ]
+            lines += [f'{prefix}_queue_depth_mean{{queue="{name}"}} {queue["mean"]:.6f}'
+                      for name, queue in sorted(summary['queues'].items())]
+            lines += [
+                f"# HELP {prefix}_queue_full_ratio Fraction of samples a pipeline queue was at capacity",
+                f"# TYPE {prefix}_queue_full_ratio gauge",
+            ]
+            lines += [f'{prefix}_queue_full_ratio{{queue="{name}"}} {queue["full_fraction"]:.6f}'
+                      for name, queue in sorted(summary['queues'].items())]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        print(f"Wrote Prometheus metrics to: {path}")
+
+    def print_summary(self):
+        """Print a short breakdown of where the run's time went"""
+        summary = self.summary()
+        requests = summary['requests']
+        print(f"\nRun metrics ({summary['run_seconds']:.1f}s wall):")
+        print(f"  Requests: {requests['count']} ({requests['bytes'] / 1048576:.1f} MiB, "
+              f"{requests['retries']} retries, by source {requests['by_source']})")
+        for name, dist in requests['timings'].items():
+            if dist['count']:
+                print(f"  {name:<16} total {dist['sum']:8.2f}s  p50 {dist['p50'] * 1000:8.1f}ms  "
+                      f"p95 {dist['p95'] * 1000:8.1f}ms  p99 {dist['p99'] * 1000:8.1f}ms")
+        for name, dist in summary['stages'].items():
+            print(f"  stage {name:<10} total {dist['sum']:8.2f}s  p50 {dist['p50'] * 1000:8.1f}ms  "
+                  f"p95 {dist['p95'] * 1000:8.1f}ms  ({dist['count']} calls)")
+        for name, queue in summary['queues'].items():
+            print(f"  queue {name:<12} depth mean {queue['mean']:5.1f}  max {queue['max']:3d}/{queue['capacity']}  "
+                  f"full {queue['full_fraction'] * 100:5.1f}% of samples")
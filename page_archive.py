@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Append-only archive of fetched pages
+Every response body is written as a gzip-compressed WARC/1.0 response
+record to pages.warc.gz, with one JSON line per record in index.jsonl
+pointing at its byte offset, so pages can be re-read without the network
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+import requests
+from urllib.parse import urlparse
+from http_cache import SKIPPED_HEADERS
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, one writer only
+    fcntl = None
+
+ARCHIVE_FILE = "pages.warc.gz"
+INDEX_FILE = "index.jsonl"
+
+def request_uri(url, params=None):
+    """The full URL a GET for url/params is sent to"""
+    if not params:
+        return url
+    return requests.Request('GET', url, params=params).prepare().url
+
+def record_kind(url):
+    """'api' for WordPress REST responses, 'sitemap' for XML sitemaps, 'page' for everything else"""
+    if '/wp-json/' in url:
+        return 'api'
+    if urlparse(url).path.endswith('.xml'):
+        return 'sitemap'
+    return 'page'
+
+def read_record(archive_path, entry):
+    """Return (status, headers, body) for one index entry of an archive file
+
+    Needs only the path and the entry, so worker processes can read records
+    without loading the index.
+    """
+    with open(archive_path, 'rb') as f:
+        f.seek(entry['offset'])
+        record = gzip.decompress(f.read(entry['length']))
+    warc_headers, _, rest = record.partition(b"\r\n\r\n")
+    content_length = int(next(line.split(b":", 1)[1] for line in warc_headers.split(b"\r\n")
+                              if line.lower().startswith(b"content-length:")))
+    http_head, _, body = rest[:content_length].partition(b"\r\n\r\n")
+    lines = http_head.decode('latin-1').split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    headers = dict(line.split(": ", 1) for line in lines[1:] if ": " in line)
+    return status, headers, body
+
+class PageArchive:
+    """WARC-style page store shared by all workers of a scraper
+
+    Records are only appended when a URL's body has changed since the
+    last record for it, so reruns over an unchanged site add nothing.
+    Appends hold an flock on the archive file, so several processes (queue
+    workers) can share one archive; without fcntl only one process may write.
+    """
+
+    def __init__(self, archive_dir="archive"):
+        self.archive_dir = archive_dir
+        self.archive_path = os.path.join(archive_dir, ARCHIVE_FILE)
+        self.index_path = os.path.join(archive_dir, INDEX_FILE)
+        self.lock = threading.Lock()
+        self.latest_digest = {}  # uri -> sha256 of its newest record
+        for entry in self.entries():
+            self.latest_digest[entry['uri']] = entry['sha256']
+
+    def entries(self):
+        """Yield every index entry, oldest first"""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+    def latest_entries(self, kind=None):
+        """Return the newest index entry per URI, oldest first"""
+        latest = {}
+        for entry in self.entries():
+            if kind is None or entry['kind'] == kind:
+                latest[entry['uri']] = entry
+        return sorted(latest.values(), key=lambda entry: entry['fetched_at'])
+
+    def store(self, url, params, response):
+        """Append a response if its body differs from the last one archived
+
+        Returns the index entry that was written, or None if unchanged.
+        """
+        body = response.content
+        uri = request_uri(url, params)
+        digest = hashlib.sha256(body).hexdigest()
+        if self.latest_digest.get(uri) == digest:
+            return None
+
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in SKIPPED_HEADERS}
+        headers['Content-Length'] = str(len(body))
+        http_block = f"HTTP/1.1 {response.status_code} {response.reason or ''}\r\n".encode('latin-1')
+        http_block += "".join(f"{k}: {v}\r\n" for k, v in headers.items()).encode('latin-1', 'replace')
+        http_block += b"\r\n" + body
+
+        fetched_at = time.time()
+        warc_headers = (
+            "WARC/1.0\r\n"
+            "WARC-Type: response\r\n"
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+            f"WARC-Date: {time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(fetched_at))}\r\n"
+            f"WARC-Target-URI: {uri}\r\n"
+            f"WARC-Payload-Digest: sha256:{digest}\r\n"
+            "Content-Type: application/http; msgtype=response\r\n"
+            f"Content-Length: {len(http_block)}\r\n"
+            "\r\n"
+        ).encode('utf-8')
+        # One gzip member per record, so any record can be read on its own
+        member = gzip.compress(warc_headers + http_block + b"\r\n\r\n")
+
+        entry = {
+            'uri': uri,
+            'url': url,
+            'params': params,
+            'kind': record_kind(url),
+            'status': response.status_code,
+            'encoding': response.encoding,
+            'sha256': digest,
+            'size': len(body),
+            'length': len(member),
+            'fetched_at': fetched_at,
+        }
+        try:
+            with self.lock:
+                os.makedirs(self.archive_dir, exist_ok=True)
+                with open(self.archive_path, 'ab') as f:
+                    # Other processes may have appended since this one opened it
+                    if fcntl:
+                        fcntl.flock(f, fcntl.LOCK_EX)
+                    f.seek(0, os.SEEK_END)
+                    entry['offset'] = f.tell()
+                    f.write(member)
+                    f.flush()
+                    with open(self.index_path, 'a', encoding='utf-8') as index:
+                        index.write(json.dumps(entry) + "\n")
+                self.latest_digest[uri] = digest
+        except OSError as e:
+            print(f"Could not archive {uri}: {e}")
+            return None
+        return entry
+
+    def read(self, entry):
+        """Return (status, headers, body) for an index entry"""
+        return read_record(self.archive_path, entry)
+
+    def read_body(self, entry):
+        return self.read(entry)[2]
+
+    def read_json(self, entry):
+        return json.loads(self.read_body(entry).decode(entry.get('encoding') or 'utf-8'))
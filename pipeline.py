@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Bounded fetch -> parse -> write pipeline for the scrapers
+Fetch threads download while parse workers extract, connected by bounded
+queues so a slow stage holds the others back instead of filling memory.
+Results come back in input order for a single writer.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+DONE = object()  # Sentinel passed down a queue when its producers are finished
+
+class Pipeline:
+    """Runs fetch(item) and parse(item, payload) over items with backpressure
+
+    fetch_workers threads call fetch and put payloads on a queue of
+    queue_size; parse_workers threads take them off, call parse and put the
+    results on a second queue of queue_size, which run() drains in input
+    order. At most fetch_workers + parse_workers + 2 * queue_size items are
+    in flight at once, counting results held back for ordering, so memory is
+    capped whichever stage is slowest.
+
+    With parse_processes set, the parse threads hand parse_process(payload)
+    to a process pool of that size, so parsing doesn't contend for the GIL.
+    The function must be picklable (defined at module level). Its result is
+    then passed to parse(item, payload, result) in the parse thread.
+
+    Queue depths are sampled into metrics (a RunMetrics) as "fetched",
+    "parsed" and "reorder" every sample_interval seconds.
+    """
+
+    def __init__(self, fetch, parse, fetch_workers=1, parse_workers=1, queue_size=8,
+                 parse_process=None, parse_processes=0, metrics=None, sample_interval=0.05, report_interval=None):
+        self.fetch = fetch
+        self.parse = parse
+        self.fetch_workers = max(1, fetch_workers)
+        self.parse_workers = max(1, parse_workers)
+        self.queue_size = max(1, queue_size)
+        self.parse_process = parse_process
+        self.parse_processes = parse_processes if parse_process else 0
+        self.metrics = metrics
+        self.sample_interval = sample_interval
+        self.report_interval = report_interval
+        self.fetched = queue.Queue(self.queue_size)
+        self.parsed = queue.Queue(self.queue_size)
+        self.window_size = self.fetch_workers + self.parse_workers + 2 * self.queue_size
+        self.window = threading.Semaphore(self.window_size)
+        self.reorder_size = 0
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()
+        self.samples = {'fetched': [], 'parsed': [], 'reorder': []}
+
+    def put(self, target, value):
+        """Block on a full queue, but give up if the pipeline is stopped"""
+        while not self.stopped.is_set():
+            try:
+                target.put(value, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def fetch_loop(self, inputs, remaining):
+        while not self.stopped.is_set():
+            # Take a slot before an item, so fetching stops when the window is full
+            while not self.window.acquire(timeout=0.1):
+                if self.stopped.is_set():
+                    return
+            with self.lock:
+                index, item = next(inputs, (None, None))
+            if index is None:
+                self.window.release()
+                break
+            try:
+                payload = self.fetch(item)
+            except Exception as e:
+                print(f"Fetch failed for {item}: {e}")
+                payload = None
+            if not self.put(self.fetched, (index, item, payload)):
+                return
+        with self.lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            for _ in range(self.parse_workers):
+                self.put(self.fetched, DONE)
+
+    def parse_loop(self, executor, remaining):
+        while not self.stopped.is_set():
+            try:
+                entry = self.fetched.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if entry is DONE:
+                break
+            index, item, payload = entry
+            try:
+                if executor and payload is not None:
+                    result = self.parse(item, payload, executor.submit(self.parse_process, payload).result())
+                else:
+                    result = self.parse(item, payload)
+            except Exception as e:
+                print(f"Parse failed for {item}: {e}")
+                result = None
+            if not self.put(self.parsed, (index, item, result)):
+                return
+        with self.lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            self.put(self.parsed, DONE)
+
+    def sample_loop(self):
+        last_report = time.monotonic()
+        while not self.stopped.wait(self.sample_interval):
+            depths = {'fetched': self.fetched.qsize(), 'parsed': self.parsed.qsize(), 'reorder': self.reorder_size}
+            for name, depth in depths.items():
+                self.samples[name].append(depth)
+                if self.metrics:
+                    self.metrics.sample_queue(name, depth, self.window_size if name == 'reorder' else self.queue_size)
+            if self.report_interval and time.monotonic() - last_report >= self.report_interval:
+                last_report = time.monotonic()
+                print(f"  [pipeline] fetched {depths['fetched']}/{self.queue_size}, "
+                      f"parsed {depths['parsed']}/{self.queue_size}, waiting for order {depths['reorder']}")
+
+    def bottleneck(self):
+        """Name the stage that limited throughput, judged from queue depths
+
+        A full fetched queue means parsing can't keep up; a full parsed queue
+        means writing can't; queues that stay empty mean fetching is slowest.
+        """
+        def full(name):
+            samples = self.samples[name]
+            return sum(1 for depth in samples if depth >= self.queue_size) / len(samples) if samples else 0.0
+        if full('parsed') > 0.5:
+            return 'write'
+        if full('fetched') > 0.5:
+            return 'parse'
+        return 'fetch'
+
+    def run(self, items):
+        """Yield (item, result) for every item, in input order"""
+        inputs = enumerate(items)
+        fetchers_left = [self.fetch_workers]
+        parsers_left = [self.parse_workers]
+        executor = ProcessPoolExecutor(max_workers=self.parse_processes) if self.parse_processes else None
+        threads = [threading.Thread(target=self.fetch_loop, args=(inputs, fetchers_left), daemon=True)
+                   for _ in range(self.fetch_workers)]
+        threads += [threading.Thread(target=self.parse_loop, args=(executor, parsers_left), daemon=True)
+                    for _ in range(self.parse_workers)]
+        sampler = threading.Thread(target=self.sample_loop, daemon=True)
+        for thread in threads + [sampler]:
+            thread.start()
+
+        waiting = {}  # index -> (item, result) that finished ahead of an earlier item
+        next_index = 0
+        try:
+            while True:
+                entry = self.parsed.get()
+                if entry is DONE:
+                    break
+                index, item, result = entry
+                waiting[index] = (item, result)
+                while next_index in waiting:
+                    self.reorder_size = len(waiting) - 1
+                    yield waiting.pop(next_index)
+                    next_index += 1
+                    self.window.release()
+                self.reorder_size = len(waiting)
+        finally:
+            self.stopped.set()
+            for thread in threads + [sampler]:
+                thread.join()
+            if executor:
+                executor.shutdown(cancel_futures=True)
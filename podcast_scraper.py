@@ -4,89 +4,24 @@ Podcast Transcript Scraper for I Will Teach You To Be Rich
 Scrapes all podcast episodes and downloads their full transcripts
 """
 
-import requests
 from bs4 import BeautifulSoup
 import re
 import os
-import time
-import random
 from urllib.parse import urljoin, urlparse
 import json
 import argparse
+from sitemap import SitemapDiscovery
+from wp_api import iter_api_pages
+from transcript_writer import CombinedTranscriptWriter
+from scraper_base import ScraperBase, add_common_arguments, check_common_arguments, scraper_options
 
-class PodcastScraper:
-    def __init__(self):
-        self.base_url = "https://www.iwillteachyoutoberich.com"
+class PodcastScraper(ScraperBase):
+    def __init__(self, concurrency=1, cache_dir=".http_cache", offline=False, rate_state=".rate_state.json",
+                 archive_dir="archive", db_path="transcripts/.episodes.db"):
+        super().__init__(concurrency=concurrency, cache_dir=cache_dir, offline=offline, rate_state=rate_state,
+                         archive_dir=archive_dir, db_path=db_path)
         self.podcast_url = "https://www.iwillteachyoutoberich.com/podcast/"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        })
         
-        # Rate limiting settings
-        self.min_delay = 2  # Minimum seconds between requests
-        self.max_delay = 5  # Maximum seconds between requests
-        self.last_request_time = 0
-        
-    def rate_limit(self):
-        """Add random delay between requests to avoid being blocked"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.min_delay:
-            sleep_time = self.min_delay - time_since_last + random.uniform(0, 1)
-            print(f"Rate limiting: sleeping for {sleep_time:.1f} seconds...")
-            time.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
-    
-    def safe_request(self, url, params=None, max_retries=3):
-        """Make a request with retry logic and rate limiting"""
-        for attempt in range(max_retries):
-            try:
-                self.rate_limit()
-                print(f"Making request to: {url}")
-                response = self.session.get(url, params=params, timeout=30)
-                
-                if response.status_code == 200:
-                    return response
-                elif response.status_code == 403:
-                    print(f"Got 403 Forbidden on attempt {attempt + 1}")
-                    if attempt < max_retries - 1:
-                        # Wait longer before retrying
-                        wait_time = (attempt + 1) * 10
-                        print(f"Waiting {wait_time} seconds before retry...")
-                        time.sleep(wait_time)
-                        continue
-                elif response.status_code == 429:
-                    print(f"Rate limited (429) on attempt {attempt + 1}")
-                    if attempt < max_retries - 1:
-                        # Wait much longer for rate limiting
-                        wait_time = (attempt + 1) * 30
-                        print(f"Rate limited, waiting {wait_time} seconds...")
-                        time.sleep(wait_time)
-                        continue
-                else:
-                    print(f"HTTP {response.status_code} on attempt {attempt + 1}")
-                
-                response.raise_for_status()
-                
-            except requests.exceptions.RequestException as e:
-                print(f"Request error on attempt {attempt + 1}: {e}")
-                if attempt < max_retries - 1:
-                    wait_time = (attempt + 1) * 5
-                    print(f"Waiting {wait_time} seconds before retry...")
-                    time.sleep(wait_time)
-                else:
-                    raise
-        
-        return None
-    
     def get_episode_links(self, max_episodes=20):
         """Get all episode links from the main podcast page"""
         print(f"Fetching episode links from main podcast page (max {max_episodes})...")
@@ -185,80 +120,6 @@ class PodcastScraper:
         
         return None
     
-    def extract_transcript(self, episode_url):
-        """Extract the full transcript from an episode page"""
-        try:
-            print(f"Fetching transcript from: {episode_url}")
-            response = self.safe_request(episode_url)
-            if not response:
-                print("Failed to fetch episode page")
-                return ""
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # First, try to find transcript content in specific areas
-            transcript_text = ""
-            
-            # Try to find the transcript section
-            # Look for common transcript indicators
-            transcript_selectors = [
-                'div[class*="transcript"]',
-                'div[class*="content"]',
-                'article',
-                'main',
-                '.entry-content',
-                '.post-content'
-            ]
-            
-            transcript_found = False
-            for selector in transcript_selectors:
-                transcript_div = soup.select_one(selector)
-                if transcript_div:
-                    # Look for the actual transcript text
-                    # Remove script and style elements
-                    for script in transcript_div(["script", "style"]):
-                        script.decompose()
-                    
-                    # Get all text content
-                    text_content = transcript_div.get_text(separator='\n', strip=True)
-                    
-                    # Look for transcript markers like timestamps [00:00:01]
-                    if re.search(r'\[\d{2}:\d{2}:\d{2}\]', text_content):
-                        transcript_text = text_content
-                        transcript_found = True
-                        break
-            
-            # If no transcript found with selectors, search the entire page
-            if not transcript_found:
-                print("  Searching entire page for transcript content...")
-                all_text = soup.get_text(separator='\n', strip=True)
-                
-                # Look for timestamp patterns in the entire page
-                timestamp_matches = re.findall(r'\[\d{2}:\d{2}:\d{2}\].*?(?=\[\d{2}:\d{2}:\d{2}\]|$)', all_text, re.DOTALL)
-                if timestamp_matches:
-                    print(f"  Found {len(timestamp_matches)} timestamp sections")
-                    # Combine all timestamp sections
-                    transcript_text = '\n\n'.join(timestamp_matches)
-                    transcript_found = True
-                else:
-                    # Fallback: get the main content area
-                    main_content = soup.find('main') or soup.find('article') or soup.find('div', class_='content')
-                    if main_content:
-                        for script in main_content(["script", "style"]):
-                            script.decompose()
-                        transcript_text = main_content.get_text(separator='\n', strip=True)
-            
-            if transcript_found:
-                print(f"  Successfully extracted transcript ({len(transcript_text)} characters)")
-            else:
-                print(f"  No transcript found")
-            
-            return transcript_text.strip()
-            
-        except Exception as e:
-            print(f"Error extracting transcript from {episode_url}: {e}")
-            return ""
-    
     def save_transcript(self, transcript, episode_url, output_dir="transcripts"):
         """Save transcript to a text file"""
         if not transcript:
@@ -299,25 +160,23 @@ class PodcastScraper:
         """Get episode URLs from WordPress API"""
         print(f"Fetching episode URLs from WordPress API (max {max_episodes})...")
         
-        api_url = "https://www.iwillteachyoutoberich.com/wp-json/wp/v2/posts"
+        api_url = self.api_url
+        per_page = 50
+        
+        def request_page(page):
+            print(f"Fetching page {page}...")
+            return self.safe_request(api_url, params=self.listing_params(per_page, page))
         
+        self.discovery_failures = []
         try:
-            # Try to get more posts to find episodes - try multiple requests if needed
             episode_urls = []
-            page = 1
+            pages_read = 0
             
-            while len(episode_urls) < max_episodes and page <= 5:  # Limit to 5 pages to avoid too many requests
-                print(f"Fetching page {page}...")
-                response = self.safe_request(api_url, params={'per_page': 50, 'page': page})
-                if not response:
-                    print(f"Failed to fetch API data for page {page}")
-                    break
-                
-                data = response.json()
+            for page, data in iter_api_pages(request_page, per_page, concurrency=self.concurrency,
+                                             failed_pages=self.discovery_failures):
+                pages_read += 1
                 print(f"Found {len(data)} posts in API response for page {page}")
-                
-                if not data:  # No more posts
-                    break
+                discovered = []
                 
                 for post in data:
                     if len(episode_urls) >= max_episodes:
@@ -333,6 +192,13 @@ class PodcastScraper:
                         re.search(r'\d+', slug) or 
                         'podcast' in title or 'podcast' in slug):
                         
+                        discovered.append((self.extract_episode_number(link), link, post.get('id'),
+                                           post.get('title', {}).get('rendered', ''), post.get('modified')))
+                        
+                        # Sync runs skip posts unchanged since they were last saved
+                        if self.catalog and not self.catalog.note(post, self.extract_episode_number(link)):
+                            continue
+                        
                         if link not in episode_urls:
                             episode_urls.append(link)
                             print(f"Found episode {len(episode_urls)}: {link}")
@@ -340,22 +206,77 @@ class PodcastScraper:
                             # Check if it has transcript content
                             if 'transcript' in content.lower():
                                 print(f"  *** Has transcript content")
+                            
+                            # Keep the body so extract_transcript can skip the page fetch
+                            if self.use_api_content and content:
+                                self.api_content[link] = content
                 
-                page += 1
+                if self.db and discovered:
+                    self.db.add_episodes(discovered)
+                
+                if len(episode_urls) >= max_episodes:
+                    break
             
-            print(f"Found {len(episode_urls)} episode URLs from API across {page-1} pages")
+            if self.catalog:
+                for episode_num, link in self.catalog.retry_links():
+                    if link not in episode_urls and len(episode_urls) < max_episodes:
+                        episode_urls.append(link)
+                        print(f"Retrying episode that failed last sync: {link}")
+            
+            print(f"Found {len(episode_urls)} episode URLs from API across {pages_read} pages")
+            if self.discovery_failures:
+                print(f"Warning: listing is incomplete, failed to fetch pages {self.discovery_failures}")
             return episode_urls
             
         except Exception as e:
             print(f"Error fetching episodes from API: {e}")
+            self.discovery_failures.append('listing')
             return []
     
-    def extract_episode_number(self, url):
-        """Extract episode number from URL"""
-        match = re.search(r'/(\d+)-', url)
-        if match:
-            return int(match.group(1))
-        return None
+    def get_episodes_from_sitemap(self, max_episodes=100):
+        """Get episode URLs from the WordPress sitemaps, highest episode first
+        
+        The sitemap index and its post sitemaps list every post with its
+        <lastmod> in a few small requests. Sync runs skip sitemaps and
+        posts whose lastmod hasn't changed since they were last saved.
+        """
+        sitemap_url = self.sitemap_url or f"{self.base_url}/wp-sitemap.xml"
+        print(f"Fetching episode URLs from sitemap {sitemap_url} (max {max_episodes})...")
+        
+        sitemaps = SitemapDiscovery(self.safe_request, sitemap_url,
+                                    synced=self.catalog.synced_sitemaps() if self.catalog else None)
+        discovered = []
+        for link, lastmod in sitemaps.post_urls():
+            episode_num = self.extract_episode_number(link)
+            if episode_num:
+                discovered.append((episode_num, link, None, None, lastmod))
+        discovered.sort(key=lambda episode: episode[0], reverse=True)
+        
+        self.discovery_failures = sitemaps.failed
+        if self.db and discovered:
+            self.db.add_episodes(discovered)
+        
+        episode_urls = []
+        for episode_num, link, post_id, title, lastmod in discovered:
+            # Sync runs skip posts unchanged since they were last saved
+            if self.catalog and not self.catalog.note({'link': link, 'modified': lastmod}, episode_num,
+                                                      from_sitemap=True):
+                continue
+            if len(episode_urls) < max_episodes and link not in episode_urls:
+                episode_urls.append(link)
+        
+        if self.catalog:
+            self.catalog.note_sitemaps(sitemaps.read)
+            for episode_num, link in self.catalog.retry_links():
+                if link not in episode_urls and len(episode_urls) < max_episodes:
+                    episode_urls.append(link)
+                    print(f"Retrying episode that failed last sync: {link}")
+        
+        print(f"Found {len(episode_urls)} episode URLs ({len(discovered)} episodes listed) "
+              f"from {sitemaps.requests} sitemap requests")
+        if self.discovery_failures:
+            print(f"Warning: listing is incomplete, failed to fetch sitemaps {self.discovery_failures}")
+        return episode_urls
     
     def save_combined_transcripts(self, transcripts_data, output_dir="transcripts"):
         """Save all transcripts to a single file with episode range in filename"""
@@ -363,35 +284,11 @@ class PodcastScraper:
             print("No transcripts to save")
             return
         
-        # Create output directory if it doesn't exist
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Extract episode numbers and create filename
-        episode_numbers = []
-        for url, transcript in transcripts_data:
-            episode_num = self.extract_episode_number(url)
-            if episode_num:
-                episode_numbers.append(episode_num)
-        
-        if len(episode_numbers) >= 2:
-            # Sort episode numbers and create range filename
-            episode_numbers.sort(reverse=True)  # Highest to lowest
-            filename = f"{episode_numbers[0]}-{episode_numbers[-1]}.txt"
-        else:
-            # Fallback filename
-            filename = f"episodes_{len(transcripts_data)}.txt"
-        
-        filepath = os.path.join(output_dir, filename)
-        
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                for i, (url, transcript) in enumerate(transcripts_data, 1):
-                    episode_num = self.extract_episode_number(url)
-                    f.write(f"EPISODE {episode_num if episode_num else 'UNKNOWN'}\n")
-                    f.write(f"URL: {url}\n")
-                    f.write("=" * 80 + "\n\n")
-                    f.write(transcript)
-                    f.write("\n\n" + "=" * 80 + "\n\n")
+            with CombinedTranscriptWriter(output_dir, segments=self.export_segments) as writer:
+                for url, transcript in transcripts_data:
+                    writer.add(url, transcript)
+                filepath = writer.close()
             
             print(f"Saved combined transcripts to: {filepath}")
             return filepath
@@ -400,24 +297,47 @@ class PodcastScraper:
             print(f"Error saving combined transcripts: {e}")
             return None
     
-    def scrape_all_transcripts(self, start_episode=None, end_episode=None):
+    def scrape_all_transcripts(self, start_episode=None, end_episode=None, max_episodes=100):
         """Main method to scrape all podcast transcripts
 
         Args:
             start_episode: Only scrape episodes >= this number (None = no minimum)
             end_episode: Only scrape episodes <= this number (None = no maximum)
+            max_episodes: How many episodes to discover before filtering
         """
         print("Starting podcast transcript scraper...")
         if start_episode or end_episode:
             print(f"Episode range: {start_episode or 'any'} - {end_episode or 'any'}")
 
-        # Get episode links from WordPress API (more comprehensive)
-        episode_links = self.get_episodes_from_api(max_episodes=100)
+        if self.db:
+            self.db.start_run('podcast')
 
-        if not episode_links:
-            print("No episode links found from API. Trying main page...")
-            # Fallback to main page scraping
-            episode_links = self.get_episode_links(max_episodes=100)
+        # Get episode links from the WordPress API or sitemaps (more comprehensive)
+        with self.metrics.stage('discovery'):
+            if self.discover_from_db:
+                # Range filtering happens in the query, so max_episodes counts in-range episodes
+                episode_links = [url for num, url, title in self.db.episodes(start_episode, end_episode, limit=max_episodes)]
+                print(f"Using {len(episode_links)} episodes from {self.db.path}")
+            elif self.discovery == 'sitemap':
+                episode_links = self.get_episodes_from_sitemap(max_episodes=max_episodes)
+            else:
+                episode_links = self.get_episodes_from_api(max_episodes=max_episodes)
+                if not episode_links and not self.catalog:
+                    print("No episode links found from API. Trying the sitemap...")
+                    episode_links = self.get_episodes_from_sitemap(max_episodes=max_episodes)
+
+            if not episode_links and not self.catalog:
+                print("No episode links found in the API or sitemap. Trying main page...")
+                # Fallback to main page scraping
+                episode_links = self.get_episode_links(max_episodes=max_episodes)
+
+        if not episode_links and self.catalog:
+            if not self.discovery_failures:
+                print("No new or edited episodes since the last sync")
+            self.catalog.commit(attempted=(), saved=(), complete=not self.discovery_failures)
+            if self.db:
+                self.db.finish_run(saved=0, failed=0)
+            return
 
         if not episode_links:
             print("No episode links found. Trying alternative approach...")
@@ -446,30 +366,41 @@ class PodcastScraper:
             print(f"{i:2d}. {url}")
         print("=" * 80)
 
-        # Scrape transcripts for all episodes
+        # Scrape transcripts for all episodes, appending each one to the
+        # combined file as soon as it is extracted
         print(f"\nScraping transcripts for {len(episode_links)} episodes...")
-        transcripts_data = []
         successful_scrapes = 0
+        if self.concurrency > 1 and not self.pipeline:
+            print(f"Fetching with {self.concurrency} concurrent workers...")
 
-        for i, episode_url in enumerate(episode_links, 1):
-            print(f"\n[{i}/{len(episode_links)}] Processing: {episode_url}")
+        with CombinedTranscriptWriter(self.output_dir, segments=self.export_segments) as writer:
+            for i, (episode_url, transcript) in enumerate(self.fetch_transcripts(episode_links), 1):
+                print(f"\n[{i}/{len(episode_links)}] Processed: {episode_url}")
 
-            transcript = self.extract_transcript(episode_url)
-            if transcript:
-                transcripts_data.append((episode_url, transcript))
-                successful_scrapes += 1
-                print(f"  ✓ Successfully extracted transcript ({len(transcript)} characters)")
-            else:
-                print(f"  ✗ Failed to extract transcript")
+                if transcript:
+                    with self.metrics.stage('save'):
+                        writer.add(episode_url, transcript)
+                    successful_scrapes += 1
+                    print(f"  ✓ Successfully extracted transcript ({len(transcript)} characters)")
+                else:
+                    if self.db:
+                        self.db.mark_failed(episode_url)
+                    print(f"  ✗ Failed to extract transcript")
+
+            with self.metrics.stage('save'):
+                filepath = writer.close()
 
-        # Save all transcripts to a single file
-        if transcripts_data:
-            print(f"\nSaving {len(transcripts_data)} transcripts to combined file...")
-            filepath = self.save_combined_transcripts(transcripts_data)
+        if self.db:
             if filepath:
-                print(f"✓ Successfully saved combined transcripts to: {filepath}")
-            else:
-                print("✗ Failed to save combined transcripts")
+                self.db.mark_saved(writer.episodes, filepath)
+            self.db.finish_run(saved=successful_scrapes, failed=len(episode_links) - successful_scrapes)
+
+        if self.catalog:
+            self.catalog.commit(attempted=episode_links, saved={url for num, url, content_hash, chars in writer.episodes},
+                                complete=not self.discovery_failures)
+
+        if filepath:
+            print(f"✓ Successfully saved {successful_scrapes} transcripts to: {filepath}")
         else:
             print("No transcripts to save")
 
@@ -481,14 +412,22 @@ def main():
     )
     parser.add_argument("--start", type=int, help="Start episode number")
     parser.add_argument("--end", type=int, help="End episode number")
+    parser.add_argument("--max-episodes", type=int, default=100,
+                        help="How many episodes to discover before range filtering (default: 100)")
+    add_common_arguments(parser)
 
     args = parser.parse_args()
 
-    scraper = PodcastScraper()
+    check_common_arguments(parser, args)
+
+    scraper = PodcastScraper(**scraper_options(args))
+    scraper.configure(args)
     scraper.scrape_all_transcripts(
         start_episode=args.start,
-        end_episode=args.end
+        end_episode=args.end,
+        max_episodes=args.max_episodes
     )
+    scraper.finish(args)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
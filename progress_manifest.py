@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Progress manifest for resumable batch scraping
+Records the episode list and per-episode status so a restarted run only
+retries what is missing
+"""
+
+import json
+import os
+import time
+
+# A finished run's episode list is re-enumerated after this long, so new
+# episodes are picked up without --refresh-episodes
+EPISODE_LIST_MAX_AGE = 24 * 3600
+
+class ProgressManifest:
+    """Episode list and per-episode status, saved as one JSON file
+
+    mark() only updates the in-memory record; the caller saves once per
+    batch, after that batch's transcripts are written, so a run rewrites
+    the manifest once per batch rather than once per episode.
+    """
+
+    def __init__(self, path="transcripts/.batch_manifest.json"):
+        self.path = path
+        self.unsaved = False
+        self.data = {'episode_list': [], 'episode_list_fetched_at': None, 'episodes': {}}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.data.update(json.load(f))
+                print(f"Loaded progress manifest: {self.path} ({self.count('done')} episodes done)")
+            except (OSError, ValueError) as e:
+                print(f"Could not read progress manifest {self.path}: {e}")
+
+    def save(self):
+        """Write the manifest atomically"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=1)
+        os.replace(tmp_path, self.path)
+        self.unsaved = False
+
+    def save_marks(self):
+        """Save the manifest if mark() changed it since the last save"""
+        if self.unsaved:
+            self.save()
+
+    def cached_episode_list(self, max_age=EPISODE_LIST_MAX_AGE):
+        """Return the saved (episode_num, url) list for a restart, or None
+
+        The list is reused while some of its episodes were never finished
+        (an interrupted run) or while it is younger than max_age seconds.
+        Otherwise None is returned so the episodes are enumerated again.
+        """
+        if not self.data['episode_list']:
+            return None
+        episodes = [tuple(item) for item in self.data['episode_list']]
+        unfinished = any(self.status(episode_num) not in ('done', 'failed') for episode_num, url in episodes)
+        fetched_at = self.data['episode_list_fetched_at']
+        if unfinished or (fetched_at and time.time() - fetched_at < max_age):
+            return episodes
+        print("Episode list in the progress manifest is finished and out of date, enumerating again")
+        return None
+
+    def set_episode_list(self, episodes):
+        """Remember the enumerated (episode_num, url) list for restarts"""
+        self.data['episode_list'] = [list(item) for item in episodes]
+        self.data['episode_list_fetched_at'] = time.time()
+        self.save()
+
+    def status(self, episode_num):
+        """Return 'done', 'failed' or None for an episode"""
+        return self.data['episodes'].get(str(episode_num), {}).get('status')
+
+    def is_done(self, episode_num):
+        return self.status(episode_num) == 'done'
+
+    def count(self, status):
+        return sum(1 for item in self.data['episodes'].values() if item.get('status') == status)
+
+    def mark(self, episode_num, url, status, output_file=None, content_hash=None, size=None):
+        """Record the outcome for one episode, saved by the next save_marks()"""
+        record = {'url': url, 'status': status, 'updated_at': time.time()}
+        if output_file:
+            record['output_file'] = output_file
+        if content_hash:
+            record['content_hash'] = content_hash
+            record['size'] = size
+        self.data['episodes'][str(episode_num)] = record
+        self.unsaved = True
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Adaptive request pacing for the scrapers
+Raises the request rate additively while the server answers normally,
+halves it on 429/403/5xx, honours Retry-After, and remembers the learned
+rate between runs
+"""
+
+from email.utils import parsedate_to_datetime
+from datetime import timezone
+import json
+import os
+import random
+import threading
+import time
+
+# Responses that mean "slow down"
+THROTTLE_STATUSES = {403, 429}
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)
+
+    Returns None when the header is missing or unparseable.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, when.timestamp() - time.time())
+
+class RateController:
+    """AIMD pacing shared by every worker of a scraper
+
+    The rate is requests per second. Each healthy response adds `increase`
+    to it (up to 1/min_delay); each throttled or 5xx response multiplies it
+    by `decrease` (down to 1/max_delay). A Retry-After pauses all workers
+    until it has passed. With a state_path the rate is saved per host and
+    picked up by the next run.
+    """
+
+    def __init__(self, start_delay=2.0, min_delay=0.5, max_delay=60.0, increase=0.02,
+                 decrease=0.5, jitter=0.25, state_path=None, host=None):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.increase = increase
+        self.decrease = decrease
+        self.jitter = jitter  # Up to this fraction of the delay is added at random
+        self.state_path = state_path
+        self.host = host or "default"
+        self.lock = threading.Lock()
+        self.last_request_time = 0
+        self.not_before = 0  # No request may start before this time (Retry-After)
+        self.rate = self.clamp(1 / start_delay if start_delay > 0 else float('inf'))
+        self.load()
+
+    def clamp(self, rate):
+        max_rate = 1 / self.min_delay if self.min_delay > 0 else float('inf')
+        return min(max(rate, 1 / self.max_delay), max_rate)
+
+    @property
+    def delay(self):
+        """Current seconds between requests"""
+        return 1 / self.rate if self.rate else self.max_delay
+
+    def wait(self):
+        """Block until this worker may send its next request
+
+        Reserves the next slot under the lock and sleeps outside it, so
+        concurrent workers still queue up behind one pace while responses
+        can adjust the rate in the meantime. A Retry-After that arrives
+        during the sleep pushes the slot back. Returns the seconds spent waiting.
+        """
+        entered = time.perf_counter()
+        with self.lock:
+            delay = self.delay
+            ready_at = max(self.last_request_time + delay + random.uniform(0, self.jitter * delay),
+                           self.not_before, time.time())
+            self.last_request_time = ready_at
+        while True:
+            sleep_time = ready_at - time.time()
+            if sleep_time > 0:
+                print(f"Rate limiting: sleeping for {sleep_time:.1f} seconds...")
+                time.sleep(sleep_time)
+            with self.lock:
+                if self.not_before <= ready_at:
+                    break
+                ready_at = self.not_before
+                self.last_request_time = max(self.last_request_time, ready_at)
+        return time.perf_counter() - entered
+
+    def on_response(self, status_code, headers=None):
+        """Adjust the rate for one response
+
+        Returns the Retry-After delay in seconds when the server sent one,
+        after pausing every worker for that long, otherwise None.
+        """
+        retry_after = parse_retry_after((headers or {}).get('Retry-After'))
+        throttled = status_code in THROTTLE_STATUSES or status_code >= 500
+        with self.lock:
+            if throttled:
+                self.rate = self.clamp(self.rate * self.decrease)
+                print(f"Slowing down to one request every {self.delay:.1f}s (HTTP {status_code})")
+            elif status_code < 400:
+                self.rate = self.clamp(self.rate + self.increase)
+            if retry_after is not None:
+                self.not_before = max(self.not_before, time.time() + retry_after)
+        if throttled:
+            self.save()
+        return retry_after
+
+    def on_error(self):
+        """Treat a connection error or timeout like a 5xx"""
+        with self.lock:
+            self.rate = self.clamp(self.rate * self.decrease)
+
+    def load(self):
+        """Pick up the rate learned by an earlier run for this host"""
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f).get(self.host)
+        except (OSError, ValueError) as e:
+            print(f"Could not read rate state {self.state_path}: {e}")
+            return
+        if state and state.get('rate'):
+            self.rate = self.clamp(state['rate'])
+            print(f"Resuming at one request every {self.delay:.2f}s (learned rate for {self.host})")
+
+    def save(self):
+        """Write the current rate for this host, keeping other hosts' entries"""
+        if not self.state_path:
+            return
+        state = {}
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = {}
+        with self.lock:
+            state[self.host] = {'rate': self.rate, 'updated_at': time.time()}
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        tmp_path = f"{self.state_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=1)
+        os.replace(tmp_path, self.state_path)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Rebuild combined transcript files from the page archive
+Reruns transcript extraction over the archived API listings and episode
+pages without touching the network, optionally across several processes
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from page_archive import PageArchive, read_record
+from transcript_writer import CombinedTranscriptWriter, extract_episode_number
+from transcript_extractor import extract_transcript_from_html, extract_transcript_from_api_content, PARSER_BACKENDS, DEFAULT_PARSER
+
+def archived_episodes(archive):
+    """Collect episodes from the newest archived records
+
+    Returns ([(episode_num, url)] newest episode first, {url: API content},
+    {url: page index entry}).
+    """
+    episodes = {}
+    api_content = {}
+    for entry in archive.latest_entries('api'):
+        if entry['status'] != 200:
+            continue
+        try:
+            posts = archive.read_json(entry)
+        except ValueError:
+            continue
+        if not isinstance(posts, list):
+            continue
+        for post in posts:
+            link = post.get('link') or ''
+            episode_num = extract_episode_number(link)
+            if episode_num is None:
+                continue
+            episodes[link] = episode_num
+            content = (post.get('content') or {}).get('rendered')
+            if content:
+                api_content[link] = content
+
+    pages = {}
+    for entry in archive.latest_entries('page'):
+        episode_num = extract_episode_number(entry['url'])
+        if episode_num is None or entry['status'] != 200:
+            continue
+        episodes.setdefault(entry['url'], episode_num)
+        pages[entry['url']] = entry
+
+    ordered = sorted(((num, url) for url, num in episodes.items()), key=lambda item: item[0], reverse=True)
+    return ordered, api_content, pages
+
+def extract_episode(content, page_html, parser=DEFAULT_PARSER):
+    """Extract one episode the way the scrapers do
+
+    API content is used when it holds a transcript, otherwise the archived
+    episode page. Returns an empty string when neither is available.
+    """
+    if content:
+        transcript_text = extract_transcript_from_api_content(content, parser=parser)
+        if transcript_text:
+            return transcript_text
+    if page_html is None:
+        return ""
+    transcript_text, transcript_found = extract_transcript_from_html(page_html, parser=parser)
+    return transcript_text
+
+def extract_archived(task):
+    """Process-pool entry point: extract one episode from its archive record
+
+    task is (archive_path, page_entry or None, api_content or None, parser).
+    Workers read the page themselves, so only offsets and API content cross
+    the process boundary, not page bodies.
+    """
+    archive_path, page_entry, content, parser = task
+    page_html = read_record(archive_path, page_entry)[2] if page_entry else None
+    return extract_episode(content, page_html, parser=parser)
+
+def reextract(archive_dir="archive", output_dir="transcripts", parser=DEFAULT_PARSER,
+              use_api_content=True, export_segments=False, start_episode=None, end_episode=None,
+              workers=1, chunksize=None):
+    """Write one combined file for every archived episode in range
+
+    With workers > 1 extraction runs in a process pool; results still come
+    back in episode order. Returns the combined file's path, or None when
+    nothing was extracted.
+    """
+    archive = PageArchive(archive_dir)
+    episodes, api_content, pages = archived_episodes(archive)
+    episodes = [(num, url) for num, url in episodes
+                if not (start_episode and num < start_episode) and not (end_episode and num > end_episode)]
+    if not episodes:
+        print(f"No archived episodes found in {archive_dir}")
+        return None
+    workers = max(1, workers)
+    print(f"Re-extracting {len(episodes)} archived episodes from {archive_dir}"
+          + (f" with {workers} processes..." if workers > 1 else "..."))
+
+    tasks = [(archive.archive_path, pages.get(url), api_content.get(url) if use_api_content else None, parser)
+             for episode_num, url in episodes]
+    start = time.perf_counter()
+    extracted = 0
+    with CombinedTranscriptWriter(output_dir, segments=export_segments) as writer:
+        if workers > 1:
+            # A few chunks per worker keeps IPC low without leaving workers idle at the end
+            chunksize = chunksize or max(1, len(tasks) // (workers * 4))
+            executor = ProcessPoolExecutor(max_workers=workers)
+            results = executor.map(extract_archived, tasks, chunksize=chunksize)
+        else:
+            executor = None
+            results = map(extract_archived, tasks)
+        try:
+            for (episode_num, url), transcript in zip(episodes, results):
+                if transcript:
+                    writer.add(url, transcript)
+                    extracted += 1
+                else:
+                    print(f"  ✗ Episode {episode_num}: nothing archived to extract from ({url})")
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
+        filepath = writer.close()
+
+    print(f"Re-extracted {extracted}/{len(episodes)} episodes in {time.perf_counter() - start:.1f}s")
+    if filepath:
+        print(f"✓ Saved to: {filepath}")
+    return filepath
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild transcripts from the page archive without the network")
+    parser.add_argument("--archive-dir", default="archive", help="Page archive to read (default: archive)")
+    parser.add_argument("--output-dir", default="transcripts", help="Where to write the combined file (default: transcripts)")
+    parser.add_argument("--start", type=int, help="Start episode number")
+    parser.add_argument("--end", type=int, help="End episode number")
+    parser.add_argument("--parser", choices=PARSER_BACKENDS, default=DEFAULT_PARSER,
+                        help=f"HTML parser backend for transcript extraction (default: {DEFAULT_PARSER})")
+    parser.add_argument("--no-api-content", action="store_true",
+                        help="Only extract from archived episode pages, not API post content")
+    parser.add_argument("--segments", action="store_true",
+                        help="Also write the per-segment JSONL and column files")
+    parser.add_argument("--workers", type=int, default=1,
+                        help=f"Extraction processes to run in parallel (default: 1, this machine has {os.cpu_count()} cores)")
+    parser.add_argument("--chunksize", type=int,
+                        help="Episodes handed to a worker at a time (default: about 4 chunks per worker)")
+    args = parser.parse_args()
+
+    reextract(
+        archive_dir=args.archive_dir,
+        output_dir=args.output_dir,
+        parser=args.parser,
+        use_api_content=not args.no_api_content,
+        export_segments=args.segments,
+        start_episode=args.start,
+        end_episode=args.end,
+        workers=args.workers,
+        chunksize=args.chunksize
+    )
+
+if __name__ == "__main__":
+    main()
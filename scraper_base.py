@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+Setup, options, request, extraction and pipeline code shared by the
+podcast scrapers. PodcastScraper and BatchPodcastScraper both inherit
+from ScraperBase, and their main() takes the common command-line options
+from add_common_arguments()
+"""
+
+import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from episode_catalog import EpisodeCatalog
+from episode_db import EpisodeDB
+from http_cache import HTTPCache
+from metrics import RunMetrics, RequestRecord
+from page_archive import PageArchive
+from pipeline import Pipeline
+from rate_controller import RateController
+from wp_api import listing_params, LISTING_FIELDS
+from transcript_extractor import (extract_transcript_from_html, extract_transcript_from_api_content,
+                                  extract_transcript_from_payload, api_content_has_transcript,
+                                  PARSER_BACKENDS, DEFAULT_PARSER)
+
+def add_common_arguments(parser):
+    """Add the options both scrapers take: fetching, pipeline, extraction,
+    discovery, cache, archive, rate state, metrics, database and --sync"""
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Number of episodes to fetch in parallel (default: 1)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Run fetching and parsing as separate stages joined by bounded queues")
+    parser.add_argument("--parse-workers", type=int, default=1,
+                        help="Parse workers in --pipeline mode (default: 1)")
+    parser.add_argument("--parse-processes", type=int, default=0,
+                        help="Parse in this many processes instead of threads in --pipeline mode")
+    parser.add_argument("--queue-size", type=int, default=8,
+                        help="Capacity of each queue between pipeline stages (default: 8)")
+    parser.add_argument("--no-api-content", action="store_true",
+                        help="Always fetch episode pages instead of using API post content")
+    parser.add_argument("--parser", choices=PARSER_BACKENDS, default=DEFAULT_PARSER,
+                        help=f"HTML parser backend for transcript extraction (default: {DEFAULT_PARSER})")
+    parser.add_argument("--segments", action="store_true",
+                        help="Also write the per-segment JSONL and column files")
+    parser.add_argument("--discovery", choices=['api', 'sitemap'], default='api',
+                        help="Find episodes by paging the posts API or by reading the XML sitemaps (default: api)")
+    parser.add_argument("--sitemap-url",
+                        help="Sitemap index for --discovery sitemap (default: wp-sitemap.xml on the site)")
+    parser.add_argument("--full-listing", action="store_true",
+                        help="Request full post objects instead of only the fields discovery needs")
+    parser.add_argument("--categories", help="Comma-separated category IDs to restrict discovery to")
+    parser.add_argument("--tags", help="Comma-separated tag IDs to restrict discovery to")
+    parser.add_argument("--cache-dir", default=".http_cache",
+                        help="Directory for cached responses (default: .http_cache)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Disable the response cache")
+    parser.add_argument("--offline", action="store_true",
+                        help="Serve every request from the cache without touching the network")
+    parser.add_argument("--archive-dir", default="archive",
+                        help="Append every fetched page to a compressed archive here (default: archive)")
+    parser.add_argument("--no-archive", action="store_true",
+                        help="Don't archive fetched pages")
+    parser.add_argument("--rate-state", default=".rate_state.json",
+                        help="File the learned request rate is kept in between runs (default: .rate_state.json)")
+    parser.add_argument("--no-rate-state", action="store_true",
+                        help="Start at the default pace and don't remember the learned rate")
+    parser.add_argument("--metrics-json",
+                        help="Write a JSON summary of request and stage timings to this file")
+    parser.add_argument("--metrics-prom",
+                        help="Write the same metrics in Prometheus text format to this file")
+    parser.add_argument("--db", default="transcripts/.episodes.db",
+                        help="SQLite database of episodes, runs and fetches (default: transcripts/.episodes.db)")
+    parser.add_argument("--no-db", action="store_true",
+                        help="Don't record episodes and fetches in the database")
+    parser.add_argument("--from-db", action="store_true",
+                        help="Take the episode list from the database instead of paging the API")
+    parser.add_argument("--sync", action="store_true",
+                        help="Only fetch episodes added or edited since the last --sync run")
+    parser.add_argument("--catalog", default="transcripts/.episode_catalog.json",
+                        help="Where --sync keeps its post catalog (default: transcripts/.episode_catalog.json)")
+
+def check_common_arguments(parser, args):
+    if args.offline and args.no_cache:
+        parser.error("--offline needs the response cache")
+    if args.from_db and (args.no_db or args.sync):
+        parser.error("--from-db needs the database and can't be combined with --sync")
+
+def scraper_options(args):
+    """Constructor arguments from add_common_arguments() options"""
+    return dict(
+        concurrency=args.concurrency,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        offline=args.offline,
+        rate_state=None if args.no_rate_state else args.rate_state,
+        archive_dir=None if args.no_archive else args.archive_dir,
+        db_path=None if args.no_db else args.db
+    )
+
+class ScraperBase:
+    """Session, caches, database and transcript extraction shared by the scrapers
+    
+    Subclasses call this __init__ and add their own settings; main() fills
+    the attributes below from add_common_arguments() with configure().
+    """
+    
+    def __init__(self, concurrency=1, cache_dir=".http_cache", offline=False, rate_state=".rate_state.json",
+                 archive_dir="archive", db_path="transcripts/.episodes.db"):
+        self.base_url = "https://www.iwillteachyoutoberich.com"
+        self.api_url = "https://www.iwillteachyoutoberich.com/wp-json/wp/v2/posts"
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+        })
+        
+        # Adaptive rate limiting - starts at one request every 2 seconds and
+        # learns how fast the server tolerates, remembered in rate_state
+        self.rate_controller = RateController(start_delay=2, state_path=rate_state,
+                                              host=urlparse(self.base_url).netloc)
+        
+        # Concurrency settings - all workers share the rate limit above
+        self.concurrency = max(1, concurrency)
+        adapter = HTTPAdapter(pool_maxsize=self.concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Staged fetch -> parse -> write pipeline; concurrency is the fetch workers
+        self.pipeline = False
+        self.parse_workers = 1
+        self.parse_processes = 0  # Parse in this many worker processes instead of threads
+        self.queue_size = 8  # Capacity of each queue between stages
+        
+        # Response cache - reruns revalidate instead of re-downloading
+        self.cache = HTTPCache(cache_dir) if cache_dir else None
+        self.offline = offline
+        if self.offline and not self.cache:
+            raise ValueError("Offline mode needs a response cache")
+        if self.cache:
+            self.cache.evict()
+        
+        # Every fetched page and API response, for re-extraction without the network
+        self.archive = PageArchive(archive_dir) if archive_dir else None
+        
+        # Per-request and per-stage timings for the run
+        self.metrics = RunMetrics()
+        
+        # Episodes, runs and fetch attempts, queryable without the API
+        self.db = EpisodeDB(db_path) if db_path else None
+        self.discover_from_db = False  # Take the episode list from the database instead of the API
+        
+        # Where combined transcript files are written
+        self.output_dir = "transcripts"
+        
+        # Write .segments.jsonl/.segments.columns.json next to each .txt
+        self.export_segments = False
+        
+        # HTML parser backend used for transcript extraction
+        self.parser = DEFAULT_PARSER
+        
+        # Post content from the API listing, keyed by episode URL
+        self.use_api_content = True
+        self.api_content = {}
+        
+        # Listing settings - request only the fields discovery reads
+        self.slim_listing = True
+        self.categories = None  # Comma-separated category IDs to restrict to
+        self.tags = None  # Comma-separated tag IDs to restrict to
+        
+        # Local post catalog - set for incremental --sync runs
+        self.catalog = None
+        
+        # Listing pages or sitemaps the last discovery couldn't fetch; a
+        # non-empty list means the episode list is incomplete
+        self.discovery_failures = []
+        
+        # Where episodes are discovered: 'api' pages the posts listing, 'sitemap' reads the XML sitemaps
+        self.discovery = 'api'
+        self.sitemap_url = None  # Sitemap index; defaults to wp-sitemap.xml under base_url
+        
+    def configure(self, args):
+        """Apply the add_common_arguments() options that aren't constructor arguments"""
+        self.pipeline = args.pipeline
+        self.parse_workers = args.parse_workers
+        self.parse_processes = args.parse_processes
+        self.queue_size = args.queue_size
+        self.use_api_content = not args.no_api_content
+        self.slim_listing = not args.full_listing
+        self.parser = args.parser
+        self.export_segments = args.segments
+        self.categories = args.categories
+        self.tags = args.tags
+        self.catalog = EpisodeCatalog(args.catalog) if args.sync else None
+        self.discover_from_db = args.from_db
+        self.discovery = args.discovery
+        self.sitemap_url = args.sitemap_url
+    
+    def finish(self, args):
+        """Save the learned rate, report the run metrics and close the database"""
+        self.rate_controller.save()
+        self.metrics.print_summary()
+        if args.metrics_json:
+            self.metrics.write_json(args.metrics_json)
+        if args.metrics_prom:
+            self.metrics.write_prometheus(args.metrics_prom)
+        if self.db:
+            self.db.close()
+    
+    def rate_limit(self):
+        """Wait for the adaptive rate controller before a request
+        
+        All workers share one controller, so adding workers doesn't raise
+        the request rate. Returns the seconds spent waiting.
+        """
+        return self.rate_controller.wait()
+    
+    def safe_request(self, url, params=None, max_retries=3):
+        """Make a request with retry logic, rate limiting and response caching
+        
+        Every call is recorded in self.metrics with its timings, bytes,
+        retries and sleeps.
+        """
+        record = RequestRecord(url)
+        started = time.perf_counter()
+        headers = None
+        try:
+            response = self.timed_request(url, params, max_retries, record)
+            if response is not None:
+                record.status = response.status_code
+                record.bytes = len(response.content)
+                headers = response.headers
+                if self.archive:
+                    self.archive.store(url, params, response)
+            elif record.source == 'network':
+                record.source = 'failed'
+            return response
+        except Exception:
+            record.source = 'failed'
+            raise
+        finally:
+            record.total = time.perf_counter() - started
+            self.metrics.record(record)
+            if self.db:
+                # A locked or full database loses the row, not the response
+                try:
+                    self.db.record_fetch(record, headers)
+                except sqlite3.Error as e:
+                    print(f"Could not record fetch of {url} in the episode database: {e}")
+    
+    def timed_request(self, url, params, max_retries, record):
+        """The request/retry loop behind safe_request, filling in record"""
+        cached = self.cache.load(url, params) if self.cache else None
+        if self.offline:
+            if cached:
+                print(f"Serving from cache: {url}")
+                record.source = 'cache'
+                return self.cache.to_response(cached)
+            print(f"Offline and not cached: {url}")
+            return None
+        
+        headers = self.cache.conditional_headers(cached) if cached else None
+        for attempt in range(max_retries):
+            record.retries = attempt
+            retry_after = None
+            try:
+                record.rate_limit_wait += self.rate_limit()
+                print(f"Making request to: {url}")
+                sent = time.perf_counter()
+                try:
+                    response = self.session.get(url, params=params, headers=headers, timeout=30)
+                finally:
+                    record.network += time.perf_counter() - sent
+                record.status = response.status_code
+                record.ttfb = response.elapsed.total_seconds()
+                retry_after = self.rate_controller.on_response(response.status_code, response.headers)
+                
+                if response.status_code == 304 and cached:
+                    print(f"Not modified, using cached copy: {url}")
+                    record.source = 'not_modified'
+                    return self.cache.revalidated(url, params, cached, response)
+                elif response.status_code == 200:
+                    if self.cache:
+                        self.cache.store(url, params, response)
+                    return response
+                elif response.status_code == 403:
+                    print(f"Got 403 Forbidden on attempt {attempt + 1}")
+                    if attempt < max_retries - 1:
+                        # Wait as long as the server asks, or longer each attempt
+                        wait_time = retry_after if retry_after is not None else (attempt + 1) * 10
+                        print(f"Waiting {wait_time:.0f} seconds before retry...")
+                        time.sleep(wait_time)
+                        record.backoff_sleep += wait_time
+                        continue
+                elif response.status_code == 429:
+                    print(f"Rate limited (429) on attempt {attempt + 1}")
+                    if attempt < max_retries - 1:
+                        # Honour Retry-After exactly, otherwise wait much longer
+                        wait_time = retry_after if retry_after is not None else (attempt + 1) * 30
+                        print(f"Rate limited, waiting {wait_time:.0f} seconds...")
+                        time.sleep(wait_time)
+                        record.backoff_sleep += wait_time
+                        continue
+                else:
+                    print(f"HTTP {response.status_code} on attempt {attempt + 1}")
+                
+                response.raise_for_status()
+                
+            except requests.exceptions.RequestException as e:
+                print(f"Request error on attempt {attempt + 1}: {e}")
+                if not isinstance(e, requests.exceptions.HTTPError):
+                    # Timeouts and dropped connections count against the rate too
+                    self.rate_controller.on_error()
+                if attempt < max_retries - 1:
+                    wait_time = retry_after if retry_after is not None else (attempt + 1) * 5
+                    print(f"Waiting {wait_time:.0f} seconds before retry...")
+                    time.sleep(wait_time)
+                    record.backoff_sleep += wait_time
+                else:
+                    raise
+        
+        return None
+    
+    def listing_params(self, per_page, page):
+        """Query params for one page of the post listing
+        
+        Slim listings ask for just the discovery fields, plus content when
+        transcripts are read from the API.
+        """
+        fields = None
+        if self.slim_listing:
+            fields = LISTING_FIELDS + (['content'] if self.use_api_content else [])
+        filters = self.catalog.sync_params() if self.catalog else None
+        return listing_params(per_page, page, fields=fields, categories=self.categories, tags=self.tags,
+                              filters=filters)
+    
+    def extract_episode_number(self, url):
+        """Extract episode number from URL"""
+        match = re.search(r'/(\d+)-', url)
+        if match:
+            return int(match.group(1))
+        return None
+    
+    def extract_transcript(self, episode_url):
+        """Extract the full transcript from an episode page
+        
+        Uses the post content from the API listing when it already contains
+        the transcript, and only fetches the episode page otherwise.
+        """
+        try:
+            content = self.api_content.pop(episode_url, None)
+            if self.use_api_content and content:
+                with self.metrics.stage('extract'):
+                    transcript_text = extract_transcript_from_api_content(content, parser=self.parser)
+                if transcript_text:
+                    print(f"  Extracted transcript from API content ({len(transcript_text)} characters): {episode_url}")
+                    return transcript_text
+            
+            print(f"Fetching transcript from: {episode_url}")
+            with self.metrics.stage('fetch'):
+                response = self.safe_request(episode_url)
+            if not response:
+                print("Failed to fetch episode page")
+                return ""
+            
+            with self.metrics.stage('extract'):
+                transcript_text, transcript_found = extract_transcript_from_html(response.content, parser=self.parser)
+            
+            if transcript_found:
+                print(f"  Successfully extracted transcript ({len(transcript_text)} characters)")
+            else:
+                print(f"  No transcript found")
+            
+            return transcript_text
+            
+        except Exception as e:
+            print(f"Error extracting transcript from {episode_url}: {e}")
+            return ""
+    
+    def fetch_transcripts(self, episode_urls):
+        """Yield (url, transcript) pairs in episode order
+        
+        With concurrency > 1 the episode pages are fetched by a thread pool,
+        but results are still yielded in the order of episode_urls.
+        """
+        if self.pipeline:
+            yield from self.pipeline_transcripts(episode_urls)
+            return
+        
+        if self.concurrency <= 1:
+            for episode_url in episode_urls:
+                yield episode_url, self.extract_transcript(episode_url)
+            return
+        
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            yield from zip(episode_urls, executor.map(self.extract_transcript, episode_urls))
+    
+    def fetch_episode(self, episode_url):
+        """Pipeline fetch stage: ('api', content) when the listing has the transcript, else ('html', page)
+        
+        The choice is made here, so a post whose timestamps are only in the
+        markup gets its page fetched now and parse workers never hit the network.
+        """
+        content = self.api_content.pop(episode_url, None)
+        if self.use_api_content and api_content_has_transcript(content):
+            return ('api', content)
+        
+        print(f"Fetching transcript from: {episode_url}")
+        with self.metrics.stage('fetch'):
+            response = self.safe_request(episode_url)
+        if not response:
+            print("Failed to fetch episode page")
+            return None
+        return ('html', response.content)
+    
+    def parse_episode(self, episode_url, payload, transcript_text=None):
+        """Pipeline parse stage; transcript_text is passed in when a worker process already extracted it"""
+        if payload is None:
+            return ""
+        if transcript_text is None:
+            with self.metrics.stage('extract'):
+                transcript_text = extract_transcript_from_payload(payload, parser=self.parser)
+        
+        if payload[0] == 'api' and transcript_text:
+            print(f"  Extracted transcript from API content ({len(transcript_text)} characters): {episode_url}")
+        elif transcript_text:
+            print(f"  Successfully extracted transcript ({len(transcript_text)} characters)")
+        else:
+            print(f"  No transcript found")
+        return transcript_text
+    
+    def pipeline_transcripts(self, episode_urls):
+        """Yield (url, transcript) pairs in episode order from a bounded fetch -> parse pipeline
+        
+        Fetch workers stop when the queues are full, so a slow parse or
+        write stage caps memory instead of piling up pages. Queue depths go
+        into the run metrics, and the busiest stage is named at the end.
+        """
+        parse_workers = max(self.parse_workers, self.parse_processes)
+        pipeline = Pipeline(self.fetch_episode, self.parse_episode,
+                            fetch_workers=self.concurrency, parse_workers=parse_workers, queue_size=self.queue_size,
+                            parse_process=partial(extract_transcript_from_payload, parser=self.parser),
+                            parse_processes=self.parse_processes, metrics=self.metrics, report_interval=10)
+        print(f"Pipeline: {self.concurrency} fetch workers, {parse_workers} parse workers"
+              + (f" on {self.parse_processes} processes" if self.parse_processes else "")
+              + f", queues of {self.queue_size}")
+        for episode_url, transcript_text in pipeline.run(episode_urls):
+            yield episode_url, transcript_text or ""
+        print(f"Pipeline bottleneck: {pipeline.bottleneck()} stage")
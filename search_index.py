@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Full-text search over scraped transcripts
+Builds an inverted index from the combined files in transcripts/ mapping
+each term to the episodes and [hh:mm:ss] segments it occurs in. Postings
+are delta- and varint-encoded, and rebuilds only re-tokenize episodes that
+are new or changed and only rewrite the postings of the terms they contain.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from transcript_reader import TranscriptFile
+from transcript_segments import parse_segments
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z0-9]+)*")
+
+META_FILE = "meta.json"
+POSTINGS_FILE = "postings.bin"
+
+# Rewrite the whole postings file once this share of it is superseded lists
+# or lists of removed documents
+COMPACT_RATIO = 0.5
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+def format_offset(seconds):
+    return f"[{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}]"
+
+def encode_varint(value, out):
+    """Append value to a bytearray as an unsigned LEB128 varint"""
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def decode_varints(data):
+    """Yield every varint in a bytes-like object"""
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield value
+            value = shift = 0
+
+def encode_postings(postings):
+    """Encode [(doc_id, [segment offsets])] sorted by doc_id
+
+    Layout: doc count, then per doc the doc_id delta, offset count and the
+    offset deltas, all as varints.
+    """
+    out = bytearray()
+    encode_varint(len(postings), out)
+    previous_doc = 0
+    for doc_id, offsets in postings:
+        encode_varint(doc_id - previous_doc, out)
+        previous_doc = doc_id
+        encode_varint(len(offsets), out)
+        previous_offset = 0
+        for offset in offsets:
+            encode_varint(offset - previous_offset, out)
+            previous_offset = offset
+    return bytes(out)
+
+def decode_postings(data):
+    """Inverse of encode_postings"""
+    values = decode_varints(data)
+    postings = []
+    doc_id = 0
+    for _ in range(next(values)):
+        doc_id += next(values)
+        offsets = []
+        offset = 0
+        for _ in range(next(values)):
+            offset += next(values)
+            offsets.append(offset)
+        postings.append((doc_id, offsets))
+    return postings
+
+def episode_terms(episode_num, transcript):
+    """Return {term: sorted segment offsets} for one transcript"""
+    terms = {}
+    for segment in parse_segments(episode_num, transcript):
+        for term in set(tokenize(segment.text)):
+            terms.setdefault(term, []).append(segment.offset)
+    # Offsets must not go backwards for delta encoding; markers normally never do
+    return {term: sorted(set(offsets)) for term, offsets in terms.items()}
+
+def newest_episodes(transcripts_dir):
+    """Return [(key, episode_num, url, path, position, byte length)] for the newest copy of every episode
+
+    Combined files are read oldest first, so a re-scraped episode in a newer
+    file wins. Only sidecars are read, not transcripts.
+    """
+    paths = sorted(glob.glob(os.path.join(transcripts_dir, "*.txt")), key=os.path.getmtime)
+    newest = {}
+    for path in paths:
+        with TranscriptFile(path) as transcripts:
+            for i, (episode_num, url, offset, length) in enumerate(transcripts.entries):
+                newest[str(episode_num) if episode_num is not None else url] = (episode_num, url, path, i, length)
+    return [(key,) + episode for key, episode in newest.items()]
+
+def catalog_episodes(transcripts_dir):
+    """Yield (key, episode_num, url, path, sha256, transcript) for the newest copy of every episode"""
+    by_path = {}
+    for key, episode_num, url, path, i, length in newest_episodes(transcripts_dir):
+        by_path.setdefault(path, []).append((key, episode_num, url, i))
+    for path, episodes in by_path.items():
+        with TranscriptFile(path) as transcripts:
+            for key, episode_num, url, i in episodes:
+                transcript = transcripts.transcript_at(i)
+                yield key, episode_num, url, path, hashlib.sha256(transcript.encode('utf-8')).hexdigest(), transcript
+
+class SearchIndex:
+    """Inverted index stored as meta.json plus a postings.bin of encoded lists
+
+    meta.json holds the documents (one per episode) and, per term, the byte
+    range of its postings and its document frequency, so a search only reads
+    the postings of the query terms.
+
+    Updates append new lists for the terms of added documents and leave
+    every other term where it is. Removed or changed documents are only
+    tombstoned in dead_docs and skipped by searches; once superseded bytes
+    and dead documents make up COMPACT_RATIO of the index it is rewritten.
+    """
+
+    def __init__(self, index_dir="transcripts/.search_index"):
+        self.index_dir = index_dir
+        self.meta_path = os.path.join(index_dir, META_FILE)
+        self.postings_path = os.path.join(index_dir, POSTINGS_FILE)
+        self.meta = {'next_doc': 1, 'docs': {}, 'terms': {}}
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                self.meta = json.load(f)
+        self.meta.setdefault('dead_docs', [])
+        self.meta.setdefault('garbage', 0)  # Bytes of postings.bin no term points at any more
+
+    def read_postings(self, term, postings_file):
+        location = self.meta['terms'].get(term)
+        if not location:
+            return []
+        offset, length, doc_freq = location
+        postings_file.seek(offset)
+        return decode_postings(postings_file.read(length))
+
+    def all_postings(self, dead_docs=()):
+        """Decode every term's postings into {term: {doc_id: offsets}}, leaving out dead_docs"""
+        postings = {}
+        if not self.meta['terms']:
+            return postings
+        with open(self.postings_path, 'rb') as f:
+            for term in self.meta['terms']:
+                live = {doc_id: offsets for doc_id, offsets in self.read_postings(term, f) if doc_id not in dead_docs}
+                if live:
+                    postings[term] = live
+        return postings
+
+    def update(self, transcripts_dir="transcripts"):
+        """Bring the index in line with the combined files in transcripts_dir
+
+        Only new or changed episodes are tokenized; removed ones are dropped.
+        Returns counts of added, changed, removed and unchanged episodes.
+        """
+        docs = self.meta['docs']
+        seen = set()
+        stale_docs = set()
+        new_terms = {}  # doc_id -> {term: offsets}
+        counts = {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0}
+        moved = False
+
+        for key, episode_num, url, path, content_hash, transcript in catalog_episodes(transcripts_dir):
+            seen.add(key)
+            doc = docs.get(key)
+            if doc and doc['hash'] == content_hash:
+                if doc['file'] != path:
+                    doc['file'] = path
+                    moved = True
+                counts['unchanged'] += 1
+                continue
+            if doc:
+                stale_docs.add(doc['doc'])
+                counts['changed'] += 1
+            else:
+                counts['added'] += 1
+            doc_id = self.meta['next_doc']
+            self.meta['next_doc'] += 1
+            docs[key] = {'doc': doc_id, 'episode': episode_num, 'url': url, 'file': path, 'hash': content_hash}
+            new_terms[doc_id] = episode_terms(episode_num, transcript)
+
+        for key in [key for key in docs if key not in seen]:
+            stale_docs.add(docs.pop(key)['doc'])
+            counts['removed'] += 1
+
+        if stale_docs:
+            self.meta['dead_docs'] = sorted(set(self.meta['dead_docs']) | stale_docs)
+        if new_terms or stale_docs:
+            if self.needs_compaction():
+                postings = self.all_postings(set(self.meta['dead_docs']))
+                for doc_id, terms in new_terms.items():
+                    for term, offsets in terms.items():
+                        postings.setdefault(term, {})[doc_id] = offsets
+                self.write(postings)
+            else:
+                self.append(new_terms)
+        elif moved:
+            self.write_meta()
+        return counts
+
+    def needs_compaction(self):
+        size = os.path.getsize(self.postings_path) if os.path.exists(self.postings_path) else 0
+        if size and self.meta['garbage'] >= size * COMPACT_RATIO:
+            return True
+        dead = len(self.meta['dead_docs'])
+        return dead > 0 and dead >= (dead + len(self.meta['docs'])) * COMPACT_RATIO
+
+    def append(self, new_terms):
+        """Append merged lists for the terms of new_terms ({doc_id: {term: offsets}})
+
+        Lists of other terms are left in place; the ones replaced here become
+        garbage until the next compaction.
+        """
+        added = {}
+        for doc_id, terms in new_terms.items():
+            for term, offsets in terms.items():
+                added.setdefault(term, {})[doc_id] = offsets
+        os.makedirs(self.index_dir, exist_ok=True)
+        dead_docs = set(self.meta['dead_docs'])
+        with open(self.postings_path, 'a+b') as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            for term in sorted(added):
+                postings = {}
+                if term in self.meta['terms']:
+                    postings = {doc_id: offsets for doc_id, offsets in self.read_postings(term, f) if doc_id not in dead_docs}
+                    self.meta['garbage'] += self.meta['terms'][term][1]
+                postings.update(added[term])
+                encoded = encode_postings(sorted(postings.items()))
+                f.seek(end)
+                f.write(encoded)
+                self.meta['terms'][term] = [end, len(encoded), len(postings)]
+                end += len(encoded)
+        self.write_meta()
+
+    def write(self, postings):
+        """Encode all postings and replace the index files"""
+        os.makedirs(self.index_dir, exist_ok=True)
+        terms = {}
+        tmp_postings = f"{self.postings_path}.tmp"
+        with open(tmp_postings, 'wb') as f:
+            for term in sorted(postings):
+                encoded = encode_postings(sorted(postings[term].items()))
+                terms[term] = [f.tell(), len(encoded), len(postings[term])]
+                f.write(encoded)
+        self.meta['terms'] = terms
+        self.meta['dead_docs'] = []
+        self.meta['garbage'] = 0
+        os.replace(tmp_postings, self.postings_path)
+        self.write_meta()
+
+    def write_meta(self):
+        os.makedirs(self.index_dir, exist_ok=True)
+        tmp_meta = f"{self.meta_path}.tmp"
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_meta, self.meta_path)
+
+    def search(self, query, limit=20):
+        """Return [(doc, [segment offsets])] where every query term shares a segment
+
+        Episodes with the most matching segments come first.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.meta['terms'] or any(term not in self.meta['terms'] for term in terms):
+            return []
+        # Intersect rarest terms first so the candidate set shrinks fastest
+        terms.sort(key=lambda term: self.meta['terms'][term][2])
+        docs_by_id = {doc['doc']: doc for doc in self.meta['docs'].values()}
+        with open(self.postings_path, 'rb') as f:
+            # Lists can still hold tombstoned documents until the next compaction
+            matches = {doc_id: set(offsets) for doc_id, offsets in self.read_postings(terms[0], f)
+                       if doc_id in docs_by_id}
+            for term in terms[1:]:
+                postings = dict(self.read_postings(term, f))
+                matches = {doc_id: offsets & set(postings[doc_id])
+                           for doc_id, offsets in matches.items() if doc_id in postings}
+                matches = {doc_id: offsets for doc_id, offsets in matches.items() if offsets}
+                if not matches:
+                    return []
+
+        ranked = sorted(matches.items(), key=lambda item: (-len(item[1]), -(docs_by_id[item[0]]['episode'] or 0)))
+        return [(docs_by_id[doc_id], sorted(offsets)) for doc_id, offsets in ranked[:limit]]
+
+def snippet(text, terms, width=160):
+    """Cut text down to about width characters around the first query term"""
+    lowered = text.lower()
+    positions = [lowered.find(term) for term in terms if lowered.find(term) >= 0]
+    start = max(0, min(positions) - width // 3) if positions else 0
+    piece = text[start:start + width].replace("\n", " ")
+    return ("…" if start else "") + piece + ("…" if start + width < len(text) else "")
+
+def print_hits(hits, query, max_segments=3):
+    terms = tokenize(query)
+    for doc, offsets in hits:
+        label = f"Episode {doc['episode']}" if doc['episode'] is not None else doc['url']
+        print(f"\n{label} - {len(offsets)} matching segments ({doc['url']})")
+        with TranscriptFile(doc['file']) as transcripts:
+            found = transcripts.get(doc['episode']) if doc['episode'] is not None else None
+        if not found:
+            print(f"  {' '.join(format_offset(offset) for offset in offsets[:max_segments])}")
+            continue
+        segments = {segment.offset: segment for segment in parse_segments(doc['episode'], found[1])}
+        for offset in offsets[:max_segments]:
+            segment = segments.get(offset)
+            speaker = f"{segment.speaker}: " if segment and segment.speaker else ""
+            print(f"  {format_offset(offset)} {speaker}{snippet(segment.text, terms) if segment else ''}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and search a full-text index of scraped transcripts")
+    parser.add_argument("--index-dir", default="transcripts/.search_index",
+                        help="Where the index lives (default: transcripts/.search_index)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Index new or changed episodes")
+    build.add_argument("--transcripts-dir", default="transcripts", help="Combined files to index (default: transcripts)")
+    search = subparsers.add_parser("search", help="Find segments containing every query term")
+    search.add_argument("query", help="Words to look for, e.g. \"rich life\"")
+    search.add_argument("--limit", type=int, default=20, help="Most episodes to show (default: 20)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = SearchIndex(args.index_dir)
+    if args.command == "build":
+        counts = index.update(args.transcripts_dir)
+        print(f"Indexed {counts['added']} new and {counts['changed']} changed episodes, "
+              f"dropped {counts['removed']}, kept {counts['unchanged']} "
+              f"({len(index.meta['terms'])} terms, {time.perf_counter() - start:.1f}s)")
+        return
+
+    hits = index.search(args.query, limit=args.limit)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if not hits:
+        print(f"No matches for \"{args.query}\" ({elapsed_ms:.1f} ms)")
+        return
+    print(f"{len(hits)} episodes match \"{args.query}\" ({elapsed_ms:.1f} ms)")
+    print_hits(hits, args.query)
+
+if __name__ == "__main__":
+    main()
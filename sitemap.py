@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Episode discovery from the WordPress XML sitemaps
+Reads the sitemap index (wp-sitemap.xml, or an SEO plugin's
+sitemap_index.xml) and the post sitemaps it lists with an incremental
+parser, yielding each post URL with its <lastmod>
+"""
+
+import io
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+
+# Post sitemaps of WordPress core (wp-sitemap-posts-post-1.xml) and of
+# Yoast/Rank Math (post-sitemap.xml, post-sitemap2.xml); pages, taxonomies
+# and users have their own sitemaps that never hold episodes
+POST_SITEMAP_PATTERN = re.compile(r'(wp-sitemap-posts-post-\d+|post-sitemap\d*)\.xml')
+
+WP_DATE_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+def normalize_lastmod(value):
+    """Turn a W3C datetime (2024-05-01, 2024-05-01T10:00:00+02:00, ...Z) into UTC WP_DATE_FORMAT"""
+    if not value:
+        return None
+    try:
+        when = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if when.tzinfo:
+        when = when.astimezone(timezone.utc).replace(tzinfo=None)
+    return when.strftime(WP_DATE_FORMAT)
+
+def iter_sitemap(source):
+    """Yield (tag, loc, lastmod) for each <sitemap> or <url> entry of a sitemap file
+
+    source is a path or binary file object. Entries are cleared from the
+    tree as soon as they are read, so memory stays at one entry however
+    many URLs the file lists.
+    """
+    root = None
+    loc = lastmod = None
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        if root is None:
+            root = elem
+        if event != 'end':
+            continue
+        tag = elem.tag.rpartition('}')[2]
+        if tag == 'loc':
+            loc = (elem.text or '').strip()
+        elif tag == 'lastmod':
+            lastmod = normalize_lastmod(elem.text)
+        elif tag in ('sitemap', 'url'):
+            if loc:
+                yield tag, loc, lastmod
+            loc = lastmod = None
+            root.clear()
+
+class SitemapDiscovery:
+    """Walks a sitemap index and the post sitemaps under it
+
+    request(url) must return a response (or None). synced maps sub-sitemap
+    URLs to the lastmod they had when everything in them was last synced;
+    sub-sitemaps whose lastmod hasn't moved since are not fetched at all.
+    Sub-sitemaps read this run are collected in read, and URLs of sitemaps
+    that couldn't be fetched in failed.
+    """
+
+    def __init__(self, request, index_url, synced=None):
+        self.request = request
+        self.index_url = index_url
+        self.synced = synced or {}
+        self.read = {}
+        self.failed = []
+        self.requests = 0
+        self.skipped = 0
+
+    def fetch(self, url):
+        self.requests += 1
+        try:
+            response = self.request(url)
+        except Exception as e:
+            print(f"Error fetching sitemap {url}: {e}")
+            response = None
+        if not response:
+            print(f"Failed to fetch sitemap {url}")
+            self.failed.append(url)
+            return None
+        return io.BytesIO(response.content)
+
+    def entries(self, url, body):
+        """iter_sitemap over a fetched body; a malformed file counts as failed"""
+        try:
+            yield from iter_sitemap(body)
+        except ET.ParseError as e:
+            print(f"Malformed sitemap {url}: {e}")
+            self.failed.append(url)
+
+    def post_urls(self):
+        """Yield (url, lastmod) for every URL in the post sitemaps
+
+        An index_url that is itself a <urlset> is read directly. If none
+        of the listed sitemaps look like post sitemaps, all of them are read.
+        """
+        index = self.fetch(self.index_url)
+        if index is None:
+            return
+        sitemaps = []
+        for tag, loc, lastmod in self.entries(self.index_url, index):
+            if tag == 'url':
+                yield loc, lastmod
+            else:
+                sitemaps.append((loc, lastmod))
+        index = None
+
+        post_sitemaps = [(loc, lastmod) for loc, lastmod in sitemaps if POST_SITEMAP_PATTERN.search(loc)]
+        if sitemaps:
+            print(f"Sitemap index lists {len(sitemaps)} sitemaps, {len(post_sitemaps)} of them post sitemaps")
+        for loc, lastmod in post_sitemaps or sitemaps:
+            if lastmod and self.synced.get(loc) == lastmod:
+                self.skipped += 1
+                continue
+            body = self.fetch(loc)
+            if body is None:
+                continue
+            count = 0
+            for tag, url, url_lastmod in self.entries(loc, body):
+                if tag == 'url':
+                    count += 1
+                    yield url, url_lastmod
+            if loc not in self.failed:
+                self.read[loc] = lastmod
+            print(f"  {count} URLs in {loc}")
+        if self.skipped:
+            print(f"Skipped {self.skipped} sitemaps unchanged since the last sync")
@@ -0,0 +1,30 @@
+import random
+
+import dedup
+from transcript_writer import CombinedTranscriptWriter
+
+SPONSOR = "[00:00:00] Host: this episode is brought to you by our sponsor for the whole season"
+
+def test_analyze_streams_to_the_same_result_as_in_memory(tmp_path):
+    rng = random.Random(3)
+    words = [f"word{i}" for i in range(2000)]
+    transcripts = {}
+    with CombinedTranscriptWriter(str(tmp_path / "transcripts")) as writer:
+        for num in range(1, 41):
+            body = "\n".join(f"[00:{minute:02d}:00] Guest: " + " ".join(rng.choice(words) for _ in range(30))
+                             for minute in range(20))
+            if num == 40:
+                body = transcripts[10]
+            transcripts[num] = SPONSOR + "\n" + body if num % 2 else body
+            writer.add(f"https://example.com/{num}-guest/", transcripts[num])
+
+    episodes, boilerplate, clusters, pairs = dedup.analyze(str(tmp_path / "transcripts"))
+    assert len(episodes) == 40
+    assert list(boilerplate) == [dedup.normalize_line(SPONSOR)]
+    assert boilerplate[dedup.normalize_line(SPONSOR)] == 20
+    assert clusters == [['10', '40']]
+
+    filepath, written = dedup.write_clean(str(tmp_path / "transcripts"), str(tmp_path / "clean"), {'40'}, boilerplate)
+    assert written == 39
+    with open(filepath, encoding='utf-8') as f:
+        assert "sponsor" not in f.read()
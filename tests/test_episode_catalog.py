@@ -0,0 +1,128 @@
+import contextlib
+import io
+
+from bench_server import WordPressStandIn
+from episode_catalog import EpisodeCatalog
+from rate_controller import RateController
+import podcast_scraper
+
+def post(post_id, modified):
+    return {'id': post_id, 'link': f"https://example.com/{post_id}-guest/", 'modified': modified}
+
+def link(post_id):
+    return f"https://example.com/{post_id}-guest/"
+
+def test_first_sync_lists_everything(tmp_path):
+    catalog = EpisodeCatalog(str(tmp_path / "catalog.json"))
+    assert 'modified_after' not in catalog.sync_params()
+    assert catalog.sync_params()['orderby'] == 'modified'
+
+def test_commit_moves_mark_to_newest_listed(tmp_path):
+    catalog = EpisodeCatalog(str(tmp_path / "catalog.json"))
+    for post_id, modified in [(1, '2024-01-01T00:00:00'), (2, '2024-01-03T00:00:00')]:
+        assert catalog.note(post(post_id, modified), post_id)
+    catalog.commit(attempted={link(1), link(2)}, saved={link(1), link(2)})
+
+    reloaded = EpisodeCatalog(str(tmp_path / "catalog.json"))
+    assert reloaded.data['high_water'] == '2024-01-03T00:00:00'
+    # Listed again from just before the mark, so same-second edits aren't lost
+    assert reloaded.sync_params()['modified_after'] == '2024-01-02T23:59:59'
+    # Saved and unchanged: skipped; edited: synced again
+    assert not reloaded.note(post(2, '2024-01-03T00:00:00'), 2)
+    assert reloaded.note(post(1, '2024-02-01T00:00:00'), 1)
+
+def test_failed_posts_are_retried_by_link(tmp_path):
+    catalog = EpisodeCatalog(str(tmp_path / "catalog.json"))
+    catalog.note(post(1, '2024-01-01T00:00:00'), 1)
+    catalog.note(post(2, '2024-01-02T00:00:00'), 2)
+    catalog.commit(attempted={link(1), link(2)}, saved={link(2)})
+
+    assert catalog.retry_links() == [(1, link(1))]
+    catalog.commit(attempted={link(1)}, saved={link(1)})
+    assert catalog.retry_links() == []
+
+def test_unattempted_posts_hold_the_mark_back(tmp_path):
+    catalog = EpisodeCatalog(str(tmp_path / "catalog.json"))
+    for post_id, modified in [(1, '2024-01-01T00:00:00'), (2, '2024-01-02T00:00:00'), (3, '2024-01-03T00:00:00')]:
+        catalog.note(post(post_id, modified), post_id)
+    # Cut off by a limit after the first post
+    catalog.commit(attempted={link(1)}, saved={link(1)})
+    assert catalog.data['high_water'] == '2024-01-02T00:00:00'
+
+def test_incomplete_listing_keeps_the_mark(tmp_path):
+    catalog = EpisodeCatalog(str(tmp_path / "catalog.json"))
+    catalog.note(post(1, '2024-01-01T00:00:00'), 1)
+    catalog.commit(attempted={link(1)}, saved={link(1)})
+
+    # A page in the middle failed; what was listed got saved, but posts on
+    # the missing page may be older than the newest one seen
+    catalog.note(post(2, '2024-01-05T00:00:00'), 2)
+    catalog.note(post(4, '2024-01-09T00:00:00'), 4)
+    catalog.commit(attempted={link(2), link(4)}, saved={link(2), link(4)}, complete=False)
+    assert catalog.data['high_water'] == '2024-01-01T00:00:00'
+    assert not catalog.note(post(4, '2024-01-09T00:00:00'), 4)
+
+def test_incomplete_first_sync_stays_unmarked(tmp_path):
+    catalog = EpisodeCatalog(str(tmp_path / "catalog.json"))
+    catalog.note(post(1, '2024-01-01T00:00:00'), 1)
+    catalog.commit(attempted={link(1)}, saved={link(1)}, complete=False)
+    assert catalog.data['high_water'] is None
+    assert 'modified_after' not in catalog.sync_params()
+
+def test_sitemap_entries_leave_the_mark_alone(tmp_path):
+    catalog = EpisodeCatalog(str(tmp_path / "catalog.json"))
+    catalog.note({'link': link(1), 'modified': '2030-01-01T00:00:00'}, 1, from_sitemap=True)
+    catalog.note_sitemaps({'https://example.com/wp-sitemap-posts-post-1.xml': '2030-01-01T00:00:00'})
+    catalog.commit(attempted={link(1)}, saved={link(1)})
+    assert catalog.data['high_water'] is None
+    assert catalog.synced_sitemaps() == {'https://example.com/wp-sitemap-posts-post-1.xml': '2030-01-01T00:00:00'}
+
+def sync_scraper(standin, tmp_path):
+    scraper = podcast_scraper.PodcastScraper(cache_dir=None, rate_state=None, archive_dir=None, db_path=None)
+    scraper.base_url = standin.base_url
+    scraper.podcast_url = f"{standin.base_url}/podcast/"
+    scraper.api_url = standin.api_url
+    scraper.rate_controller = RateController(start_delay=0, min_delay=0)
+    scraper.output_dir = str(tmp_path / "transcripts")
+    scraper.export_segments = False
+    scraper.catalog = EpisodeCatalog(str(tmp_path / "catalog.json"))
+    return scraper
+
+def run_sync(standin, tmp_path, max_episodes=500):
+    scraper = sync_scraper(standin, tmp_path)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        scraper.scrape_all_transcripts(max_episodes=max_episodes)
+    return scraper, output.getvalue()
+
+def test_sync_with_a_failed_listing_page_lists_it_again(tmp_path):
+    with WordPressStandIn(episodes=250, minutes=1) as standin:
+        standin.failing_pages = {2}
+        scraper, output = run_sync(standin, tmp_path)
+        first_saved = set(scraper.catalog.data['posts'])
+        assert len(first_saved) == 200
+        assert scraper.catalog.data['high_water'] is None
+
+        standin.failing_pages = set()
+        scraper, output = run_sync(standin, tmp_path)
+        assert "No new or edited episodes" not in output
+        saved = {post_id for post_id, post in scraper.catalog.data['posts'].items() if post['status'] == 'done'}
+        assert len(saved) == 250
+        assert scraper.catalog.data['high_water'] == max(standin.modified(num) for num in range(1, 251))
+
+        scraper, output = run_sync(standin, tmp_path)
+        assert "No new or edited episodes since the last sync" in output
+
+def test_sync_of_edited_episodes_keeps_the_earlier_file(tmp_path):
+    with WordPressStandIn(episodes=20, minutes=1) as standin:
+        run_sync(standin, tmp_path)
+        first = tmp_path / "transcripts" / "20-1.txt"
+        before = first.read_bytes()
+
+        standin.touch(20)
+        standin.touch(1)
+        scraper, output = run_sync(standin, tmp_path)
+        assert first.read_bytes() == before
+        files = sorted(path.name for path in (tmp_path / "transcripts").glob("*.txt"))
+        assert len(files) == 2 and files[0].startswith("20-1-")
+        assert "didn't write" in output
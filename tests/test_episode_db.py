@@ -0,0 +1,34 @@
+import sqlite3
+
+from episode_db import EpisodeDB
+from metrics import RequestRecord
+
+def test_fetch_rows_commit_without_holding_the_write_lock(tmp_path):
+    path = str(tmp_path / "episodes.db")
+    db = EpisodeDB(path)
+    db.start_run('test')
+    record = RequestRecord("https://example.com/1-guest/")
+    record.status = 200
+    db.record_fetch(record, {'ETag': '"abc"'})
+
+    # Another process can write at once and sees the row, without a busy wait
+    other = sqlite3.connect(path, timeout=0)
+    other.execute("INSERT INTO runs (scraper) VALUES ('other')")
+    other.commit()
+    assert other.execute("SELECT url, status FROM fetches").fetchall() == [("https://example.com/1-guest/", 200)]
+    other.close()
+    db.close()
+
+def test_two_writers_share_a_database(tmp_path):
+    path = str(tmp_path / "episodes.db")
+    first, second = EpisodeDB(path), EpisodeDB(path)
+    first.start_run('a')
+    second.start_run('b')
+    for i in range(5):
+        first.record_fetch(RequestRecord(f"https://example.com/{i}-a/"))
+        second.record_fetch(RequestRecord(f"https://example.com/{i}-b/"))
+    first.add_episodes([(1, "https://example.com/1-a/", 10, "One", None)])
+    second.mark_saved([(1, "https://example.com/1-a/", "hash", 100)], "1-1.txt")
+    assert first.status_counts() == {'done': 1}
+    first.close()
+    second.close()
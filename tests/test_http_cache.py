@@ -0,0 +1,79 @@
+import contextlib
+import io
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from bench_server import WordPressStandIn
+from http_cache import HTTPCache
+from rate_controller import RateController
+import podcast_scraper
+
+URL = "https://example.com/wp-json/wp/v2/posts"
+PARAMS = {'page': 1, 'per_page': 100}
+
+def make_response(body, status=200, **headers):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = 'utf-8'
+    response.url = URL
+    return response
+
+def test_conditional_headers_come_from_the_validators(tmp_path):
+    cache = HTTPCache(str(tmp_path))
+    cache.store(URL, PARAMS, make_response(b"[]", ETag='"v1"', **{'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}))
+    entry = cache.load(URL, PARAMS)
+    assert cache.conditional_headers(entry) == {'If-None-Match': '"v1"',
+                                                'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+
+def test_no_validators_no_conditional_headers(tmp_path):
+    cache = HTTPCache(str(tmp_path))
+    cache.store(URL, PARAMS, make_response(b"[]"))
+    assert cache.conditional_headers(cache.load(URL, PARAMS)) == {}
+
+def test_params_are_part_of_the_key(tmp_path):
+    cache = HTTPCache(str(tmp_path))
+    cache.store(URL, PARAMS, make_response(b"[]", ETag='"v1"'))
+    assert cache.load(URL, {'per_page': 100, 'page': 1}) is not None
+    assert cache.load(URL, {'page': 2, 'per_page': 100}) is None
+
+def test_304_returns_the_cached_body(tmp_path):
+    cache = HTTPCache(str(tmp_path))
+    cache.store(URL, PARAMS, make_response(b"cached body", ETag='"v1"', **{'Content-Type': 'application/json'}))
+    entry = cache.load(URL, PARAMS)
+    response = cache.revalidated(URL, PARAMS, entry, make_response(b"", status=304, ETag='"v2"'))
+    assert response.status_code == 200
+    assert response.content == b"cached body"
+    assert response.headers['Content-Type'] == 'application/json'
+    assert response.from_cache
+    # The 304's validators are kept for the next request
+    assert cache.conditional_headers(cache.load(URL, PARAMS)) == {'If-None-Match': '"v2"'}
+
+def test_200_replaces_the_stored_copy(tmp_path):
+    cache = HTTPCache(str(tmp_path))
+    cache.store(URL, PARAMS, make_response(b"old body", ETag='"v1"', **{'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}))
+    cache.store(URL, PARAMS, make_response(b"new body", ETag='"v2"'))
+    entry = cache.load(URL, PARAMS)
+    assert cache.to_response(entry).content == b"new body"
+    assert entry['size'] == len(b"new body")
+    assert cache.conditional_headers(entry) == {'If-None-Match': '"v2"'}
+
+def test_scraper_revalidates_against_the_server(tmp_path):
+    with WordPressStandIn(episodes=5, minutes=1) as standin:
+        scraper = podcast_scraper.PodcastScraper(cache_dir=str(tmp_path / "cache"), rate_state=None,
+                                                 archive_dir=None, db_path=None)
+        scraper.rate_controller = RateController(start_delay=0, min_delay=0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            first = scraper.safe_request(standin.api_url, params=PARAMS)
+            unchanged = scraper.safe_request(standin.api_url, params=PARAMS)
+            assert standin.snapshot()['not_modified'] == 1
+            standin.touch(3)
+            edited = scraper.safe_request(standin.api_url, params=PARAMS)
+            again = scraper.safe_request(standin.api_url, params=PARAMS)
+    assert unchanged.content == first.content
+    assert edited.content != first.content
+    # The edited listing replaced the stored copy and is what a 304 now serves
+    assert standin.snapshot()['not_modified'] == 2
+    assert again.content == edited.content
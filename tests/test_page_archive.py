@@ -0,0 +1,43 @@
+import multiprocessing
+
+import requests
+
+from page_archive import PageArchive
+
+def response(body):
+    page = requests.Response()
+    page.status_code = 200
+    page.reason = "OK"
+    page._content = body
+    page.headers['Content-Type'] = 'text/html; charset=utf-8'
+    page.encoding = 'utf-8'
+    return page
+
+def append_pages(archive_dir, worker):
+    archive = PageArchive(archive_dir)
+    for i in range(40):
+        archive.store(f"https://example.com/{worker}-{i}/", None, response(f"<p>{worker} {i}</p>".encode() * (i + 1)))
+
+def test_processes_can_share_an_archive(tmp_path):
+    archive_dir = str(tmp_path / "archive")
+    workers = [multiprocessing.get_context('fork').Process(target=append_pages, args=(archive_dir, worker))
+               for worker in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    archive = PageArchive(archive_dir)
+    entries = list(archive.entries())
+    assert len(entries) == 160
+    for entry in entries:
+        worker, i = entry['url'].rstrip('/').rsplit('/', 1)[1].split('-')
+        assert archive.read_body(entry) == f"<p>{worker} {i}</p>".encode() * (int(i) + 1)
+
+def test_unchanged_bodies_are_not_stored_again(tmp_path):
+    archive = PageArchive(str(tmp_path / "archive"))
+    assert archive.store("https://example.com/1-a/", None, response(b"<p>one</p>"))
+    assert archive.store("https://example.com/1-a/", None, response(b"<p>one</p>")) is None
+    reopened = PageArchive(str(tmp_path / "archive"))
+    assert reopened.store("https://example.com/1-a/", None, response(b"<p>one</p>")) is None
+    assert reopened.store("https://example.com/1-a/", None, response(b"<p>two</p>"))
@@ -0,0 +1,47 @@
+import threading
+
+import podcast_scraper
+from pipeline import Pipeline
+
+class Page:
+    content = b'<html><body><article><p>[00:00:05] Host: From the page.</p></article></body></html>'
+
+def scraper_without_network(requests_made):
+    scraper = podcast_scraper.PodcastScraper(cache_dir=None, rate_state=None, archive_dir=None, db_path=None)
+    def safe_request(url, params=None, max_retries=3):
+        requests_made.append((url, threading.current_thread().name))
+        return Page()
+    scraper.safe_request = safe_request
+    return scraper
+
+def test_fetch_stage_picks_the_page_when_timestamps_are_only_in_markup():
+    requests_made = []
+    scraper = scraper_without_network(requests_made)
+    scraper.api_content = {
+        'https://example.com/1-a/': '<p>[00:00:01] Host: From the API.</p>',
+        'https://example.com/2-b/': '<p data-start="[00:00:01]">Show notes</p>',
+        'https://example.com/3-c/': None,
+    }
+    assert scraper.fetch_episode('https://example.com/1-a/') == ('api', '<p>[00:00:01] Host: From the API.</p>')
+    assert scraper.fetch_episode('https://example.com/2-b/') == ('html', Page.content)
+    assert scraper.fetch_episode('https://example.com/3-c/') == ('html', Page.content)
+    assert [url for url, _ in requests_made] == ['https://example.com/2-b/', 'https://example.com/3-c/']
+
+def test_parse_workers_make_no_requests():
+    requests_made = []
+    scraper = scraper_without_network(requests_made)
+    urls = [f'https://example.com/{num}-guest/' for num in range(1, 21)]
+    scraper.api_content = {url: f'<p data-start="[00:00:{num:02d}]">{num}</p>' if num % 2 else f'<p>[00:00:{num:02d}] {num}</p>'
+                           for num, url in enumerate(urls, 1)}
+    parse_threads = set()
+    def parse(item, payload, result=None):
+        parse_threads.add(threading.current_thread().name)
+        return scraper.parse_episode(item, payload, result)
+    pipeline = Pipeline(scraper.fetch_episode, parse, fetch_workers=2, parse_workers=2, queue_size=2)
+    results = dict(pipeline.run(urls))
+
+    assert all(results[url] for url in urls)
+    assert results[urls[0]] == '[00:00:05] Host: From the page.'
+    assert results[urls[1]] == '[00:00:02] 2'
+    assert len(requests_made) == 10
+    assert not parse_threads & {thread for _, thread in requests_made}
@@ -0,0 +1,84 @@
+import contextlib
+import io
+import time
+
+from bench_server import WordPressStandIn
+from progress_manifest import ProgressManifest
+from rate_controller import RateController
+import batch_scraper
+
+EPISODES = [(3, "https://example.com/3-guest/"), (2, "https://example.com/2-guest/"), (1, "https://example.com/1-guest/")]
+
+def test_no_list_saved(tmp_path):
+    assert ProgressManifest(str(tmp_path / "manifest.json")).cached_episode_list() is None
+
+def test_unfinished_list_is_reused_however_old(tmp_path):
+    manifest = ProgressManifest(str(tmp_path / "manifest.json"))
+    manifest.set_episode_list(EPISODES)
+    manifest.mark(3, EPISODES[0][1], 'done')
+    manifest.data['episode_list_fetched_at'] = time.time() - 30 * 86400
+    assert manifest.cached_episode_list() == EPISODES
+
+def test_finished_list_is_reused_while_fresh(tmp_path):
+    manifest = ProgressManifest(str(tmp_path / "manifest.json"))
+    manifest.set_episode_list(EPISODES)
+    for episode_num, url in EPISODES:
+        manifest.mark(episode_num, url, 'done' if episode_num != 2 else 'failed')
+    assert manifest.cached_episode_list() == EPISODES
+
+def test_finished_list_expires(tmp_path):
+    manifest = ProgressManifest(str(tmp_path / "manifest.json"))
+    manifest.set_episode_list(EPISODES)
+    for episode_num, url in EPISODES:
+        manifest.mark(episode_num, url, 'done')
+    manifest.data['episode_list_fetched_at'] = time.time() - 2 * 86400
+    assert manifest.cached_episode_list() is None
+    assert manifest.cached_episode_list(max_age=3 * 86400) == EPISODES
+
+def test_list_from_before_fetch_times_were_saved_expires_when_finished(tmp_path):
+    manifest = ProgressManifest(str(tmp_path / "manifest.json"))
+    manifest.set_episode_list(EPISODES)
+    for episode_num, url in EPISODES:
+        manifest.mark(episode_num, url, 'done')
+    manifest.data['episode_list_fetched_at'] = None
+    assert manifest.cached_episode_list() is None
+
+def test_batch_scraper_does_not_save_an_incomplete_listing(tmp_path):
+    with WordPressStandIn(episodes=250, minutes=1) as standin:
+        standin.failing_pages = {2}
+        scraper = batch_scraper.BatchPodcastScraper(cache_dir=None, rate_state=None, archive_dir=None, db_path=None,
+                                                    manifest_path=str(tmp_path / "manifest.json"))
+        scraper.api_url = standin.api_url
+        scraper.rate_controller = RateController(start_delay=0, min_delay=0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            episodes = scraper.get_all_episode_urls()
+    assert len(episodes) == 150
+    assert scraper.discovery_failures == [2]
+    assert scraper.manifest.cached_episode_list() is None
+
+def test_marks_are_saved_by_save_marks(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    manifest = ProgressManifest(path)
+    manifest.mark(3, EPISODES[0][1], 'done')
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert ProgressManifest(path).status(3) is None
+        manifest.save_marks()
+        assert ProgressManifest(path).status(3) == 'done'
+
+def test_batch_scraper_saves_the_manifest_once_per_batch(tmp_path, monkeypatch):
+    saves = []
+    save = ProgressManifest.save
+    monkeypatch.setattr(ProgressManifest, 'save', lambda self: saves.append(1) or save(self))
+    with WordPressStandIn(episodes=45, minutes=1) as standin:
+        scraper = batch_scraper.BatchPodcastScraper(cache_dir=None, rate_state=None, archive_dir=None, db_path=None,
+                                                    manifest_path=str(tmp_path / "manifest.json"))
+        scraper.api_url = standin.api_url
+        scraper.output_dir = str(tmp_path / "transcripts")
+        scraper.batch_delay = 0
+        scraper.rate_controller = RateController(start_delay=0, min_delay=0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            scraper.scrape_batches(batch_size=20)
+    # One save for the episode list, then one per batch
+    assert len(saves) == 1 + 3
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert ProgressManifest(str(tmp_path / "manifest.json")).count('done') == 45
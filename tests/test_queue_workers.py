@@ -0,0 +1,66 @@
+import contextlib
+import io
+import multiprocessing
+import os
+
+import batch_scraper
+from bench_server import WordPressStandIn
+from episode_db import EpisodeDB
+from page_archive import PageArchive
+from rate_controller import RateController
+from transcript_reader import read_combined_transcripts
+from work_queue import WorkQueue
+
+def queue_scraper(standin, tmp_path, worker):
+    scraper = batch_scraper.BatchPodcastScraper(
+        cache_dir=None, rate_state=None, manifest_path=str(tmp_path / f"manifest-{worker}.json"),
+        archive_dir=str(tmp_path / "archive"), db_path=str(tmp_path / "transcripts" / ".episodes.db"))
+    scraper.base_url = standin.base_url
+    scraper.podcast_url = f"{standin.base_url}/podcast/"
+    scraper.api_url = standin.api_url
+    scraper.rate_controller = RateController(start_delay=0, min_delay=0)
+    scraper.output_dir = str(tmp_path / "transcripts")
+    scraper.batch_delay = 0
+    return scraper
+
+def run_worker(standin, tmp_path, worker):
+    scraper = queue_scraper(standin, tmp_path, worker)
+    # Short leases, so a worker that runs out of work doesn't wait long for the others
+    queue = WorkQueue(str(tmp_path / "queue.db"), lease_seconds=3)
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper.scrape_queue(queue, worker=worker, batch_size=20)
+    queue.close()
+    scraper.db.close()
+
+def test_workers_share_the_default_database_and_archive(tmp_path):
+    with WordPressStandIn(episodes=60, minutes=1, latency=0.3) as standin:
+        scraper = queue_scraper(standin, tmp_path, "enqueue")
+        queue = WorkQueue(str(tmp_path / "queue.db"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            scraper.enqueue_episodes(queue)
+        scraper.db.close()
+
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=run_worker, args=(standin, tmp_path, f"w{i}")) for i in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert [worker.exitcode for worker in workers] == [0, 0, 0]
+
+    assert queue.counts() == {'done': 60}
+    # Nothing failed and went round again because a worker couldn't write
+    assert queue.conn.execute("SELECT MAX(attempts) FROM work").fetchone()[0] == 1
+    saved = [num for name in os.listdir(tmp_path / "transcripts") if name.endswith(".txt")
+             for num, url, text in read_combined_transcripts(str(tmp_path / "transcripts" / name))]
+    assert sorted(saved) == list(range(1, 61))
+
+    db = EpisodeDB(str(tmp_path / "transcripts" / ".episodes.db"))
+    assert db.status_counts() == {'done': 60}
+    # Every worker's page fetches made it in, none lost to a locked database
+    assert db.conn.execute("SELECT COUNT(DISTINCT url) FROM fetches WHERE url LIKE '%-guest-%'").fetchone()[0] == 60
+    db.close()
+    archive = PageArchive(str(tmp_path / "archive"))
+    pages = [entry for entry in archive.entries() if entry['kind'] == 'page']
+    assert len(pages) == 60
+    assert all(archive.read_body(entry).startswith(b"<") for entry in pages)
@@ -0,0 +1,43 @@
+import threading
+import time
+
+from rate_controller import RateController
+
+def test_workers_keep_one_pace():
+    controller = RateController(start_delay=0.05, min_delay=0.05, jitter=0)
+    started = []
+    def worker():
+        for _ in range(3):
+            controller.wait()
+            started.append(time.monotonic())
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    started.sort()
+    gaps = [later - earlier for earlier, later in zip(started, started[1:])]
+    assert min(gaps) >= 0.04
+
+def test_responses_are_not_blocked_by_a_sleeping_worker():
+    controller = RateController(start_delay=1, min_delay=0.1, jitter=0)
+    controller.wait()
+    sleeper = threading.Thread(target=controller.wait)
+    sleeper.start()
+    time.sleep(0.05)
+    handled = time.monotonic()
+    controller.on_response(200)
+    controller.on_error()
+    assert time.monotonic() - handled < 0.5
+    sleeper.join()
+
+def test_retry_after_during_a_sleep_pushes_the_slot_back():
+    controller = RateController(start_delay=0.2, min_delay=0.1, jitter=0)
+    controller.wait()
+    waited = []
+    sleeper = threading.Thread(target=lambda: waited.append(controller.wait()))
+    sleeper.start()
+    time.sleep(0.05)
+    controller.on_response(429, {'Retry-After': '1'})
+    sleeper.join()
+    assert waited[0] >= 0.9
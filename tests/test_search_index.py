@@ -0,0 +1,95 @@
+import os
+import random
+
+import pytest
+
+from search_index import SearchIndex, encode_varint, decode_varints, encode_postings, decode_postings
+from transcript_writer import CombinedTranscriptWriter
+
+@pytest.mark.parametrize('value', [0, 1, 0x7f, 0x80, 0x3fff, 0x4000, 2**32 - 1, 2**63 + 5])
+def test_varint_round_trip(value):
+    out = bytearray()
+    encode_varint(value, out)
+    assert list(decode_varints(out)) == [value]
+    assert len(out) == max(1, (value.bit_length() + 6) // 7)
+
+def test_varint_stream_round_trip():
+    values = [random.Random(7).getrandbits(bits) for bits in range(0, 70)]
+    out = bytearray()
+    for value in values:
+        encode_varint(value, out)
+    assert list(decode_varints(out)) == values
+
+def test_postings_round_trip():
+    postings = [(1, [0, 5, 65]), (4, [3600]), (300, []), (301, [0, 1, 2, 40000])]
+    assert decode_postings(encode_postings(postings)) == postings
+
+WORDS = ['money', 'rich', 'life', 'guilt', 'invest', 'rent', 'house', 'budget', 'travel', 'salary']
+
+def transcript(seed):
+    rng = random.Random(seed)
+    return "\n".join(f"[00:{minute:02d}:00] Host: {' '.join(rng.choice(WORDS) for _ in range(6))}" for minute in range(10))
+
+def write_episodes(output_dir, episodes):
+    with CombinedTranscriptWriter(str(output_dir)) as writer:
+        for num, seed in episodes:
+            writer.add(f"https://example.com/{num}-guest/", seed if isinstance(seed, str) else transcript(seed))
+
+def results(index):
+    return {query: [(doc['episode'], offsets) for doc, offsets in index.search(query, limit=100)]
+            for query in WORDS + ['rich life', 'money guilt', 'rent house budget']}
+
+def test_update_only_rewrites_touched_terms(tmp_path):
+    transcripts = tmp_path / "transcripts"
+    write_episodes(transcripts, [(num, num) for num in range(1, 21)])
+    index = SearchIndex(str(tmp_path / "index"))
+    assert index.update(str(transcripts))['added'] == 20
+
+    before = dict(index.meta['terms'])
+    with open(index.postings_path, 'rb') as f:
+        written = f.read()
+    write_episodes(transcripts, [(21, "[00:00:01] Host: zebra money")])
+    counts = SearchIndex(str(tmp_path / "index")).update(str(transcripts))
+    assert counts == {'added': 1, 'changed': 0, 'removed': 0, 'unchanged': 20}
+
+    index = SearchIndex(str(tmp_path / "index"))
+    moved = {term for term in before if index.meta['terms'][term] != before[term]}
+    assert moved == {'money'}
+    with open(index.postings_path, 'rb') as f:
+        assert f.read(len(written)) == written
+    assert [doc['episode'] for doc, _ in index.search("zebra money")] == [21]
+
+def test_incremental_updates_match_a_fresh_build(tmp_path):
+    transcripts = tmp_path / "transcripts"
+    write_episodes(transcripts, [(num, num) for num in range(1, 31)])
+    incremental = SearchIndex(str(tmp_path / "incremental"))
+    incremental.update(str(transcripts))
+
+    # Re-scrape a few episodes with new text into a newer file, then drop one
+    os.utime(next(transcripts.glob("*.txt")), (0, 0))
+    write_episodes(transcripts, [(num, num + 100) for num in (3, 7, 11)])
+    counts = SearchIndex(str(tmp_path / "incremental")).update(str(transcripts))
+    assert counts['changed'] == 3
+    incremental = SearchIndex(str(tmp_path / "incremental"))
+    assert len(incremental.meta['dead_docs']) == 3
+
+    fresh = SearchIndex(str(tmp_path / "fresh"))
+    fresh.update(str(transcripts))
+    assert results(incremental) == results(fresh)
+
+def test_dead_documents_trigger_compaction(tmp_path):
+    transcripts = tmp_path / "transcripts"
+    write_episodes(transcripts, [(num, num) for num in range(1, 11)])
+    index = SearchIndex(str(tmp_path / "index"))
+    index.update(str(transcripts))
+
+    os.utime(next(transcripts.glob("*.txt")), (0, 0))
+    write_episodes(transcripts, [(num, num + 100) for num in range(1, 11)])
+    index = SearchIndex(str(tmp_path / "index"))
+    index.update(str(transcripts))
+    assert index.meta['dead_docs'] == [] and index.meta['garbage'] == 0
+
+    fresh = SearchIndex(str(tmp_path / "fresh"))
+    fresh.update(str(transcripts))
+    assert results(index) == results(fresh)
+    assert os.path.getsize(index.postings_path) == os.path.getsize(fresh.postings_path)
@@ -0,0 +1,62 @@
+import io
+
+from sitemap import SitemapDiscovery, iter_sitemap, normalize_lastmod
+
+NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+def urlset(*urls):
+    entries = "".join(f"<url><loc>{url}</loc><lastmod>2024-01-01T10:00:00+02:00</lastmod></url>" for url in urls)
+    return f'<?xml version="1.0"?><urlset xmlns="{NS}">{entries}</urlset>'.encode()
+
+def index(*sitemaps):
+    entries = "".join(f"<sitemap><loc>{loc}</loc><lastmod>{lastmod}</lastmod></sitemap>" for loc, lastmod in sitemaps)
+    return f'<?xml version="1.0"?><sitemapindex xmlns="{NS}">{entries}</sitemapindex>'.encode()
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+def serve(files):
+    def request(url):
+        if url not in files:
+            raise OSError("404")
+        return FakeResponse(files[url])
+    return request
+
+def test_normalize_lastmod():
+    assert normalize_lastmod("2024-01-01T10:00:00+02:00") == "2024-01-01T08:00:00"
+    assert normalize_lastmod("2024-01-01T10:00:00Z") == "2024-01-01T10:00:00"
+    assert normalize_lastmod("2024-01-01") == "2024-01-01T00:00:00"
+    assert normalize_lastmod("yesterday") is None
+
+def test_iter_sitemap_reads_entries():
+    entries = list(iter_sitemap(io.BytesIO(urlset("https://x/1-a/", "https://x/2-b/"))))
+    assert entries == [('url', "https://x/1-a/", "2024-01-01T08:00:00"), ('url', "https://x/2-b/", "2024-01-01T08:00:00")]
+
+def test_discovery_reads_post_sitemaps_and_skips_synced_ones():
+    files = {
+        "https://x/wp-sitemap.xml": index(("https://x/wp-sitemap-posts-post-1.xml", "2024-01-01"),
+                                          ("https://x/wp-sitemap-posts-post-2.xml", "2024-02-01"),
+                                          ("https://x/wp-sitemap-users-1.xml", "2024-01-01")),
+        "https://x/wp-sitemap-posts-post-1.xml": urlset("https://x/1-a/"),
+        "https://x/wp-sitemap-posts-post-2.xml": urlset("https://x/2-b/"),
+    }
+    discovery = SitemapDiscovery(serve(files), "https://x/wp-sitemap.xml",
+                                 synced={"https://x/wp-sitemap-posts-post-1.xml": "2024-01-01T00:00:00"})
+    assert [url for url, lastmod in discovery.post_urls()] == ["https://x/2-b/"]
+    assert discovery.requests == 2
+    assert discovery.read == {"https://x/wp-sitemap-posts-post-2.xml": "2024-02-01T00:00:00"}
+    assert discovery.failed == []
+
+def test_failed_and_malformed_sitemaps_are_reported():
+    files = {
+        "https://x/wp-sitemap.xml": index(("https://x/wp-sitemap-posts-post-1.xml", "2024-01-01"),
+                                          ("https://x/wp-sitemap-posts-post-2.xml", "2024-01-01"),
+                                          ("https://x/wp-sitemap-posts-post-3.xml", "2024-01-01")),
+        "https://x/wp-sitemap-posts-post-1.xml": urlset("https://x/1-a/"),
+        "https://x/wp-sitemap-posts-post-3.xml": urlset("https://x/3-c/")[:-20],
+    }
+    discovery = SitemapDiscovery(serve(files), "https://x/wp-sitemap.xml")
+    assert [url for url, lastmod in discovery.post_urls()] == ["https://x/1-a/"]
+    assert discovery.failed == ["https://x/wp-sitemap-posts-post-2.xml", "https://x/wp-sitemap-posts-post-3.xml"]
+    assert list(discovery.read) == ["https://x/wp-sitemap-posts-post-1.xml"]
@@ -0,0 +1,26 @@
+import pytest
+
+from transcript_extractor import api_content_has_transcript, extract_transcript_from_api_content
+
+@pytest.mark.parametrize('content', [
+    '<p>[00:00:01] Host: Welcome.</p><p>[00:01:10] Guest: Thanks.</p>',
+    '<p>&#91;00:00:01&#93; Host: Welcome.</p>',
+    '<p data-start="[00:00:01]">No timestamps in the text</p>',
+    '<script>var t = "[00:00:01]";</script><p>Show notes</p>',
+    '<!-- [00:00:01] --><p>Show notes</p>',
+    '<style>/* [00:00:01] */</style><p>Show notes</p>',
+    '<p>Show notes only</p>',
+    '',
+    None,
+])
+def test_cheap_check_agrees_with_extraction(content):
+    assert api_content_has_transcript(content) == bool(extract_transcript_from_api_content(content))
+
+@pytest.mark.parametrize('content', [
+    '<p>&#91;00:00:01&#93; Host: Welcome.</p>',
+    '<p>&#x5B;00:00:01&#x5D; Host: Welcome.</p>',
+    '<p>&lbrack;00:00:01&rbrack; Host: Welcome.</p>',
+])
+def test_entity_encoded_timestamps_count(content):
+    assert api_content_has_transcript(content)
+    assert extract_transcript_from_api_content(content) == '[00:00:01] Host: Welcome.'
@@ -0,0 +1,76 @@
+import contextlib
+import io
+import json
+import os
+
+import transcript_reader
+from transcript_reader import TranscriptFile, build_episode_index, episode_index_path, read_combined_transcripts
+from transcript_writer import CombinedTranscriptWriter
+
+# Multi-line, non-ASCII and separator-like text, so byte offsets and trailers matter
+EPISODES = [
+    (12, "[00:00:01] Host: Welcome to episode twelve.\n[00:00:09] Guest: Café, naïve, 💸."),
+    (11, "[00:00:01] Host: A line of === that is not a separator.\n\n[00:01:00] Guest: Two blank-separated parts."),
+    (10, "[00:00:01] Host: Short one."),
+]
+
+def write(output_dir, episodes=EPISODES):
+    with CombinedTranscriptWriter(str(output_dir)) as writer:
+        for num, transcript in episodes:
+            writer.add(f"https://example.com/{num}-guest/", transcript)
+        return writer.close()
+
+def test_sidecar_lookups_return_what_the_writer_wrote(tmp_path):
+    path = write(tmp_path)
+    assert os.path.exists(episode_index_path(path))
+    with TranscriptFile(path) as transcripts:
+        assert len(transcripts) == 3
+        assert transcripts.episode_numbers() == [12, 11, 10]
+        for num, transcript in EPISODES:
+            assert transcripts.get(num) == (f"https://example.com/{num}-guest/", transcript)
+        assert [transcripts.transcript_at(i) for i in range(3)] == [transcript for num, transcript in EPISODES]
+
+def test_sidecar_is_used_without_scanning(tmp_path, monkeypatch):
+    path = write(tmp_path)
+    monkeypatch.setattr(transcript_reader, 'scan_episode_index', lambda data: [])
+    with TranscriptFile(path) as transcripts:
+        assert transcripts.get(11)[1] == EPISODES[1][1]
+
+def test_sidecar_matches_a_scan_and_the_line_reader(tmp_path):
+    path = write(tmp_path)
+    with TranscriptFile(path) as indexed, TranscriptFile(path, use_sidecar=False) as scanned:
+        assert indexed.entries == scanned.entries
+    assert [(num, text) for num, url, text in read_combined_transcripts(path)] == EPISODES
+
+def test_missing_episode(tmp_path):
+    path = write(tmp_path)
+    with TranscriptFile(path) as transcripts:
+        assert 9 not in transcripts
+        assert transcripts.get(9) is None
+
+def test_stale_sidecar_is_rescanned(tmp_path):
+    path = write(tmp_path)
+    with open(path, 'ab') as f:
+        f.write(b"EPISODE 9\nURL: https://example.com/9-guest/\n" + b"=" * 80 + b"\n\nAppended later.\n\n" + b"=" * 80 + b"\n\n")
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        with TranscriptFile(path) as transcripts:
+            assert transcripts.get(9) == ("https://example.com/9-guest/", "Appended later.")
+            assert transcripts.get(10)[1] == EPISODES[2][1]
+    assert "stale" in out.getvalue()
+
+def test_build_index_for_a_file_without_one(tmp_path):
+    path = write(tmp_path)
+    os.remove(episode_index_path(path))
+    with open(build_episode_index(path), 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    assert index['file_size'] == os.path.getsize(path)
+    with TranscriptFile(path) as transcripts:
+        for num, transcript in EPISODES:
+            assert transcripts.get(num)[1] == transcript
+
+def test_first_block_of_a_repeated_episode_wins(tmp_path):
+    path = write(tmp_path, [(5, "first"), (4, "other"), (5, "second")])
+    with TranscriptFile(path) as transcripts:
+        assert len(transcripts) == 3
+        assert transcripts.get(5)[1] == "first"
+        assert transcripts.transcript_at(2) == "second"
@@ -0,0 +1,23 @@
+import json
+
+from transcript_segments import Segment, SegmentColumns, write_columns
+
+def test_columns_built_from_jsonl_match_in_memory_columns(tmp_path):
+    segments = [Segment(217, 0, 'Host', 'Welcome back.'),
+                Segment(217, 65, 'Guest', 'Thanks for having me — "again".'),
+                Segment(218, 3725, None, 'Ünïcode text'),
+                Segment(218, 3800, 'Host', 'Bye.')]
+    jsonl_path = tmp_path / "all.segments.jsonl"
+    with open(jsonl_path, 'w', encoding='utf-8') as f:
+        for segment in segments:
+            f.write(json.dumps(segment.to_dict(), ensure_ascii=False) + '\n')
+
+    columns = SegmentColumns()
+    for segment in segments:
+        columns.append(segment)
+    columns.save(str(tmp_path / "expected.columns.json"))
+
+    assert write_columns(str(jsonl_path), str(tmp_path / "all.segments.columns.json")) == 4
+    assert (tmp_path / "all.segments.columns.json").read_bytes() == (tmp_path / "expected.columns.json").read_bytes()
+    loaded = SegmentColumns.load(str(tmp_path / "all.segments.columns.json"))
+    assert [loaded[i].to_dict() for i in range(len(loaded))] == [s.to_dict() for s in segments]
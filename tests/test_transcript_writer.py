@@ -0,0 +1,26 @@
+from transcript_reader import read_combined_transcripts
+from transcript_writer import CombinedTranscriptWriter
+
+def write(output_dir, episodes):
+    with CombinedTranscriptWriter(str(output_dir)) as writer:
+        for num in episodes:
+            writer.add(f"https://example.com/{num}-guest/", f"[00:00:01] Host: episode {num}")
+    return writer
+
+def test_rerun_with_the_same_episodes_replaces_the_file(tmp_path):
+    write(tmp_path, [3, 2, 1])
+    with CombinedTranscriptWriter(str(tmp_path)) as writer:
+        for num in [3, 2, 1, 2]:
+            writer.add(f"https://example.com/{num}-guest/", f"[00:00:01] Host: new {num}")
+        path = writer.close()
+    assert path == str(tmp_path / "3-1.txt")
+    assert [path.name for path in tmp_path.glob("*.txt")] == ["3-1.txt"]
+
+def test_fewer_episodes_never_replace_a_file(tmp_path):
+    write(tmp_path, [3, 2, 1])
+    writer = write(tmp_path, [3, 1])
+    assert [num for num, url, text in read_combined_transcripts(str(tmp_path / "3-1.txt"))] == [3, 2, 1]
+    others = [path for path in tmp_path.glob("3-1-*.txt")]
+    assert len(others) == 1
+    assert [num for num, url, text in read_combined_transcripts(str(others[0]))] == [3, 1]
+    assert not writer.unchanged
@@ -0,0 +1,111 @@
+import threading
+import types
+
+import pytest
+
+import work_queue
+from work_queue import WorkQueue, LeaseHeartbeat
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(work_queue, 'time', types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    queue = WorkQueue(str(tmp_path / "queue.db"), lease_seconds=60, max_attempts=2)
+    queue.enqueue([(num, f"https://example.com/{num}-guest/") for num in range(1, 6)])
+    yield queue
+    queue.close()
+
+def test_enqueue_ignores_queued_episodes(queue):
+    assert queue.enqueue([(5, "https://example.com/5-guest/"), (6, "https://example.com/6-guest/")]) == 1
+    assert queue.counts() == {'pending': 6}
+
+def test_claims_are_exclusive_and_highest_first(queue):
+    assert [num for num, url in queue.claim("a", 2)] == [5, 4]
+    assert [num for num, url in queue.claim("b", 2)] == [3, 2]
+    assert queue.counts() == {'pending': 1, 'leased': 4}
+
+def test_concurrent_claims_never_share_an_episode(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.db"))
+    queue.enqueue([(num, f"https://example.com/{num}-guest/") for num in range(200)])
+    claimed = []
+    def worker(name):
+        other = WorkQueue(str(tmp_path / "queue.db"))
+        while True:
+            batch = other.claim(name, 3)
+            if not batch:
+                break
+            claimed.extend(url for num, url in batch)
+        other.close()
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(claimed) == len(set(claimed)) == 200
+    queue.close()
+
+def test_expired_leases_are_reclaimed(queue, clock):
+    first = queue.claim("a", 2)
+    clock[0] += 59
+    assert queue.claim("b", 5) == [(3, "https://example.com/3-guest/"), (2, "https://example.com/2-guest/"),
+                                   (1, "https://example.com/1-guest/")]
+    clock[0] += 2
+    assert queue.claim("b", 5) == first
+    # The original worker no longer holds them
+    assert queue.heartbeat("a", [url for num, url in first]) == 0
+    assert queue.leases() == [("b", 5, 1119.0)]
+
+def test_heartbeat_keeps_a_lease_alive(queue, clock):
+    batch = queue.claim("a", 2)
+    clock[0] += 50
+    assert queue.heartbeat("a", [url for num, url in batch]) == 2
+    clock[0] += 50
+    assert [num for num, url in queue.claim("b", 5)] == [3, 2, 1]
+    assert queue.next_expiry() == 1110.0
+
+def test_failures_are_retried_up_to_max_attempts(queue):
+    url = queue.claim("a", 1)[0][1]
+    queue.fail("a", [url])
+    assert queue.counts() == {'pending': 5}
+    assert queue.claim("b", 1)[0][1] == url
+    queue.fail("b", [url])
+    assert queue.counts() == {'pending': 4, 'failed': 1}
+
+def test_fail_only_touches_own_leases(queue, clock):
+    url = queue.claim("a", 1)[0][1]
+    clock[0] += 61
+    queue.claim("b", 1)
+    queue.fail("a", [url])
+    assert queue.counts() == {'pending': 4, 'leased': 1}
+
+def test_complete_marks_done_even_after_expiry(queue, clock):
+    batch = queue.claim("a", 2)
+    clock[0] += 61
+    queue.complete("a", [url for num, url in batch], "5-4.txt")
+    assert queue.counts() == {'pending': 3, 'done': 2}
+    assert [num for num, url in queue.claim("b", 5)] == [3, 2, 1]
+
+def test_release_hands_leases_back_without_using_an_attempt(queue):
+    queue.claim("a", 5)
+    queue.release("a")
+    assert queue.counts() == {'pending': 5}
+    assert queue.next_expiry() is None
+    url = queue.claim("b", 1)[0][1]
+    queue.fail("b", [url])
+    # One real attempt so far, so the episode is still retried
+    assert queue.counts() == {'pending': 5}
+
+def test_lease_heartbeat_renews_in_the_background(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.db"), lease_seconds=0.3)
+    queue.enqueue([(1, "https://example.com/1-guest/")])
+    batch = queue.claim("a", 1)
+    expires = queue.next_expiry()
+    with LeaseHeartbeat(queue, "a", [url for num, url in batch], interval=0.05):
+        threading.Event().wait(0.5)
+    assert queue.next_expiry() > expires + 0.3
+    assert queue.claim("b", 1) == []
+    queue.close()
@@ -0,0 +1,46 @@
+from wp_api import iter_api_pages
+
+class FakeResponse:
+    def __init__(self, posts, total_pages=None):
+        self.posts = posts
+        self.headers = {'X-WP-TotalPages': str(total_pages)} if total_pages else {}
+
+    def json(self):
+        return self.posts
+
+def listing(pages, total_pages=None, failing=()):
+    """request_page over `pages` pages of 10 posts, with some pages failing"""
+    def request_page(page):
+        if page in failing:
+            return None
+        return FakeResponse([page] * 10 if page < pages else [page] * 3, total_pages)
+    return request_page
+
+def test_complete_listing_has_no_failed_pages():
+    failed = []
+    pages = [page for page, posts in iter_api_pages(listing(4, 4), 10, concurrency=2, failed_pages=failed)]
+    assert pages == [1, 2, 3, 4]
+    assert failed == []
+
+def test_failed_page_is_reported_in_parallel_paging():
+    failed = []
+    pages = [page for page, posts in iter_api_pages(listing(4, 4, failing={2}), 10, concurrency=2,
+                                                    failed_pages=failed)]
+    assert pages == [1, 3, 4]
+    assert failed == [2]
+
+def test_failed_page_is_reported_in_sequential_paging():
+    failed = []
+    pages = [page for page, posts in iter_api_pages(listing(4, failing={3}), 10, failed_pages=failed)]
+    assert pages == [1, 2]
+    assert failed == [3]
+
+def test_failed_first_page_is_reported():
+    failed = []
+    assert list(iter_api_pages(listing(4, 4, failing={1}), 10, failed_pages=failed)) == []
+    assert failed == [1]
+
+def test_empty_listing_is_not_a_failure():
+    failed = []
+    assert list(iter_api_pages(lambda page: FakeResponse([], 1), 10, failed_pages=failed)) == []
+    assert failed == []
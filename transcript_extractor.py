@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Transcript extraction shared by the podcast scrapers
+Finds [hh:mm:ss] transcript text in episode pages or WordPress API content
+"""
+
+from bs4 import BeautifulSoup, SoupStrainer, Tag, NavigableString, CData
+from html import unescape
+import re
+from transcript_segments import iter_sections
+
+TIMESTAMP_PATTERN = re.compile(r'\[\d{2}:\d{2}:\d{2}\]')
+
+# Look for common transcript indicators, most specific first
+TRANSCRIPT_SELECTORS = [
+    'div[class*="transcript"]',
+    'div[class*="content"]',
+    'article',
+    'main',
+    '.entry-content',
+    '.post-content'
+]
+
+def class_contains(value):
+    """Match [class*="value"] against the space-joined class attribute"""
+    return lambda tag: value in ' '.join(tag.get('class') or [])
+
+def has_class(value):
+    """Match .value against the individual class names"""
+    return lambda tag: value in (tag.get('class') or [])
+
+# Element tests equivalent to each CSS selector, so the locator can check
+# every selector against a tag in the same walk
+SELECTOR_MATCHERS = {
+    'div[class*="transcript"]': lambda tag: tag.name == 'div' and class_contains('transcript')(tag),
+    'div[class*="content"]': lambda tag: tag.name == 'div' and class_contains('content')(tag),
+    'article': lambda tag: tag.name == 'article',
+    'main': lambda tag: tag.name == 'main',
+    '.entry-content': has_class('entry-content'),
+    '.post-content': has_class('post-content'),
+}
+
+# String types get_text() serializes - comments, scripts etc. never count
+TEXT_STRING_TYPES = (NavigableString, CData)
+
+# Parser backends selectable per run. lxml-strained only builds the
+# main/article/div subtrees and falls back to a full lxml parse when
+# the transcript isn't in one of them. lxml repairs broken markup
+# differently from html.parser and can extract different text on
+# malformed pages, so it's opt-in and html.parser stays the default.
+PARSER_BACKENDS = ['lxml', 'lxml-strained', 'html.parser']
+DEFAULT_PARSER = 'html.parser'
+
+CONTENT_AREA_STRAINER = SoupStrainer(['main', 'article', 'div'])
+
+# The first selectors only ever match div/article/main, which the strainer
+# keeps in document order, so their first match is the same as in a full parse
+STRAINER_SAFE_SELECTORS = 4
+
+def make_soup(html, parser=DEFAULT_PARSER):
+    """Parse HTML with one of PARSER_BACKENDS"""
+    if parser == 'lxml-strained':
+        return BeautifulSoup(html, 'lxml', parse_only=CONTENT_AREA_STRAINER)
+    if parser not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {parser}")
+    return BeautifulSoup(html, parser)
+
+def following_node(tag):
+    """Return the first node after tag's subtree in document order, or None"""
+    for node in [tag] + list(tag.parents):
+        if node.next_sibling is not None:
+            return node.next_sibling
+    return None
+
+def locate_transcript(soup, selectors=TRANSCRIPT_SELECTORS):
+    """Walk the DOM once and find the transcript block
+
+    Records the first match for every selector and counts the text nodes
+    with [hh:mm:ss] timestamps under each of them. Returns
+    (winner, candidates) where candidates maps selector -> (tag, count)
+    and winner is the highest priority candidate with timestamps, or None.
+
+    The walk stops as soon as the winner is certain: a candidate has
+    timestamps and every higher priority selector has a fully walked
+    match without any.
+    """
+    matchers = [(selector, SELECTOR_MATCHERS[selector]) for selector in selectors]
+    candidates = {}
+    candidate_ids = {}
+    closing = {}  # id(node after a candidate's subtree) -> selectors
+    closed = set()
+
+    def winner_is_settled():
+        for selector in selectors:
+            if selector not in closed and (selector not in candidates or not candidates[selector][1]):
+                return False
+            if candidates[selector][1]:
+                return True
+        return False
+
+    for node in soup.descendants:
+        if id(node) in closing:
+            closed.update(closing.pop(id(node)))
+            if winner_is_settled():
+                break
+
+        if isinstance(node, Tag):
+            if len(candidates) < len(matchers):
+                for selector, matches in matchers:
+                    if selector not in candidates and matches(node):
+                        candidates[selector] = (node, 0)
+                        candidate_ids.setdefault(id(node), []).append(selector)
+                        closing.setdefault(id(following_node(node)), []).append(selector)
+        elif (type(node) in TEXT_STRING_TYPES and candidate_ids
+              and node.parent.name not in ('script', 'style')
+              and TIMESTAMP_PATTERN.search(node)):
+            # Credit every candidate this timestamp sits under
+            for parent in node.parents:
+                for selector in candidate_ids.get(id(parent), ()):
+                    tag, count = candidates[selector]
+                    candidates[selector] = (tag, count + 1)
+            if winner_is_settled():
+                break
+
+    for selector in selectors:
+        if selector in candidates and candidates[selector][1]:
+            return candidates[selector][0], candidates
+    return None, candidates
+
+def select_transcript(soup, selectors=TRANSCRIPT_SELECTORS):
+    """Return the text of the first selector match containing timestamps, or None
+
+    Only the winning block is serialized to text.
+    """
+    winner, candidates = locate_transcript(soup, selectors)
+    if winner is None:
+        # The cascade used to strip scripts from every candidate it looked
+        # at, which the whole-page fallback then relies on
+        for tag, count in candidates.values():
+            for script in tag(["script", "style"]):
+                script.decompose()
+        return None
+
+    # Remove script and style elements
+    for script in winner(["script", "style"]):
+        script.decompose()
+    return winner.get_text(separator='\n', strip=True)
+
+def extract_transcript_from_soup(soup):
+    """Extract transcript text from a parsed episode page
+
+    Returns (transcript_text, transcript_found). When no timestamps are found
+    the main content area is returned with transcript_found set to False.
+    """
+    transcript_text = select_transcript(soup)
+    transcript_found = transcript_text is not None
+
+    # If no transcript found with selectors, search the entire page
+    if not transcript_found:
+        transcript_text = ""
+        print("  Searching entire page for transcript content...")
+        all_text = soup.get_text(separator='\n', strip=True)
+
+        # Look for timestamp patterns in the entire page
+        timestamp_matches = list(iter_sections(all_text))
+        if timestamp_matches:
+            print(f"  Found {len(timestamp_matches)} timestamp sections")
+            # Combine all timestamp sections
+            transcript_text = '\n\n'.join(timestamp_matches)
+            transcript_found = True
+        else:
+            # Fallback: get the main content area
+            main_content = soup.find('main') or soup.find('article') or soup.find('div', class_='content')
+            if main_content:
+                for script in main_content(["script", "style"]):
+                    script.decompose()
+                transcript_text = main_content.get_text(separator='\n', strip=True)
+
+    return transcript_text.strip(), transcript_found
+
+def extract_transcript_from_html(html, parser=DEFAULT_PARSER):
+    """Parse an episode page and extract its transcript"""
+    if parser == 'lxml-strained':
+        soup = make_soup(html, parser)
+        transcript_text = select_transcript(soup, TRANSCRIPT_SELECTORS[:STRAINER_SAFE_SELECTORS])
+        if transcript_text is not None:
+            return transcript_text.strip(), True
+        # Not in the content area - run the whole cascade on a full parse
+        parser = 'lxml'
+    return extract_transcript_from_soup(make_soup(html, parser))
+
+def extract_transcript_from_api_content(content_html, parser=DEFAULT_PARSER):
+    """Extract a transcript from a post's content.rendered HTML
+
+    content.rendered is the body of the post without the surrounding theme,
+    so it only counts as a transcript when it contains timestamps. Returns
+    an empty string otherwise so callers can fall back to the episode page.
+    """
+    if not api_content_has_transcript(content_html):
+        return ""
+
+    # content.rendered is already just the content area, nothing to strain
+    soup = make_soup(content_html, 'lxml' if parser == 'lxml-strained' else parser)
+    for script in soup(["script", "style"]):
+        script.decompose()
+
+    text_content = soup.get_text(separator='\n', strip=True)
+    if not TIMESTAMP_PATTERN.search(text_content):
+        return ""
+    return text_content
+
+# Markup that never reaches get_text(): comments, scripts, styles, then tags
+HIDDEN_MARKUP_PATTERN = re.compile(r'<!--.*?-->|<(script|style)\b.*?</\1\s*>|<[^>]*>', re.DOTALL | re.IGNORECASE)
+
+def api_content_has_transcript(content_html):
+    """Cheap check that content.rendered has timestamps in its visible text
+
+    Lets a fetch stage decide between the API content and the episode page
+    without building a soup: timestamps that only appear in markup (an
+    attribute, a script) don't count, matching extract_transcript_from_api_content.
+    """
+    if not content_html:
+        return False
+    # Matched after unescape, the brackets are often entity-encoded (&#91;)
+    return bool(TIMESTAMP_PATTERN.search(unescape(HIDDEN_MARKUP_PATTERN.sub(' ', content_html))))
+
+def extract_transcript_from_payload(payload, parser=DEFAULT_PARSER):
+    """Extract a transcript from a fetched ('api', content.rendered) or ('html', page) pair
+
+    Lives at module level so a pipeline can run it in a worker process.
+    """
+    kind, body = payload
+    if kind == 'api':
+        return extract_transcript_from_api_content(body, parser=parser)
+    return extract_transcript_from_html(body, parser=parser)[0]
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Readers for combined transcript files
+Parses the EPISODE N / URL: blocks written by CombinedTranscriptWriter,
+either line by line or through the .idx.json sidecar and a memory map for
+random access to single episodes
+"""
+
+import argparse
+import json
+import mmap
+import os
+import random
+import re
+
+SEPARATOR = "=" * 80
+
+# Header and trailer around every transcript in a combined file
+BLOCK_HEADER = re.compile(rb'EPISODE (\d+|UNKNOWN)\nURL: ([^\n]*)\n' + SEPARATOR.encode() + rb'\n\n')
+BLOCK_TRAILER = b"\n\n" + SEPARATOR.encode() + b"\n\n"
+
+def read_combined_transcripts(path):
+    """Yield (episode_num, url, transcript) for each block in a combined file
+
+    Reads line by line, so only one episode is held in memory at a time.
+    episode_num is None for blocks written as EPISODE UNKNOWN.
+    """
+    episode_num = url = None
+    lines = None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if lines is None:
+                header = re.match(r'EPISODE (\d+|UNKNOWN)$', line)
+                if header:
+                    episode_num = int(header.group(1)) if header.group(1).isdigit() else None
+                elif line.startswith("URL: "):
+                    url = line[len("URL: "):]
+                elif line == SEPARATOR:
+                    lines = []
+            elif line == SEPARATOR:
+                yield episode_num, url, "\n".join(lines).strip('\n')
+                episode_num = url = None
+                lines = None
+            else:
+                lines.append(line)
+
+def episode_index_path(transcript_path):
+    """Return the .idx.json sidecar path for a combined .txt file"""
+    return f"{os.path.splitext(transcript_path)[0]}.idx.json"
+
+def write_episode_index(transcript_path, entries, file_size):
+    """Write the sidecar of (episode_num, url, byte offset, byte length) entries
+
+    file_size is stored so readers can tell when the index is stale.
+    """
+    index_path = episode_index_path(transcript_path)
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'file_size': file_size, 'episodes': [list(entry) for entry in entries]}, f)
+    os.replace(tmp_path, index_path)
+    return index_path
+
+def scan_episode_index(data):
+    """Find every transcript's byte range by scanning a combined file's bytes"""
+    entries = []
+    position = 0
+    while True:
+        header = BLOCK_HEADER.search(data, position)
+        if not header:
+            return entries
+        start = header.end()
+        end = data.find(BLOCK_TRAILER, start)
+        if end < 0:
+            end = len(data)
+        episode = header.group(1)
+        entries.append((int(episode) if episode.isdigit() else None, header.group(2).decode('utf-8'),
+                        start, end - start))
+        position = end
+
+def build_episode_index(transcript_path):
+    """Write a sidecar for a combined file scraped before indexes existed"""
+    with TranscriptFile(transcript_path, use_sidecar=False) as transcripts:
+        return write_episode_index(transcript_path, transcripts.entries, transcripts.size)
+
+class TranscriptFile:
+    """Random access to the episodes of one combined transcript file
+
+    The file is memory-mapped and located through its .idx.json sidecar,
+    so get() decodes a single episode without reading the rest. Files
+    without a (current) sidecar are indexed by scanning the map once.
+    """
+
+    def __init__(self, path, use_sidecar=True):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.size = os.fstat(self.file.fileno()).st_size
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        self.entries = self.load_sidecar() if use_sidecar else None
+        if self.entries is None:
+            self.entries = scan_episode_index(self.data)
+        self.positions = {}  # episode_num -> position in entries (first block wins)
+        for i, (episode_num, url, offset, length) in enumerate(self.entries):
+            if episode_num is not None:
+                self.positions.setdefault(episode_num, i)
+
+    def load_sidecar(self):
+        """Return the sidecar entries, or None if missing or stale"""
+        try:
+            with open(episode_index_path(self.path), 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if index.get('file_size') != self.size:
+            print(f"Episode index for {self.path} is stale, rescanning")
+            return None
+        return [tuple(entry) for entry in index['episodes']]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, episode_num):
+        return episode_num in self.positions
+
+    def episode_numbers(self):
+        return [entry[0] for entry in self.entries]
+
+    def transcript_at(self, i):
+        """Return the transcript of the i-th block in the file"""
+        episode_num, url, offset, length = self.entries[i]
+        return self.data[offset:offset + length].decode('utf-8')
+
+    def get(self, episode_num):
+        """Return (url, transcript) for an episode, or None if it isn't in the file"""
+        i = self.positions.get(episode_num)
+        if i is None:
+            return None
+        return self.entries[i][1], self.transcript_at(i)
+
+    def sample(self, rng=random):
+        """Return (episode_num, url, transcript) for a random block"""
+        i = rng.randrange(len(self.entries))
+        return self.entries[i][0], self.entries[i][1], self.transcript_at(i)
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description="Index combined transcript files or read single episodes from them")
+    parser.add_argument("files", nargs="+", help="Combined transcript files, e.g. transcripts/217-198.txt")
+    parser.add_argument("--episode", type=int, help="Print this episode's transcript instead of indexing")
+    args = parser.parse_args()
+
+    for path in args.files:
+        if args.episode is None:
+            print(f"Wrote episode index: {build_episode_index(path)}")
+            continue
+        with TranscriptFile(path) as transcripts:
+            found = transcripts.get(args.episode)
+        if found:
+            url, transcript = found
+            print(f"EPISODE {args.episode}\nURL: {url}\n\n{transcript}")
+            return
+    if args.episode is not None:
+        print(f"Episode {args.episode} not found")
+
+if __name__ == "__main__":
+    main()
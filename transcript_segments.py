@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Structured transcript segments
+Splits transcripts on their [hh:mm:ss] markers into (episode, offset,
+speaker, text) records and exports them as JSONL and column files
+"""
+
+from array import array
+import argparse
+import json
+import os
+import re
+from transcript_reader import read_combined_transcripts
+
+TIMESTAMP_PATTERN = re.compile(r'\[(\d{2}):(\d{2}):(\d{2})\]')
+
+# "Ramit Sethi:" style labels - up to four capitalized words and a colon
+SPEAKER_PATTERN = re.compile(r"([A-Z][\w.'-]*(?: [A-Z][\w.'-]*){0,3}):(?:\s+|$)")
+
+def iter_section_spans(text):
+    """Yield (start, end) offsets of each [hh:mm:ss] section in one pass
+
+    A section runs from its marker to the next marker or the end of the
+    text, matching re.findall(r'\[\d{2}:\d{2}:\d{2}\].*?(?=\[\d{2}:\d{2}:\d{2}\]|$)',
+    text, re.DOTALL) - including $ stopping before a final newline - but
+    without re-running the lookahead at every character. Only offsets are
+    produced, so callers can slice lazily.
+    """
+    start = None
+    for marker in TIMESTAMP_PATTERN.finditer(text):
+        if start is not None:
+            yield start, marker.start()
+        start = marker.start()
+    if start is not None:
+        end = len(text)
+        if text.endswith('\n') and end - 1 >= start + 10:
+            end -= 1
+        yield start, end
+
+def iter_sections(text):
+    """Yield each [hh:mm:ss] section of text as a string, lazily"""
+    for start, end in iter_section_spans(text):
+        yield text[start:end]
+
+class Segment:
+    __slots__ = ('episode', 'offset', 'speaker', 'text')
+
+    def __init__(self, episode, offset, speaker, text):
+        self.episode = episode
+        self.offset = offset  # Seconds from the start of the episode
+        self.speaker = speaker
+        self.text = text
+
+    def to_dict(self):
+        return {'episode': self.episode, 'offset': self.offset, 'speaker': self.speaker, 'text': self.text}
+
+    def __repr__(self):
+        return f"Segment({self.episode}, {self.offset}, {self.speaker!r}, {self.text[:30]!r})"
+
+def split_speaker(text):
+    """Split a leading "Name:" label off segment text"""
+    match = SPEAKER_PATTERN.match(text)
+    if match:
+        return match.group(1), text[match.end():].strip()
+    return None, text
+
+def parse_segments(episode, transcript):
+    """Yield a Segment for every [hh:mm:ss] marker in a transcript
+
+    The speaker is read from a "Name:" label right after the marker, or
+    from a label on its own line just before it (the previous segment's
+    last line), which is then dropped from the previous segment's text.
+    """
+    pending_speaker = None
+    for start, end in iter_section_spans(transcript):
+        marker = TIMESTAMP_PATTERN.match(transcript, start)
+        text = transcript[marker.end():end].strip()
+
+        # A label alone on the last line belongs to the next segment
+        next_speaker = None
+        head, sep, last_line = text.rpartition('\n')
+        if sep and SPEAKER_PATTERN.fullmatch(last_line.strip()):
+            next_speaker = last_line.strip()[:-1]
+            text = head.strip()
+
+        speaker, text = split_speaker(text)
+        hours, minutes, seconds = (int(part) for part in marker.groups())
+        yield Segment(episode, hours * 3600 + minutes * 60 + seconds, speaker or pending_speaker, text)
+        pending_speaker = next_speaker
+
+class SegmentColumns:
+    """Column-oriented segment storage
+
+    Episode numbers and offsets live in typed arrays and speakers are
+    dictionary-encoded, so millions of segments cost a few bytes each
+    plus their text.
+    """
+
+    def __init__(self):
+        self.episodes = array('i')
+        self.offsets = array('I')
+        self.speaker_ids = array('i')  # -1 for no speaker
+        self.speakers = []
+        self.speaker_lookup = {}
+        self.texts = []
+
+    def append(self, segment):
+        self.episodes.append(segment.episode if segment.episode is not None else -1)
+        self.offsets.append(segment.offset)
+        if segment.speaker is None:
+            self.speaker_ids.append(-1)
+        else:
+            if segment.speaker not in self.speaker_lookup:
+                self.speaker_lookup[segment.speaker] = len(self.speakers)
+                self.speakers.append(segment.speaker)
+            self.speaker_ids.append(self.speaker_lookup[segment.speaker])
+        self.texts.append(segment.text)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __getitem__(self, i):
+        speaker_id = self.speaker_ids[i]
+        episode = self.episodes[i]
+        return Segment(episode if episode >= 0 else None, self.offsets[i],
+                       self.speakers[speaker_id] if speaker_id >= 0 else None, self.texts[i])
+
+    def save(self, path):
+        """Write the columns as one JSON object of arrays"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'episode': self.episodes.tolist(),
+                'offset': self.offsets.tolist(),
+                'speaker_id': self.speaker_ids.tolist(),
+                'speakers': self.speakers,
+                'text': self.texts,
+            }, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        """Read columns written by save()"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        columns = cls()
+        columns.episodes = array('i', data['episode'])
+        columns.offsets = array('I', data['offset'])
+        columns.speaker_ids = array('i', data['speaker_id'])
+        columns.speakers = data['speakers']
+        columns.speaker_lookup = {name: i for i, name in enumerate(columns.speakers)}
+        columns.texts = data['text']
+        return columns
+
+def write_json_array(f, values):
+    """Write values as a JSON array, formatted like json.dump"""
+    f.write('[')
+    for i, value in enumerate(values):
+        if i:
+            f.write(', ')
+        f.write(json.dumps(value, ensure_ascii=False))
+    f.write(']')
+
+def write_columns(jsonl_path, columns_path):
+    """Build the column file of a segment JSONL file; returns the segment count
+
+    Reads the JSONL once per column and writes each array as it goes, so
+    only the speaker dictionary is held in memory, not the segments. The
+    output is the same as SegmentColumns.save() for the same segments.
+    """
+    speakers = {}
+
+    def column(name):
+        with open(jsonl_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                value = json.loads(line)[name]
+                if name == 'speaker':
+                    yield -1 if value is None else speakers.setdefault(value, len(speakers))
+                elif name == 'episode':
+                    yield -1 if value is None else value
+                else:
+                    yield value
+
+    count = 0
+    def counted(values):
+        nonlocal count
+        for count, value in enumerate(values, 1):
+            yield value
+
+    partial_path = f"{columns_path}.partial"
+    with open(partial_path, 'w', encoding='utf-8') as f:
+        f.write('{"episode": ')
+        write_json_array(f, counted(column('episode')))
+        f.write(', "offset": ')
+        write_json_array(f, column('offset'))
+        f.write(', "speaker_id": ')
+        write_json_array(f, column('speaker'))
+        f.write(', "speakers": ')
+        write_json_array(f, list(speakers))
+        f.write(', "text": ')
+        write_json_array(f, column('text'))
+        f.write('}')
+    os.replace(partial_path, columns_path)
+    return count
+
+def segment_paths(transcript_path):
+    """Return the (JSONL, columns) paths that sit next to a combined .txt file"""
+    base = os.path.splitext(transcript_path)[0]
+    return f"{base}.segments.jsonl", f"{base}.segments.columns.json"
+
+class SegmentFileWriter:
+    """Streams segments to JSONL alongside a CombinedTranscriptWriter
+
+    Segments go to a .partial JSONL file as each episode is added; close()
+    moves it next to the final combined file and builds the columns from
+    it, so nothing accumulates in memory during the run.
+    """
+
+    def __init__(self, partial_base):
+        self.partial_path = f"{partial_base}.segments.jsonl.partial"
+        self.file = open(self.partial_path, 'w', encoding='utf-8')
+
+    def add(self, episode_num, transcript):
+        for segment in parse_segments(episode_num, transcript):
+            self.file.write(json.dumps(segment.to_dict(), ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def close(self, transcript_path):
+        """Finish the segment files next to transcript_path"""
+        self.file.close()
+        jsonl_path, columns_path = segment_paths(transcript_path)
+        os.replace(self.partial_path, jsonl_path)
+        write_columns(jsonl_path, columns_path)
+        return jsonl_path, columns_path
+
+    def discard(self):
+        self.file.close()
+        os.remove(self.partial_path)
+
+    def abort(self):
+        self.file.close()
+
+def export_segments(transcript_path):
+    """Write segment files for an existing combined transcript file"""
+    jsonl_path, columns_path = segment_paths(transcript_path)
+    with open(jsonl_path, 'w', encoding='utf-8') as f:
+        for episode_num, url, transcript in read_combined_transcripts(transcript_path):
+            for segment in parse_segments(episode_num, transcript):
+                f.write(json.dumps(segment.to_dict(), ensure_ascii=False) + "\n")
+    count = write_columns(jsonl_path, columns_path)
+    print(f"Exported {count} segments to: {jsonl_path}, {columns_path}")
+    return jsonl_path, columns_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Export transcript segments as JSONL and columns")
+    parser.add_argument("files", nargs="+", help="Combined transcript files, e.g. transcripts/217-198.txt")
+    args = parser.parse_args()
+
+    for path in args.files:
+        export_segments(path)
+
+if __name__ == "__main__":
+    main()
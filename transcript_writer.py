@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Streaming writer for combined transcript files
+Appends each episode as it completes to a temporary file, then renames it
+to the episode range (e.g. 217-198.txt) once the run finishes, with a
+.idx.json sidecar of each episode's byte offset for random access. A file
+whose content hasn't changed since the last run is left untouched, and one
+holding episodes this run didn't write is never replaced.
+"""
+
+import hashlib
+import os
+import re
+import time
+from transcript_reader import SEPARATOR, TranscriptFile, episode_index_path, write_episode_index
+from transcript_segments import SegmentFileWriter, segment_paths
+
+def extract_episode_number(url):
+    """Extract episode number from URL"""
+    match = re.search(r'/(\d+)-', url)
+    if match:
+        return int(match.group(1))
+    return None
+
+def file_digest(path):
+    """sha256 of a file's bytes, or None if it can't be read"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+def combined_filename(episode_numbers, episode_count):
+    """Name a combined file after its highest and lowest episode"""
+    if episode_numbers:
+        return f"{max(episode_numbers)}-{min(episode_numbers)}.txt"
+    # Fallback filename
+    return f"episodes_{episode_count}.txt"
+
+def unique_filename(filepath):
+    """filepath with the run time added before .txt, e.g. 20-1-20240501-101500.txt"""
+    stem = os.path.splitext(filepath)[0]
+    candidate = f"{stem}-{time.strftime('%Y%m%d-%H%M%S')}.txt"
+    if os.path.exists(candidate):
+        candidate = f"{stem}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.txt"
+    return candidate
+
+class CombinedTranscriptWriter:
+    def __init__(self, output_dir="transcripts", segments=False):
+        self.output_dir = output_dir
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        # Partial output stays on disk under this name if the run crashes
+        self.partial_path = os.path.join(
+            self.output_dir, f"in-progress-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.txt.partial"
+        )
+        # Binary, so byte offsets for the episode index are exact
+        self.file = open(self.partial_path, 'wb')
+        self.offset = 0
+        self.digest = hashlib.sha256()  # Of everything written, to spot unchanged reruns
+        self.unchanged = False
+        # Optional .segments.jsonl/.segments.columns.json next to the .txt
+        self.segments = SegmentFileWriter(self.partial_path[:-len('.txt.partial')]) if segments else None
+        self.episodes = []  # (episode_num, url, sha256, characters) per written episode
+        self.index = []  # (episode_num, url, byte offset, byte length) of each transcript
+
+    def add(self, url, transcript):
+        """Append one episode block and flush it to disk"""
+        episode_num = extract_episode_number(url)
+        header = f"EPISODE {episode_num if episode_num else 'UNKNOWN'}\nURL: {url}\n{SEPARATOR}\n\n".encode('utf-8')
+        body = transcript.encode('utf-8')
+        block = header + body + f"\n\n{SEPARATOR}\n\n".encode('utf-8')
+        self.file.write(block)
+        self.file.flush()
+        self.digest.update(block)
+        self.index.append((episode_num, url, self.offset + len(header), len(body)))
+        self.offset += len(header) + len(body) + len(SEPARATOR) + 4
+        if self.segments:
+            self.segments.add(episode_num, transcript)
+        content_hash = hashlib.sha256(transcript.encode('utf-8')).hexdigest()
+        self.episodes.append((episode_num, url, content_hash, len(transcript)))
+
+    def close(self):
+        """Finish the file and rename it to its episode range
+
+        If a file with that name already holds exactly the same content, it
+        is kept as is (mtime, sidecars and all) and the new copy is dropped,
+        so downstream incremental tools see nothing changed. Returns the
+        final path, or None when nothing was written.
+        """
+        self.file.close()
+        if not self.episodes:
+            os.remove(self.partial_path)
+            if self.segments:
+                self.segments.discard()
+            return None
+
+        episode_numbers = [num for num, url, content_hash, size in self.episodes if num]
+        filepath = os.path.join(self.output_dir, combined_filename(episode_numbers, len(self.episodes)))
+        if self.is_unchanged(filepath):
+            print(f"Content unchanged, keeping existing {filepath}")
+            self.unchanged = True
+            os.remove(self.partial_path)
+            if self.segments:
+                self.segments.discard()
+            return filepath
+
+        missing = self.episodes_missing_from_run(filepath)
+        if missing:
+            # A --sync run re-scrapes a few edited episodes of a range; the
+            # existing file still holds the only copy of the others
+            filepath = unique_filename(filepath)
+            print(f"Existing file of that range holds {missing} episodes this run didn't write, "
+                  f"saving to {filepath} instead")
+
+        os.replace(self.partial_path, filepath)
+        write_episode_index(filepath, self.index, self.offset)
+        if self.segments:
+            self.segments.close(filepath)
+        return filepath
+
+    def is_unchanged(self, filepath):
+        """True when filepath and its sidecars already match what was written"""
+        if not os.path.exists(filepath) or os.path.getsize(filepath) != self.offset:
+            return False
+        sidecars = [episode_index_path(filepath)] + (list(segment_paths(filepath)) if self.segments else [])
+        if not all(os.path.exists(path) for path in sidecars):
+            return False
+        return file_digest(filepath) == self.digest.hexdigest()
+
+    def episodes_missing_from_run(self, filepath):
+        """How many episodes in an existing filepath this run didn't write (0 if there's no such file)"""
+        if not os.path.exists(filepath):
+            return 0
+        written = {url for num, url, content_hash, size in self.episodes}
+        with TranscriptFile(filepath) as existing:
+            return len({url for num, url, offset, length in existing.entries} - written)
+
+    def abort(self):
+        """Stop writing but keep the partial output for inspection"""
+        self.file.close()
+        if self.segments:
+            self.segments.abort()
+        if self.episodes:
+            print(f"Partial output with {len(self.episodes)} episodes kept at: {self.partial_path}")
+        else:
+            os.remove(self.partial_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        elif not self.file.closed:
+            self.close()
+        return False
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Lease-based work queue of episodes shared by several scraper processes
+Workers claim episodes for a limited time and renew the lease while they
+work; leases of a worker that dies simply expire and the episodes go back
+to the next worker that asks
+"""
+
+import argparse
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS work (
+    url TEXT PRIMARY KEY,
+    episode_num INTEGER,
+    state TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    output_file TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS work_by_state ON work (state, lease_expires);
+"""
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+class WorkQueue:
+    """Episodes in states pending, leased, done or failed
+
+    Claims run in an IMMEDIATE transaction, so concurrent workers never get
+    the same episode. The database must live on a filesystem with working
+    locks for workers on other machines to share it.
+    """
+
+    def __init__(self, path="transcripts/.work_queue.db", lease_seconds=300, max_attempts=3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode; multi-statement changes open their own transaction
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def transaction(self):
+        """Hold the write lock on the database for a block of statements"""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def enqueue(self, episodes):
+        """Add (episode_num, url) items; ones already queued are left alone. Returns how many were new"""
+        with self.transaction() as conn:
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO work (episode_num, url, updated_at) VALUES (?, ?, ?)",
+                             [(num, url, time.time()) for num, url in episodes])
+            return conn.total_changes - before
+
+    def claim(self, worker, count):
+        """Lease up to count episodes, highest episode first
+
+        Pending episodes and ones whose lease has expired are both up for
+        grabs. Returns [(episode_num, url)].
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            rows = conn.execute(
+                "SELECT url, episode_num, state, worker FROM work "
+                "WHERE state = 'pending' OR (state = 'leased' AND lease_expires < ?) "
+                "ORDER BY episode_num DESC LIMIT ?", (now, count)).fetchall()
+            for url, episode_num, state, previous in rows:
+                if state == 'leased':
+                    print(f"Reclaiming episode {episode_num} from expired lease of {previous}")
+            conn.executemany(
+                "UPDATE work SET state = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE url = ?",
+                [(worker, now + self.lease_seconds, now, url) for url, episode_num, state, previous in rows])
+        return [(episode_num, url) for url, episode_num, state, previous in rows]
+
+    def heartbeat(self, worker, urls):
+        """Extend this worker's leases on urls; returns how many it still holds"""
+        now = time.time()
+        with self.transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "UPDATE work SET lease_expires = ?, updated_at = ? WHERE url = ? AND state = 'leased' AND worker = ?",
+                [(now + self.lease_seconds, now, url, worker) for url in urls])
+            return conn.total_changes - before
+
+    def complete(self, worker, urls, output_file):
+        """Mark episodes done, even if their lease expired in the meantime"""
+        with self.transaction() as conn:
+            conn.executemany(
+                "UPDATE work SET state = 'done', worker = ?, output_file = ?, lease_expires = NULL, updated_at = ? "
+                "WHERE url = ?", [(worker, output_file, time.time(), url) for url in urls])
+
+    def fail(self, worker, urls):
+        """Return episodes to the queue, or mark them failed after max_attempts claims"""
+        with self.transaction() as conn:
+            conn.executemany(
+                "UPDATE work SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "lease_expires = NULL, updated_at = ? WHERE url = ? AND state = 'leased' AND worker = ?",
+                [(self.max_attempts, time.time(), url, worker) for url in urls])
+
+    def release(self, worker):
+        """Hand every episode this worker still leases back to the queue"""
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE work SET state = 'pending', attempts = attempts - 1, lease_expires = NULL, updated_at = ? "
+                "WHERE state = 'leased' AND worker = ?", (time.time(), worker))
+
+    def next_expiry(self):
+        """Earliest lease expiry among leased episodes, or None if nothing is leased"""
+        with self.lock:
+            return self.conn.execute("SELECT MIN(lease_expires) FROM work WHERE state = 'leased'").fetchone()[0]
+
+    def counts(self):
+        """Return {state: episode count}"""
+        with self.lock:
+            return dict(self.conn.execute("SELECT state, COUNT(*) FROM work GROUP BY state"))
+
+    def leases(self):
+        """Return [(worker, episodes leased, earliest lease expiry)]"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT worker, COUNT(*), MIN(lease_expires) FROM work WHERE state = 'leased' GROUP BY worker").fetchall()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+class LeaseHeartbeat:
+    """Renews a worker's leases from a background thread while it works
+
+    Renewing at a third of the lease time means two heartbeats can be
+    missed before another worker may take the episodes over.
+    """
+
+    def __init__(self, queue, worker, urls, interval=None):
+        self.queue = queue
+        self.worker = worker
+        self.urls = list(urls)
+        self.interval = interval or max(1.0, queue.lease_seconds / 3)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                held = self.queue.heartbeat(self.worker, self.urls)
+            except sqlite3.Error as e:
+                print(f"Lease heartbeat failed: {e}")
+                continue
+            if held < len(self.urls):
+                print(f"Lost the lease on {len(self.urls) - held} episodes; another worker may redo them")
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stopped.set()
+        self.thread.join()
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the state of a batch_scraper.py work queue")
+    parser.add_argument("queue", nargs="?", default="transcripts/.work_queue.db",
+                        help="Queue database (default: transcripts/.work_queue.db)")
+    parser.add_argument("--release", metavar="WORKER", help="Hand a stopped worker's leases back right away")
+    args = parser.parse_args()
+
+    queue = WorkQueue(args.queue)
+    if args.release:
+        queue.release(args.release)
+        print(f"Released leases held by {args.release}")
+    counts = queue.counts()
+    print(", ".join(f"{state}: {counts.get(state, 0)}" for state in ('pending', 'leased', 'done', 'failed')))
+    for worker, count, expires in queue.leases():
+        print(f"  {worker}: {count} episodes, lease expires in {expires - time.time():.0f}s")
+    queue.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Helpers for paging through the WordPress REST API
+Reads X-WP-TotalPages from the first response and fetches the remaining
+pages concurrently, yielding them back in page order
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Post fields episode discovery actually reads
+LISTING_FIELDS = ['id', 'slug', 'link', 'title', 'modified']
+
+def listing_params(per_page, page, fields=LISTING_FIELDS, categories=None, tags=None, filters=None):
+    """Build query params for a post listing page
+
+    fields is passed as _fields so WordPress only serializes what we read,
+    instead of full post objects with rendered bodies and SEO metadata.
+    categories/tags are comma-separated term IDs that narrow the listing
+    to podcast posts. filters adds further params as-is, e.g. the
+    modified_after/orderby of an incremental sync.
+    """
+    params = {'per_page': per_page, 'page': page}
+    if filters:
+        params.update(filters)
+    if fields:
+        params['_fields'] = ','.join(fields)
+    if categories:
+        params['categories'] = categories
+    if tags:
+        params['tags'] = tags
+    return params
+
+def fetch_page(request_page, page):
+    """Request one page, returning (posts, response) or (None, None) on failure"""
+    try:
+        response = request_page(page)
+        if not response:
+            print(f"Failed to fetch API data for page {page}")
+            return None, None
+        return response.json(), response
+    except Exception as e:
+        print(f"Error on page {page}: {e}")
+        return None, None
+
+def iter_api_pages(request_page, per_page, concurrency=1, failed_pages=None):
+    """Yield (page, posts) for every page of a WordPress collection
+
+    request_page(page) must return a response (or None) for that page. The
+    first response's X-WP-Total/X-WP-TotalPages headers decide how many
+    pages exist; the rest are fetched with up to `concurrency` in flight,
+    so callers that stop early only wait for those. Without the headers,
+    pages are walked one by one until a short or empty page comes back.
+
+    Pages that couldn't be fetched are skipped and appended to failed_pages
+    (a list), so callers can tell an incomplete listing from a short one
+    and avoid caching it or syncing on it.
+    """
+    if failed_pages is None:
+        failed_pages = []
+    posts, response = fetch_page(request_page, 1)
+    if posts is None:
+        failed_pages.append(1)
+        return
+    if not posts:
+        return
+
+    total_pages = response.headers.get('X-WP-TotalPages')
+    if total_pages is None:
+        print("No X-WP-TotalPages header, paging sequentially")
+        yield 1, posts
+        page = 1
+        while len(posts) >= per_page:
+            page += 1
+            posts, response = fetch_page(request_page, page)
+            if posts is None:
+                # Nothing says how many pages follow, so the rest of the listing is unknown
+                failed_pages.append(page)
+                break
+            if not posts:
+                break
+            yield page, posts
+        return
+
+    total_pages = int(total_pages)
+    print(f"API reports {response.headers.get('X-WP-Total', '?')} posts across {total_pages} pages")
+    yield 1, posts
+
+    remaining = iter(range(2, total_pages + 1))
+    workers = max(1, min(concurrency, total_pages - 1))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Keep `workers` pages in flight and hand them back in page order
+        in_flight = deque()
+        for page in remaining:
+            in_flight.append((page, executor.submit(fetch_page, request_page, page)))
+            if len(in_flight) >= workers:
+                break
+        while in_flight:
+            page, future = in_flight.popleft()
+            posts, response = future.result()
+            next_page = next(remaining, None)
+            if next_page is not None:
+                in_flight.append((next_page, executor.submit(fetch_page, request_page, next_page)))
+            if posts is None:
+                failed_pages.append(page)
+            elif posts:
+                yield page, posts